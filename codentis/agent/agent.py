@@ -5,19 +5,25 @@ from codentis.client.response import StreamEvent, StreamEventType, ToolResultMes
 from codentis.config.config import Config
 from pathlib import Path
 from codentis.agent.session import Session
+from codentis.tools.middleware import get_result_cache
 import json
 
 class Agent:
-    def __init__(self, config: Config, is_subagent: bool = False):
+    def __init__(self, config: Config, is_subagent: bool = False, session: Session | None = None):
         self.config = config
         self.is_subagent = is_subagent
-        self.session: Session | None = None
+        self.session: Session | None = session
+        # A session passed in (e.g. from a sub-agent pool) is closed by its owner
+        self._owns_session = session is None
 
     async def run(self, message: str)->AsyncGenerator[AgentEvent, None]:
         try:
             yield AgentEvent.agent_start(message)
             if not self.session:
                 self.session = Session(self.config, is_subagent=self.is_subagent)
+            if not self.is_subagent:
+                # The user may have edited files since the last message
+                get_result_cache().invalidate()
             self.session.context_manager.add_user_message(message)
 
             final_response: str | None = None
@@ -28,7 +34,7 @@ class Agent:
                 if event.type == AgentEventType.TEXT_COMPLETE:
                     final_response = event.data.get("content")
 
-            yield AgentEvent.agent_end(final_response)
+            yield AgentEvent.agent_end(final_response, usage=self.session.usage)
         except KeyboardInterrupt:
             # Handle interruption gracefully
             yield AgentEvent.agent_error("Operation interrupted by user")
@@ -63,6 +69,7 @@ class Agent:
                             if event.tool_call:
                                 tool_calls.append(event.tool_call)
                         elif event.type == StreamEventType.MESSAGE_COMPLETE:
+                            self.session.record_usage(event.usage, response_text)
                             yield AgentEvent.text_complete(response_text)
                         elif event.type == StreamEventType.ERROR:
                             yield AgentEvent.agent_error(event.error or "Unknown error occured.")
@@ -251,12 +258,14 @@ class Agent:
                     async for event in self.session.client.chat_completion(
                         self.session.context_manager.get_messages(),
                         tools=None,  # force text-only response
-                        stream=True
+                        stream=True,
+                        task="summary",
                     ):
                         if event.type == StreamEventType.TEXT_DELTA and event.text_delta:
                             final_summary += event.text_delta.content
                             yield AgentEvent.text_delta(event.text_delta.content)
                         elif event.type == StreamEventType.MESSAGE_COMPLETE:
+                            self.session.record_usage(event.usage, final_summary)
                             yield AgentEvent.text_complete(final_summary)
                 except Exception:
                     pass  # best-effort
@@ -273,6 +282,6 @@ class Agent:
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb)->None:
-        if self.session and self.session.client:
-            await self.session.client.close()
-            self.session = None
\ No newline at end of file
+        if self.session and self._owns_session:
+            await self.session.close()
+        self.session = None
\ No newline at end of file
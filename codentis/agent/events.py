@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from typing import Any
 from dataclasses import field
 from codentis.client.response import TokenUsage
-from codentis.tools.base import ToolResult, FileDiff
+from codentis.tools.base import ToolResult, FileDiff, render_diff
 
 class AgentEventType(Enum):
     # Agent Lifecycle
@@ -29,6 +29,13 @@ class AgentEvent:
     type: AgentEventType
     data: dict[str, Any] = field(default_factory=dict)
 
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-ready form; a tool call's diff is rendered to text here."""
+        data = self.data
+        if data.get("diff") is not None:
+            data = {**data, "diff": render_diff(data["diff"])}
+        return {"type": self.type.value, "data": data}
+
     @classmethod
     def agent_start(cls, message: str)->AgentEvent:
         return cls(
@@ -77,10 +84,8 @@ class AgentEvent:
 
     @classmethod
     def tool_call_complete(cls, call_id: str, name: str, result: ToolResult):
-        diff_str = None
-        if result.diff:
-            diff_str = str(result.diff) if isinstance(result.diff, str) else result.diff.to_diff()
-
+        # The diff is passed through unrendered; consumers call render_diff()
+        # only when they actually display or serialize it.
         return cls(
             type=AgentEventType.TOOL_CALL_COMPLETE,
             data={
@@ -91,7 +96,7 @@ class AgentEvent:
                 "error": result.error,
                 "metadata": result.metadata,
                 "truncated": result.truncated,
-                "diff": diff_str,
+                "diff": result.diff or None,
                 "exit_code": result.exit_code
             }
         )
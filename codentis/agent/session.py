@@ -1,20 +1,28 @@
 from codentis.config.config import Config
-from codentis.client.llm_client import LLMClient
+from codentis.client.llm_client import LLMClient, SharedClients
 from codentis.context.contextManager import ContextManager
 from codentis.tools.registry import create_default_registry, create_subagent_registry
+from codentis.client.response import TokenUsage
+from codentis.utils.text import estimate_tokens
+from codentis.context.workspace_cache import WorkspaceCache
 from datetime import datetime
+from typing import Callable
+import asyncio
 import uuid
 
 class Session:
-    def __init__(self, config: Config, is_subagent: bool = False):
+    def __init__(self, config: Config, is_subagent: bool = False, workspace: WorkspaceCache | None = None, shared_clients: SharedClients | None = None):
         self.config = config
+        self.workspace = workspace or WorkspaceCache()
         self.client = LLMClient(
-            config = self.config
+            config = self.config,
+            shared_clients = shared_clients
         )
         if is_subagent:
             self.tool_registry = create_subagent_registry(self.config)
         else:
-            self.tool_registry = create_default_registry(self.config)
+            self.tool_registry = create_default_registry(self.config, shared_clients=shared_clients)
+        self.tool_registry.workspace = self.workspace
         self.context_manager = ContextManager(
             config = self.config,
             tools = self.tool_registry.get_tools()
@@ -23,11 +31,104 @@ class Session:
         self.created_at = datetime.now()
         self.updated_at = datetime.now()
         self.turn_count = 0
+        self.usage = TokenUsage()
     
     def increment_turn_count(self)->int:
         self.turn_count += 1
         self.updated_at = datetime.now()
 
         return self.turn_count
-    
-    
\ No newline at end of file
+
+    def record_usage(self, usage: TokenUsage | None, completion_text: str) -> TokenUsage:
+        """Add one completion's usage, estimating it when the API did not report any."""
+        if usage is None:
+            prompt_tokens = self.context_manager.estimated_prompt_tokens()
+            completion_tokens = estimate_tokens(completion_text, self.config.model_name) if completion_text else 0
+            usage = TokenUsage(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+            )
+        self.usage = self.usage + usage
+        return self.usage
+
+    def reset(self, clear_workspace: bool = True) -> None:
+        """Forget the conversation so a pooled session can take a new goal."""
+        self.context_manager.reset()
+        if clear_workspace:
+            self.workspace.clear()
+        self.session_id = str(uuid.uuid4())
+        self.created_at = datetime.now()
+        self.updated_at = datetime.now()
+        self.turn_count = 0
+        self.usage = TokenUsage()
+
+    async def close(self) -> None:
+        await self.client.close()
+        for tool in self.tool_registry.tools.values():
+            await tool.close()
+
+
+class SessionPool:
+    """Idle, already initialized sessions for one kind of sub-agent.
+
+    Building a session means a new LLM client (TLS context and connection
+    pool), a registry of tool instances and a system prompt. Pooled sessions
+    keep all of that and are reset between uses. Sessions are bound to the
+    event loop their client was used on and are dropped if the loop changes.
+    Sessions that share a WorkspaceCache with others should be pooled with
+    clear_workspace=False, so a reset does not empty the shared cache.
+    """
+
+    def __init__(self, factory: Callable[[], Session], max_idle: int = 4, clear_workspace: bool = True) -> None:
+        self.factory = factory
+        self.max_idle = max_idle
+        self.clear_workspace = clear_workspace
+        self._idle: list[Session] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.created = 0
+        self.reused = 0
+
+    def _check_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._idle.clear()
+            self._loop = loop
+
+    def _create(self) -> Session:
+        session = self.factory()
+        session.client.get_client()
+        self.created += 1
+        return session
+
+    async def acquire(self) -> Session:
+        self._check_loop()
+        if self._idle:
+            self.reused += 1
+            return self._idle.pop()
+        return await self._loop.run_in_executor(None, self._create)
+
+    async def prewarm(self, count: int) -> None:
+        """Build sessions in worker threads until count are idle (capped at max_idle)."""
+        self._check_loop()
+        missing = min(count, self.max_idle) - len(self._idle)
+        if missing <= 0:
+            return
+        sessions = await asyncio.gather(
+            *(self._loop.run_in_executor(None, self._create) for _ in range(missing)),
+            return_exceptions=True,
+        )
+        # A session that cannot be built (e.g. no API key for its route) is reported by acquire()
+        self._idle.extend(session for session in sessions if isinstance(session, Session))
+
+    async def release(self, session: Session) -> None:
+        if self._loop is asyncio.get_running_loop() and len(self._idle) < self.max_idle:
+            session.reset(clear_workspace=self.clear_workspace)
+            self._idle.append(session)
+        else:
+            await session.close()
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for session in idle:
+            await session.client.close()
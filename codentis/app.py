@@ -1,6 +1,8 @@
 """Application with lightweight terminal UI."""
 
 import sys
+import json
+import time
 import asyncio
 import threading
 import signal
@@ -9,16 +11,18 @@ from pathlib import Path
 from codentis.agent.agent import Agent
 from codentis.agent.events import AgentEventType
 from codentis.ui.renderer import TUI
+from codentis.ui.terminal_input import TerminalInput
 from codentis.config import Config
+from codentis.client.http_client import close_http_client
+from codentis.client.usage import get_usage_tracker
+from codentis.config.loader import get_data_dir
+from codentis.tools.middleware import get_tool_metrics
 
-# Platform-specific keyboard handling
+# Platform-specific keyboard handling (POSIX terminals use ui/terminal_input.py)
 try:
     import msvcrt  # Windows
     WINDOWS = True
 except ImportError:
-    import termios
-    import tty
-    import select
     WINDOWS = False
 
 
@@ -29,6 +33,7 @@ class CLI:
         self.tui = TUI(config)
         self.keyboard_listener_running = False
         self.keyboard_thread = None
+        self.terminal_input: TerminalInput | None = None  # stdin as loop events (POSIX terminals)
         self.interrupted = False
         self._original_sigint_handler = None
         
@@ -61,6 +66,7 @@ class CLI:
         """Get user input while ensuring keyboard listener doesn't interfere."""
         was_running = self.keyboard_listener_running
         self.stop_keyboard_listener()
+        self.tui.flush()
         try:
             return input(prompt)
         finally:
@@ -71,6 +77,7 @@ class CLI:
         """Get user input while ensuring keyboard listener doesn't interfere (async)."""
         was_running = self.keyboard_listener_running
         self.stop_keyboard_listener()
+        self.tui.flush()
         try:
             loop = asyncio.get_event_loop()
             return await loop.run_in_executor(None, lambda: input(prompt))
@@ -84,6 +91,8 @@ class CLI:
             """Handle SIGINT (Ctrl+C) in interactive mode."""
             self.interrupted = True
             self.tui.stop_thinking()
+            if self.terminal_input:
+                self.terminal_input.interrupt()  # give up the prompt
             # Don't exit - just set the flag
         
         # Store original handler and set new one
@@ -95,55 +104,60 @@ class CLI:
             signal.signal(signal.SIGINT, self._original_sigint_handler)
             self._original_sigint_handler = None
     
+    def _on_key(self, char: str):
+        """Hotkeys while the agent works; Ctrl+O (ASCII 15) expands the last tool output."""
+        if char == "\x0f":
+            self.tui.toggle_last_tool()
+    
     def _keyboard_listener(self):
-        """Listen for Ctrl+O keypresses in the background."""
-        try:
-            if WINDOWS:
-                # Windows implementation
-                while self.keyboard_listener_running:
-                    try:
-                        if msvcrt.kbhit():
-                            key = msvcrt.getch()
-                            # Ctrl+O is ASCII 15 (0x0F)
-                            if key == b'\x0f':
-                                self.tui.toggle_last_tool()
-                    except Exception:
-                        pass  # Ignore keyboard errors
-                    import time
-                    time.sleep(0.1)  # Reduce CPU usage
-            else:
-                # Unix/Linux/Mac implementation
-                old_settings = termios.tcgetattr(sys.stdin)
-                try:
-                    tty.setcbreak(sys.stdin.fileno())
-                    while self.keyboard_listener_running:
-                        try:
-                            if sys.stdin in select.select([sys.stdin], [], [], 0.1)[0]:
-                                char = sys.stdin.read(1)
-                                # Ctrl+O is ASCII 15
-                                if ord(char) == 15:
-                                    self.tui.toggle_last_tool()
-                        except Exception:
-                            pass  # Ignore keyboard errors
-                finally:
-                    termios.tcsetattr(sys.stdin, termios.TCSADRAIN, old_settings)
-        except Exception:
-            # Silently fail if keyboard listener can't start
-            pass
+        """Poll for Ctrl+O keypresses in the background (Windows consoles)."""
+        while self.keyboard_listener_running:
+            try:
+                if msvcrt.kbhit():
+                    self._on_key(msvcrt.getwch())
+            except Exception:
+                pass  # Ignore keyboard errors
+            time.sleep(0.1)  # Reduce CPU usage
     
     def start_keyboard_listener(self):
-        """Start the keyboard listener thread."""
-        if not self.keyboard_listener_running:
+        """Start listening for Ctrl+O: a loop reader on POSIX terminals, a polling thread on Windows."""
+        if self.terminal_input:
+            self.terminal_input.listen_for_hotkeys()
+            self.keyboard_listener_running = True
+            return
+        if WINDOWS and not self.keyboard_listener_running:
             self.keyboard_listener_running = True
             self.keyboard_thread = threading.Thread(target=self._keyboard_listener, daemon=True)
             self.keyboard_thread.start()
     
     def stop_keyboard_listener(self):
-        """Stop the keyboard listener thread."""
+        """Stop listening for Ctrl+O and give the terminal back in its normal mode."""
         self.keyboard_listener_running = False
+        if self.terminal_input:
+            self.terminal_input.stop()
         if self.keyboard_thread:
             self.keyboard_thread.join(timeout=1)
+            self.keyboard_thread = None
     
+    def _write_stats(self):
+        """Dump tool and model stats for the session as JSON (config.stats_file or <data dir>/stats.json)."""
+        tools = get_tool_metrics().snapshot()
+        models = get_usage_tracker().snapshot()
+        if not tools and not models:
+            return
+        path = self.config.stats_file or get_data_dir() / "stats.json"
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps({
+                "written_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "cwd": str(self.config.cwd),
+                "tools": [stats.to_dict() for stats in tools],
+                "models": [stats.to_dict() for stats in models],
+                "tool_history": self.tui.history.stats(),
+            }, indent=2), encoding="utf-8")
+        except OSError:
+            pass
+
     def _get_thinking_message(self, tool_name: str) -> str:
         """Get appropriate thinking message based on tool being used."""
         return self._thinking_messages.get(tool_name, "Processing")
@@ -176,10 +190,11 @@ class CLI:
 
     async def run_single(self, message: str):
         """Run a single query with same TUI styling as interactive mode."""
+        self.tui.output.start()
         async with Agent(self.config) as agent:
             self.agent = agent
             
-            print(f"\n{self.tui.BOLD}Query:{self.tui.RESET} {message}\n")
+            self.tui.print(f"\n{self.tui.BOLD}Query:{self.tui.RESET} {message}\n")
             
             assistant_streaming = False
             
@@ -238,7 +253,7 @@ class CLI:
                     
                     elif event.type == AgentEventType.AGENT_ERROR:
                         error = event.data.get("error") or "Unknown error occurred"
-                        print(f"\n{self.tui.RED}Error: {error}{self.tui.RESET}\n")
+                        self.tui.print(f"\n{self.tui.RED}Error: {error}{self.tui.RESET}\n")
                         if assistant_streaming:
                             self.tui.end_assistant()
                             assistant_streaming = False
@@ -255,13 +270,13 @@ class CLI:
                             allow_freeform = metadata.get("allow_freeform", True)
                             
                             # Show the question to the user
-                            print(f"\n{self.tui.CYAN}{self.tui.BOLD}Question:{self.tui.RESET} {question}\n")
+                            self.tui.print(f"\n{self.tui.CYAN}{self.tui.BOLD}Question:{self.tui.RESET} {question}\n")
                             
                             if options:
-                                print(f"{self.tui.DIM}Options:{self.tui.RESET}")
+                                self.tui.print(f"{self.tui.DIM}Options:{self.tui.RESET}")
                                 for i, option in enumerate(options, 1):
-                                    print(f"  {self.tui.CYAN}{i}.{self.tui.RESET} {option}")
-                                print()
+                                    self.tui.print(f"  {self.tui.CYAN}{i}.{self.tui.RESET} {option}")
+                                self.tui.print()
                             
                             # Get user response
                             if options and not allow_freeform:
@@ -270,22 +285,22 @@ class CLI:
                                     try:
                                         choice = self._safe_input(f"{self.tui.BOLD}Your choice (1-{len(options)}):{self.tui.RESET} ").strip()
                                         if not choice:
-                                            print(f"{self.tui.RED}Please enter a number between 1 and {len(options)}{self.tui.RESET}")
+                                            self.tui.print(f"{self.tui.RED}Please enter a number between 1 and {len(options)}{self.tui.RESET}")
                                             continue
                                         choice_num = int(choice)
                                         if 1 <= choice_num <= len(options):
                                             user_response = options[choice_num - 1]
                                             break
                                         else:
-                                            print(f"{self.tui.RED}Invalid choice. Please enter a number between 1 and {len(options)}{self.tui.RESET}")
+                                            self.tui.print(f"{self.tui.RED}Invalid choice. Please enter a number between 1 and {len(options)}{self.tui.RESET}")
                                     except ValueError:
-                                        print(f"{self.tui.RED}Invalid input '{choice}'. Please enter a valid number between 1 and {len(options)}{self.tui.RESET}")
+                                        self.tui.print(f"{self.tui.RED}Invalid input '{choice}'. Please enter a valid number between 1 and {len(options)}{self.tui.RESET}")
                                     except EOFError:
-                                        print(f"\n{self.tui.RED}Input interrupted. Defaulting to last option{self.tui.RESET}")
+                                        self.tui.print(f"\n{self.tui.RED}Input interrupted. Defaulting to last option{self.tui.RESET}")
                                         user_response = options[-1] if options else "No"
                                         break
                                     except KeyboardInterrupt:
-                                        print(f"\n{self.tui.RED}Operation cancelled by user{self.tui.RESET}")
+                                        self.tui.print(f"\n{self.tui.RED}Operation cancelled by user{self.tui.RESET}")
                                         user_response = options[-1] if options else "No"
                                         break
                             else:
@@ -295,16 +310,16 @@ class CLI:
                                     user_response = self._safe_input(prompt).strip()
                                     if not user_response:
                                         if options:
-                                            print(f"{self.tui.RED}Please provide an answer or choose from the options above{self.tui.RESET}")
+                                            self.tui.print(f"{self.tui.RED}Please provide an answer or choose from the options above{self.tui.RESET}")
                                             user_response = self._safe_input(prompt).strip()
                                         else:
-                                            print(f"{self.tui.RED}Please provide an answer{self.tui.RESET}")
+                                            self.tui.print(f"{self.tui.RED}Please provide an answer{self.tui.RESET}")
                                             user_response = self._safe_input(prompt).strip()
                                 except EOFError:
-                                    print(f"\n{self.tui.RED}Input interrupted. Defaulting to last option{self.tui.RESET}")
+                                    self.tui.print(f"\n{self.tui.RED}Input interrupted. Defaulting to last option{self.tui.RESET}")
                                     user_response = options[-1] if options else "No"
                                 except KeyboardInterrupt:
-                                    print(f"\n{self.tui.RED}Operation cancelled by user{self.tui.RESET}")
+                                    self.tui.print(f"\n{self.tui.RED}Operation cancelled by user{self.tui.RESET}")
                                     user_response = options[-1] if options else "No"
                                 
                                 # If options provided and user entered a number, validate it
@@ -314,7 +329,7 @@ class CLI:
                                         if 1 <= choice_num <= len(options):
                                             user_response = options[choice_num - 1]
                                         else:
-                                            print(f"{self.tui.YELLOW}Note: '{user_response}' is not a valid option number. Using as freeform response.{self.tui.RESET}")
+                                            self.tui.print(f"{self.tui.YELLOW}Note: '{user_response}' is not a valid option number. Using as freeform response.{self.tui.RESET}")
                                     except ValueError:
                                         pass  # Use the freeform response
                             
@@ -342,13 +357,18 @@ class CLI:
                 self.tui.stop_thinking()
                 
             except Exception as e:
-                print(f"\n{self.tui.RED}Error processing message: {str(e)}{self.tui.RESET}\n")
+                self.tui.print(f"\n{self.tui.RED}Error processing message: {str(e)}{self.tui.RESET}\n")
                 import traceback
+                self.tui.flush()
                 traceback.print_exc()
                 if assistant_streaming:
                     self.tui.end_assistant()
             
-            print("\n")
+            self.tui.print("\n")
+        
+        await self.tui.output.stop()
+        await close_http_client()
+        self._write_stats()
     
     async def run_interactive(self):
         """Run interactive mode."""
@@ -371,7 +391,11 @@ class CLI:
             ]
         )
         
+        # Frames (streamed text, tool lines, spinner) are drawn by one task from here on
+        self.tui.output.start()
+        
         # Start keyboard listener for Ctrl+O
+        self.terminal_input = TerminalInput.create(self._on_key)
         self.start_keyboard_listener()
         
         # Set up signal handlers for Ctrl+C
@@ -385,7 +409,7 @@ class CLI:
                     try:
                         # Check if we were interrupted by signal handler
                         if self.interrupted:
-                            print(f"\n{self.tui.YELLOW}Operation interrupted. Type /exit to quit interactive mode.{self.tui.RESET}")
+                            self.tui.print(f"\n{self.tui.YELLOW}Operation interrupted. Type /exit to quit interactive mode.{self.tui.RESET}")
                             self.interrupted = False  # Reset flag
                             continue
                         
@@ -396,13 +420,13 @@ class CLI:
                                 # We stop listener inside this block as needed
                                 self.stop_keyboard_listener()
                                 import msvcrt
-                                print(f"\n{self.tui.BOLD}❯{self.tui.RESET} ", end="", flush=True)
+                                self.tui.print(f"\n{self.tui.BOLD}❯{self.tui.RESET} ", end="", flush=True)
                                 user_input = ""
                                 
                                 while True:
                                     # Check if interrupted by signal handler
                                     if self.interrupted:
-                                        print(f"\n{self.tui.YELLOW}Operation interrupted. Type /exit to quit interactive mode.{self.tui.RESET}")
+                                        self.tui.print(f"\n{self.tui.YELLOW}Operation interrupted. Type /exit to quit interactive mode.{self.tui.RESET}")
                                         self.interrupted = False
                                         user_input = None
                                         break
@@ -413,27 +437,27 @@ class CLI:
                                         
                                         # Handle Ctrl+C (ASCII 3)
                                         if char == b'\x03':
-                                            print(f"\n{self.tui.YELLOW}Operation interrupted. Type /exit to quit interactive mode.{self.tui.RESET}")
+                                            self.tui.print(f"\n{self.tui.YELLOW}Operation interrupted. Type /exit to quit interactive mode.{self.tui.RESET}")
                                             user_input = None
                                             break
                                         
                                         # Handle Enter (ASCII 13)
                                         elif char == b'\r':
-                                            print()  # New line
+                                            self.tui.print()  # New line
                                             break
                                         
                                         # Handle Backspace (ASCII 8)
                                         elif char == b'\x08':
                                             if user_input:
                                                 user_input = user_input[:-1]
-                                                print('\b \b', end="", flush=True)
+                                                self.tui.print('\b \b', end="", flush=True)
                                         
                                         # Handle regular characters
                                         elif char >= b' ':
                                             try:
                                                 decoded_char = char.decode('utf-8')
                                                 user_input += decoded_char
-                                                print(decoded_char, end="", flush=True)
+                                                self.tui.print(decoded_char, end="", flush=True)
                                             except UnicodeDecodeError:
                                                 pass  # Ignore invalid characters
                                     
@@ -444,17 +468,22 @@ class CLI:
                                     user_input = user_input.strip()
                                 
                                 self.start_keyboard_listener()
+                            elif self.terminal_input:
+                                # POSIX terminal: the line arrives as a loop event, no reader thread
+                                self.tui.print(f"{self.tui.BOLD}❯{self.tui.RESET} ", end="", flush=True)
+                                user_input = await self.terminal_input.read_line()
                             else:
-                                # Unix/Linux input handling
+                                # stdin is not a terminal
                                 user_input = await self._safe_input_async(f"{self.tui.BOLD}❯{self.tui.RESET} ")
                             
                             if user_input is None:
                                 if not WINDOWS:
-                                    print(f"\n{self.tui.YELLOW}Operation interrupted. Type /exit to quit interactive mode.{self.tui.RESET}")
+                                    self.tui.print(f"\n{self.tui.YELLOW}Operation interrupted. Type /exit to quit interactive mode.{self.tui.RESET}")
+                                    self.interrupted = False
                                 continue
                         except KeyboardInterrupt:
                             # Handle Ctrl+C during input
-                            print(f"\n{self.tui.YELLOW}Operation interrupted. Type /exit to quit interactive mode.{self.tui.RESET}")
+                            self.tui.print(f"\n{self.tui.YELLOW}Operation interrupted. Type /exit to quit interactive mode.{self.tui.RESET}")
                             self.start_keyboard_listener()
                             continue
                         except EOFError:
@@ -475,6 +504,14 @@ class CLI:
                             # List all tool outputs
                             self.tui.list_tools()
                             continue
+                        elif user_input.lower() == "/usage":
+                            # Tokens and latency per model
+                            self.tui.print_model_usage(get_usage_tracker().snapshot())
+                            continue
+                        elif user_input.lower() == "/stats":
+                            # Latency, bytes and tokens per tool
+                            self.tui.print_tool_stats(get_tool_metrics().snapshot())
+                            continue
                         elif user_input.lower().startswith("/e "):
                             # Expand specific tool by ID
                             parts = user_input.split()
@@ -482,7 +519,7 @@ class CLI:
                                 tool_id = parts[1]
                                 self.tui.toggle_tool(tool_id)
                             else:
-                                print(f"{self.tui.RED}Usage: /e <id>{self.tui.RESET}")
+                                self.tui.print(f"{self.tui.RED}Usage: /e <id>{self.tui.RESET}")
                             continue
                         elif user_input.lower() in ("/expand", "/e"):
                             # Expand last tool output
@@ -494,7 +531,7 @@ class CLI:
                             await self._process_message(user_input)
                         except KeyboardInterrupt:
                             # Handle Ctrl+C during message processing
-                            print(f"\n{self.tui.YELLOW}Operation interrupted. Type /exit to quit interactive mode.{self.tui.RESET}")
+                            self.tui.print(f"\n{self.tui.YELLOW}Operation interrupted. Type /exit to quit interactive mode.{self.tui.RESET}")
                             continue
                         
                         # Check if interrupted during processing
@@ -503,30 +540,33 @@ class CLI:
                     
                     except KeyboardInterrupt:
                         # Catch any KeyboardInterrupt that escapes the inner try block
-                        print(f"\n{self.tui.YELLOW}Operation interrupted. Type /exit to quit interactive mode.{self.tui.RESET}")
+                        self.tui.print(f"\n{self.tui.YELLOW}Operation interrupted. Type /exit to quit interactive mode.{self.tui.RESET}")
                         continue
                     except EOFError:
                         return  # Exit the entire interactive session
                     except Exception as e:
-                        print(f"\n{self.tui.RED}Unexpected error: {str(e)}{self.tui.RESET}")
+                        self.tui.print(f"\n{self.tui.RED}Unexpected error: {str(e)}{self.tui.RESET}")
                         continue
         
         except KeyboardInterrupt:
             # Final catch-all for KeyboardInterrupt - should never reach here
-            print(f"\n{self.tui.YELLOW}Operation interrupted. Type /exit to quit interactive mode.{self.tui.RESET}")
+            self.tui.print(f"\n{self.tui.YELLOW}Operation interrupted. Type /exit to quit interactive mode.{self.tui.RESET}")
         except Exception as e:
-            print(f"\n{self.tui.RED}Unexpected error: {str(e)}{self.tui.RESET}")
+            self.tui.print(f"\n{self.tui.RED}Unexpected error: {str(e)}{self.tui.RESET}")
         
         finally:
             self.stop_keyboard_listener()
             self._restore_signal_handlers()
-            print(f"\n{self.tui.GRAY}{'─' * 80}{self.tui.RESET}")
-            print(f"\n{self.tui.DIM}Goodbye!{self.tui.RESET}\n")
+            await close_http_client()
+            self._write_stats()
+            self.tui.print(f"\n{self.tui.GRAY}{'─' * 80}{self.tui.RESET}")
+            self.tui.print(f"\n{self.tui.DIM}Goodbye!{self.tui.RESET}\n")
+            await self.tui.output.stop()
     
     async def _process_message(self, message: str):
         """Process a message through the agent."""
         if not self.agent:
-            print(f"{self.tui.RED}Error: Agent not initialized{self.tui.RESET}")
+            self.tui.print(f"{self.tui.RED}Error: Agent not initialized{self.tui.RESET}")
             return
         
         assistant_streaming = False
@@ -592,7 +632,7 @@ class CLI:
                 
                 elif event.type == AgentEventType.AGENT_ERROR:
                     error = event.data.get("error") or "Unknown error occurred"
-                    print(f"\n{self.tui.RED}Error: {error}{self.tui.RESET}\n")
+                    self.tui.print(f"\n{self.tui.RED}Error: {error}{self.tui.RESET}\n")
                     if assistant_streaming:
                         self.tui.end_assistant()
                         assistant_streaming = False
@@ -609,13 +649,13 @@ class CLI:
                         allow_freeform = metadata.get("allow_freeform", True)
                         
                         # Show the question to the user
-                        print(f"\n{self.tui.CYAN}{self.tui.BOLD}Question:{self.tui.RESET} {question}\n")
+                        self.tui.print(f"\n{self.tui.CYAN}{self.tui.BOLD}Question:{self.tui.RESET} {question}\n")
                         
                         if options:
-                            print(f"{self.tui.DIM}Options:{self.tui.RESET}")
+                            self.tui.print(f"{self.tui.DIM}Options:{self.tui.RESET}")
                             for i, option in enumerate(options, 1):
-                                print(f"  {self.tui.CYAN}{i}.{self.tui.RESET} {option}")
-                            print()
+                                self.tui.print(f"  {self.tui.CYAN}{i}.{self.tui.RESET} {option}")
+                            self.tui.print()
                         
                         # Get user response
                         if options and not allow_freeform:
@@ -624,22 +664,22 @@ class CLI:
                                 try:
                                     choice = self._safe_input(f"{self.tui.BOLD}Your choice (1-{len(options)}):{self.tui.RESET} ").strip()
                                     if not choice:
-                                        print(f"{self.tui.RED}Please enter a number between 1 and {len(options)}{self.tui.RESET}")
+                                        self.tui.print(f"{self.tui.RED}Please enter a number between 1 and {len(options)}{self.tui.RESET}")
                                         continue
                                     choice_num = int(choice)
                                     if 1 <= choice_num <= len(options):
                                         user_response = options[choice_num - 1]
                                         break
                                     else:
-                                        print(f"{self.tui.RED}Invalid choice. Please enter a number between 1 and {len(options)}{self.tui.RESET}")
+                                        self.tui.print(f"{self.tui.RED}Invalid choice. Please enter a number between 1 and {len(options)}{self.tui.RESET}")
                                 except ValueError:
-                                    print(f"{self.tui.RED}Invalid input '{choice}'. Please enter a valid number between 1 and {len(options)}{self.tui.RESET}")
+                                    self.tui.print(f"{self.tui.RED}Invalid input '{choice}'. Please enter a valid number between 1 and {len(options)}{self.tui.RESET}")
                                 except EOFError:
-                                    print(f"\n{self.tui.RED}Input interrupted. Defaulting to last option{self.tui.RESET}")
+                                    self.tui.print(f"\n{self.tui.RED}Input interrupted. Defaulting to last option{self.tui.RESET}")
                                     user_response = options[-1] if options else "No"
                                     break
                                 except KeyboardInterrupt:
-                                    print(f"\n{self.tui.RED}Operation cancelled by user{self.tui.RESET}")
+                                    self.tui.print(f"\n{self.tui.RED}Operation cancelled by user{self.tui.RESET}")
                                     user_response = options[-1] if options else "No"
                                     break
                         else:
@@ -649,16 +689,16 @@ class CLI:
                                 user_response = self._safe_input(prompt).strip()
                                 if not user_response:
                                     if options:
-                                        print(f"{self.tui.RED}Please provide an answer or choose from the options above{self.tui.RESET}")
+                                        self.tui.print(f"{self.tui.RED}Please provide an answer or choose from the options above{self.tui.RESET}")
                                         user_response = self._safe_input(prompt).strip()
                                     else:
-                                        print(f"{self.tui.RED}Please provide an answer{self.tui.RESET}")
+                                        self.tui.print(f"{self.tui.RED}Please provide an answer{self.tui.RESET}")
                                         user_response = self._safe_input(prompt).strip()
                             except EOFError:
-                                print(f"\n{self.tui.RED}Input interrupted. Defaulting to last option{self.tui.RESET}")
+                                self.tui.print(f"\n{self.tui.RED}Input interrupted. Defaulting to last option{self.tui.RESET}")
                                 user_response = options[-1] if options else "No"
                             except KeyboardInterrupt:
-                                print(f"\n{self.tui.RED}Operation cancelled by user{self.tui.RESET}")
+                                self.tui.print(f"\n{self.tui.RED}Operation cancelled by user{self.tui.RESET}")
                                 user_response = options[-1] if options else "No"
                             
                             # If options provided and user entered a number, validate it
@@ -668,7 +708,7 @@ class CLI:
                                     if 1 <= choice_num <= len(options):
                                         user_response = options[choice_num - 1]
                                     else:
-                                        print(f"{self.tui.YELLOW}Note: '{user_response}' is not a valid option number. Using as freeform response.{self.tui.RESET}")
+                                        self.tui.print(f"{self.tui.YELLOW}Note: '{user_response}' is not a valid option number. Using as freeform response.{self.tui.RESET}")
                                 except ValueError:
                                     pass  # Use the freeform response
                         
@@ -704,8 +744,9 @@ class CLI:
             # Don't re-raise - let the caller handle it
             return
         except Exception as e:
-            print(f"\n{self.tui.RED}Error processing message: {str(e)}{self.tui.RESET}\n")
+            self.tui.print(f"\n{self.tui.RED}Error processing message: {str(e)}{self.tui.RESET}\n")
             import traceback
+            self.tui.flush()
             traceback.print_exc()
             if assistant_streaming:
                 self.tui.end_assistant()
@@ -722,14 +763,14 @@ class CLI:
         codentis_md_path = Path(self.config.cwd) / "CODENTIS.md"
         
         if codentis_md_path.exists():
-            print(f"{self.tui.YELLOW}CODENTIS.md already exists. Overwrite? (y/N):{self.tui.RESET} ", end="", flush=True)
+            self.tui.print(f"{self.tui.YELLOW}CODENTIS.md already exists. Overwrite? (y/N):{self.tui.RESET} ", end="", flush=True)
             try:
                 response = self._safe_input().strip().lower()
                 if response not in ['y', 'yes']:
-                    print(f"{self.tui.CYAN}Cancelled. CODENTIS.md was not modified.{self.tui.RESET}")
+                    self.tui.print(f"{self.tui.CYAN}Cancelled. CODENTIS.md was not modified.{self.tui.RESET}")
                     return
             except (KeyboardInterrupt, EOFError):
-                print(f"\n{self.tui.CYAN}Cancelled. CODENTIS.md was not modified.{self.tui.RESET}")
+                self.tui.print(f"\n{self.tui.CYAN}Cancelled. CODENTIS.md was not modified.{self.tui.RESET}")
                 return
         
         content = f"""# Codentis Instructions
@@ -766,6 +807,8 @@ This is a {Path(self.config.cwd).name} project. Codentis can help you with:
 
 2. **Use Codentis commands**:
    - `/list` - Show all tool outputs with IDs
+   - `/usage` - Show tokens and latency per model
+   - `/stats` - Show latency, bytes and tokens per tool
    - `/e <id>` - Expand/collapse specific tool output
    - `/e` - Expand/collapse last tool output
    - `/exit` - Quit Codentis
@@ -806,9 +849,9 @@ Add any project-specific information here:
             with open(codentis_md_path, 'w', encoding='utf-8') as f:
                 f.write(content)
             
-            print(f"{self.tui.GREEN}✓ Created CODENTIS.md with project instructions{self.tui.RESET}")
-            print(f"{self.tui.DIM}Location: {codentis_md_path}{self.tui.RESET}")
-            print(f"{self.tui.CYAN}You can edit this file to add project-specific instructions for Codentis.{self.tui.RESET}")
+            self.tui.print(f"{self.tui.GREEN}✓ Created CODENTIS.md with project instructions{self.tui.RESET}")
+            self.tui.print(f"{self.tui.DIM}Location: {codentis_md_path}{self.tui.RESET}")
+            self.tui.print(f"{self.tui.CYAN}You can edit this file to add project-specific instructions for Codentis.{self.tui.RESET}")
             
         except Exception as e:
-            print(f"{self.tui.RED}Error creating CODENTIS.md: {str(e)}{self.tui.RESET}")
\ No newline at end of file
+            self.tui.print(f"{self.tui.RED}Error creating CODENTIS.md: {str(e)}{self.tui.RESET}")
\ No newline at end of file
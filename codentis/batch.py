@@ -0,0 +1,209 @@
+"""Run many prompts across workspaces in one process (`codentis batch`).
+
+Jobs come from a JSONL file, one {"cwd": ..., "prompt": ...} object per
+line, with an optional "id" (the line number otherwise). They run on one
+event loop, at most `workers` at a time, so Python start-up and imports
+are paid once. All jobs go through the process-wide LLM rate limiter
+(created with the first job's max_concurrent_requests and
+requests_per_minute), and they share one OpenAI client, and its
+connection pool, per endpoint and API key.
+
+Each finished job appends one line to the results file, as soon as it
+finishes:
+
+    {"id": "3", "cwd": "...", "prompt": "...", "status": "ok" | "error",
+     "response": "...", "error": null, "usage": {...}, "tool_calls": 4,
+     "attempts": 1, "duration": 12.5}
+
+A job that fails with an agent or API error is tried again up to
+`retries` more times. Re-running with resume=True skips jobs that already
+have an "ok" line in the results file, so only failed and unfinished jobs
+run again.
+"""
+from __future__ import annotations
+import asyncio
+import json
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, TextIO
+from codentis.agent.agent import Agent
+from codentis.agent.events import AgentEventType
+from codentis.agent.session import Session
+from codentis.client.http_client import close_http_client
+from codentis.client.llm_client import SharedClients
+from codentis.config.loader import load_config
+from codentis.utils.errors import ConfigError
+from codentis.utils.workspace_trust import get_workspace_trust
+
+RETRY_BACKOFF_SECONDS = 2.0
+MAX_RETRY_BACKOFF_SECONDS = 30.0
+
+
+@dataclass
+class BatchJob:
+    id: str
+    cwd: Path
+    prompt: str
+
+
+class JobError(Exception):
+    """A job that cannot run at all (bad workspace or config); not retried."""
+
+
+def load_jobs(path: Path) -> list[BatchJob]:
+    """Parse a jobs file; raises ValueError naming the first bad line."""
+    jobs = []
+    seen: set[str] = set()
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+                job = BatchJob(str(data.get("id", number)), Path(data["cwd"]).expanduser().resolve(), str(data["prompt"]))
+            except (json.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+                raise ValueError(f"{path}:{number}: expected a JSON object with 'cwd' and 'prompt' ({e})") from e
+            if job.id in seen:
+                raise ValueError(f"{path}:{number}: duplicate job id '{job.id}'")
+            seen.add(job.id)
+            jobs.append(job)
+    return jobs
+
+
+def completed_job_ids(path: Path) -> set[str]:
+    """Ids with an "ok" result in an existing results file."""
+    done = set()
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a line cut short by an interrupted run
+                if isinstance(result, dict) and result.get("status") == "ok":
+                    done.add(str(result.get("id")))
+    except FileNotFoundError:
+        pass
+    return done
+
+
+async def run_batch(
+    jobs: list[BatchJob],
+    output: Path,
+    workers: int = 4,
+    retries: int = 1,
+    resume: bool = False,
+    log: TextIO | None = None,
+) -> int:
+    """Run jobs and append their results to output; returns 1 if any job failed, else 0."""
+    log = log or sys.stderr
+    if resume:
+        done = completed_job_ids(output)
+        skipped = sum(1 for job in jobs if job.id in done)
+        jobs = [job for job in jobs if job.id not in done]
+        if skipped:
+            print(f"Skipping {skipped} jobs already completed in {output}", file=log)
+
+    shared_clients: SharedClients = {}
+    semaphore = asyncio.Semaphore(max(1, workers))
+    failed = 0
+    started = time.perf_counter()
+
+    async def worker(job: BatchJob) -> dict[str, Any]:
+        async with semaphore:
+            return await _run_with_retries(job, retries, shared_clients)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with open(output, "a" if resume else "w", encoding="utf-8") as out:
+            tasks = [asyncio.create_task(worker(job)) for job in jobs]
+            for finished, task in enumerate(asyncio.as_completed(tasks), 1):
+                result = await task
+                out.write(json.dumps(result, ensure_ascii=False, default=str) + "\n")
+                out.flush()
+                if result["status"] != "ok":
+                    failed += 1
+                detail = f" - {result['error']}" if result["error"] else ""
+                print(f"[{finished}/{len(jobs)}] {result['status']:<5} {result['id']} ({result['duration']:.1f}s){detail}", file=log)
+    finally:
+        for client in shared_clients.values():
+            await client.close()
+        await close_http_client()
+
+    elapsed = time.perf_counter() - started
+    print(f"{len(jobs) - failed} ok, {failed} failed in {elapsed:.1f}s; results in {output}", file=log)
+    return 1 if failed else 0
+
+
+async def _run_with_retries(job: BatchJob, retries: int, shared_clients: SharedClients) -> dict[str, Any]:
+    started = time.perf_counter()
+    result: dict[str, Any] = {}
+    for attempt in range(1, retries + 2):
+        try:
+            result = await _run_job(job, shared_clients)
+        except JobError as e:
+            result = _result(job, "error", error=str(e))
+            break
+        except Exception as e:
+            result = _result(job, "error", error=f"{type(e).__name__}: {e}")
+        result["attempts"] = attempt
+        if result["status"] == "ok" or attempt > retries:
+            break
+        await asyncio.sleep(min(MAX_RETRY_BACKOFF_SECONDS, RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)))
+    result["duration"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+async def _run_job(job: BatchJob, shared_clients: SharedClients) -> dict[str, Any]:
+    if not job.cwd.is_dir():
+        raise JobError(f"Not a directory: {job.cwd}")
+    if not get_workspace_trust().is_trusted(job.cwd):
+        raise JobError(f"Workspace not trusted: {job.cwd} (run 'codentis trust add {job.cwd}')")
+    try:
+        config = load_config(job.cwd)
+    except ConfigError as e:
+        raise JobError(str(e)) from e
+    errors = config.validate()
+    if errors:
+        raise JobError("; ".join(errors))
+
+    session = Session(config, shared_clients=shared_clients)
+    response: str | None = None
+    error: str | None = None
+    tool_calls = 0
+    try:
+        async with Agent(config, session=session) as agent:
+            async for event in agent.run(job.prompt):
+                if event.type == AgentEventType.TOOL_CALL_START:
+                    tool_calls += 1
+                elif event.type == AgentEventType.AGENT_ERROR:
+                    error = event.data.get("error") or "Unknown error"
+                elif event.type == AgentEventType.AGENT_END:
+                    response = event.data.get("response")
+    finally:
+        await session.close()
+    return _result(
+        job,
+        "error" if error else "ok",
+        response=response,
+        error=error,
+        usage=session.usage.__dict__,
+        tool_calls=tool_calls,
+    )
+
+
+def _result(job: BatchJob, status: str, response: str | None = None, error: str | None = None,
+            usage: dict[str, int] | None = None, tool_calls: int = 0) -> dict[str, Any]:
+    return {
+        "id": job.id,
+        "cwd": str(job.cwd),
+        "prompt": job.prompt,
+        "status": status,
+        "response": response,
+        "error": error,
+        "usage": usage,
+        "tool_calls": tool_calls,
+        "attempts": 1,
+    }
@@ -1,17 +1,12 @@
 """CLI interface for Codentis."""
 import sys
-import asyncio
 import typer
 from pathlib import Path
 from typing import Optional
 
 from codentis import __version__
-from codentis.config import load_config
-from codentis.config.setup_wizard import check_and_run_setup
-from codentis.config.config_manager import ConfigManager
-from codentis.app import CLI
 from codentis.utils.errors import ConfigError
-from codentis.utils.workspace_trust import check_workspace_trust
+from codentis.utils.warmup import start_warmup
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
@@ -19,6 +14,10 @@ from rich.text import Text
 
 console = Console()
 
+# The agent stack (codentis.app, the config models and, through them, pydantic
+# and httpx) is imported inside the commands that need it, so `codentis
+# version` and `--help` stay fast. scripts/import_report.py checks the budget.
+
 app = typer.Typer(
     name="codentis",
     help="An intelligent CLI AI agent for developers",
@@ -44,15 +43,48 @@ def handle_exception(e: Exception) -> None:
 def chat(
     prompt: Optional[str] = typer.Argument(None, help="Optional prompt to send to the agent"),
     cwd: Optional[str] = typer.Option(None, "--cwd", help="Working directory"),
+    output: str = typer.Option("text", "--output", help="Output for a prompt: 'text' (terminal UI) or 'jsonl' (one JSON event per line, no UI)"),
+    delta_coalesce_ms: float = typer.Option(0.0, "--delta-coalesce-ms", min=0, help="With --output jsonl, join text deltas arriving within this many ms into one line"),
+    daemon: bool = typer.Option(False, "--daemon", help="Send the prompt to the running 'codentis serve' daemon instead of starting an agent here"),
+    session: Optional[str] = typer.Option(None, "--session", help="With --daemon, continue the daemon's conversation with this name"),
 ):
     """
     Start an interactive chat session with the AI agent (default command).
     """
+    if daemon or session:
+        # Normally handled by codentis.launcher before this module is imported
+        from codentis.daemon_client import forward_chat
+        if not daemon or not prompt:
+            print("Error: --daemon needs a prompt, and --session needs --daemon", file=sys.stderr)
+            sys.exit(1)
+        if output not in ("text", "jsonl"):
+            print(f"Error: --output must be 'text' or 'jsonl', not '{output}'", file=sys.stderr)
+            sys.exit(1)
+        sys.exit(forward_chat(prompt, Path(cwd) if cwd else None, output, delta_coalesce_ms, session))
+
+    start_warmup()
+
+    # Headless runs keep stdout for JSON lines and never prompt
+    headless = output == "jsonl"
+    if output not in ("text", "jsonl"):
+        print(f"Error: --output must be 'text' or 'jsonl', not '{output}'", file=sys.stderr)
+        sys.exit(1)
+    if headless and not prompt:
+        print("Error: --output jsonl needs a prompt", file=sys.stderr)
+        sys.exit(1)
+    err = sys.stderr if headless else sys.stdout
+
+    import asyncio
+    from codentis.app import CLI
+    from codentis.config import load_config
+    from codentis.config.setup_wizard import check_and_run_setup
+    from codentis.utils.workspace_trust import check_workspace_trust, get_workspace_trust
+
     # Check for updates (once per day)
     try:
         from codentis.utils.updater import check_for_updates, should_check_for_updates, mark_update_checked
         
-        if should_check_for_updates():
+        if not headless and should_check_for_updates():
             update_info = check_for_updates()
             if update_info:
                 console.print()
@@ -73,21 +105,26 @@ def chat(
         if cwd:
             cwd_path = Path(cwd).resolve()
             if not cwd_path.exists():
-                print(f"Error: Directory does not exist: {cwd}")
+                print(f"Error: Directory does not exist: {cwd}", file=err)
                 sys.exit(1)
             if not cwd_path.is_dir():
-                print(f"Error: Not a directory: {cwd}")
+                print(f"Error: Not a directory: {cwd}", file=err)
                 sys.exit(1)
         else:
             cwd_path = Path.cwd()
         
         # Check workspace trust
-        if not check_workspace_trust(cwd_path):
+        if headless:
+            if not get_workspace_trust().is_trusted(cwd_path):
+                print("Error: Workspace not trusted. Run 'codentis chat' here once to trust it.", file=err)
+                sys.exit(1)
+        elif not check_workspace_trust(cwd_path):
             print("Workspace not trusted. Exiting.")
             sys.exit(0)
         
-        # Check and run setup if needed
-        user_config = check_and_run_setup(cwd_path)
+        # Check and run setup if needed (headless runs report a missing setup as a config error)
+        if not headless:
+            user_config = check_and_run_setup(cwd_path)
         
         # Load full configuration
         config = load_config(cwd_path)
@@ -95,13 +132,16 @@ def chat(
         # Validate configuration
         errors = config.validate()
         if errors:
-            print("Configuration errors:")
+            print("Configuration errors:", file=err)
             for error in errors:
-                print(f"  • {error}")
-            print("\nRun 'codentis config' to reconfigure.")
+                print(f"  • {error}", file=err)
+            print("\nRun 'codentis config' to reconfigure.", file=err)
             sys.exit(1)
         
         # Run the agent
+        if headless:
+            from codentis.headless import run_jsonl
+            sys.exit(asyncio.run(run_jsonl(config, prompt, delta_coalesce_ms)))
         cli = CLI(config)
         if prompt:
             # Single prompt mode
@@ -118,6 +158,78 @@ def chat(
     except Exception as e:
         handle_exception(e)
 
+@app.command()
+def batch(
+    jobs_file: Path = typer.Argument(..., help='JSONL file with one {"cwd": ..., "prompt": ...} job per line'),
+    output: Path = typer.Option(Path("batch-results.jsonl"), "--output", "-o", help="JSONL file for one result (response, usage, error) per job"),
+    workers: int = typer.Option(4, "--workers", "-w", min=1, help="Jobs run at the same time"),
+    retries: int = typer.Option(1, "--retries", min=0, help="Extra attempts for a job that fails with an agent or API error"),
+    resume: bool = typer.Option(False, "--resume", help="Append to --output and skip jobs that already succeeded there (re-runs failed ones)"),
+):
+    """
+    Run many prompts, each in its own workspace, concurrently in one process.
+    """
+    start_warmup()
+
+    import asyncio
+    from codentis.batch import load_jobs, run_batch
+
+    try:
+        jobs = load_jobs(jobs_file)
+    except (OSError, ValueError) as e:
+        console.print(f"[bold red]Error:[/bold red] {e}")
+        sys.exit(1)
+    try:
+        sys.exit(asyncio.run(run_batch(jobs, output, workers=workers, retries=retries, resume=resume)))
+    except KeyboardInterrupt:
+        print(f"\nBatch interrupted. Finished jobs are in {output}; rerun with --resume to continue.")
+        sys.exit(130)
+
+@app.command()
+def serve(
+    socket: Optional[Path] = typer.Option(None, "--socket", help="Unix socket to listen on (default: $CODENTIS_SOCKET or a private per-user directory)"),
+    idle_timeout: float = typer.Option(0.0, "--idle-timeout", min=0, help="Exit after this many minutes without requests (0: never)"),
+    status: bool = typer.Option(False, "--status", help="Show whether a daemon is running and what it has warm"),
+    stop: bool = typer.Option(False, "--stop", help="Stop the running daemon"),
+):
+    """
+    Run a resident daemon that keeps sessions warm for 'codentis chat --daemon'.
+    """
+    from codentis.daemon_client import DaemonClient, DaemonError, socket_path
+
+    path = socket or socket_path()
+    if status or stop:
+        try:
+            with DaemonClient(path).connect() as client:
+                if stop:
+                    client.call("shutdown")
+                    console.print(f"[green]✓[/green] Daemon on {path} stopped.")
+                    return
+                info = client.call("ping")
+        except DaemonError as e:
+            console.print(f"[yellow]{e}[/yellow]")
+            sys.exit(1)
+        console.print(f"Daemon v{info['version']} (pid {info['pid']}) on {path}, up {info['uptime']:.0f}s, {info['requests']} requests")
+        for workspace in info["workspaces"]:
+            console.print(f"  workspace: {workspace}")
+        for name in info["sessions"]:
+            console.print(f"  session:   {name}")
+        return
+
+    if sys.platform == "win32":
+        console.print("[bold red]Error:[/bold red] codentis serve needs Unix-domain sockets and is not available on Windows.")
+        sys.exit(1)
+    start_warmup()
+
+    import asyncio
+    from codentis.daemon import serve as serve_daemon
+
+    try:
+        asyncio.run(serve_daemon(path, idle_timeout * 60))
+    except (OSError, RuntimeError, DaemonError) as e:
+        console.print(f"[bold red]Error:[/bold red] {e}")
+        sys.exit(1)
+
 @app.command()
 def config(
     show: bool = typer.Option(False, "--show", help="Show current configuration"),
@@ -126,6 +238,8 @@ def config(
     """
     Manage Codentis configuration.
     """
+    from codentis.config.config_manager import ConfigManager
+
     try:
         config_manager = ConfigManager()
         
@@ -172,6 +286,7 @@ def doctor():
     """
     import platform
     import httpx
+    from codentis.config.config_manager import ConfigManager
     
     console.print()
     console.print(Panel(
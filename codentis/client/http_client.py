@@ -0,0 +1,375 @@
+"""Shared HTTP client and on-disk response cache for the network tools.
+
+A single pooled httpx.AsyncClient is kept per event loop so repeated fetches
+reuse connections. Responses are streamed and reading stops at a byte
+budget. Successful responses are cached under the data dir and reused or
+revalidated according to Cache-Control, ETag and Last-Modified.
+"""
+from __future__ import annotations
+import asyncio
+import codecs
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Protocol
+import httpx
+from codentis.config.loader import get_data_dir
+from codentis.utils.blocking import run_blocking
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024
+# Bodies kept in memory across all entries; the rest are read from disk
+MEMORY_MAX_BYTES = 32 * 1024 * 1024
+# Heuristic freshness for responses with Last-Modified but no explicit
+# lifetime (RFC 9111 4.2.2): 10% of the document age, capped at one day.
+HEURISTIC_FRACTION = 0.1
+HEURISTIC_MAX_AGE = 24 * 60 * 60
+
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30),
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client, _client_loop
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+
+class BodyConsumer(Protocol):
+    """Receives the decoded body while it downloads; see fetch()."""
+
+    done: bool
+
+    def start(self, content_type: str) -> None: ...
+
+    def feed(self, text: str) -> None: ...
+
+
+def _charset(content_type: str) -> str:
+    for part in content_type.split(";"):
+        name, _, value = part.strip().partition("=")
+        if name.lower() == "charset" and value:
+            return value.strip('"')
+    return "utf-8"
+
+
+def _parse_cache_control(value: str | None) -> dict[str, str | None]:
+    directives: dict[str, str | None] = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else None
+    return directives
+
+
+def _parse_http_date(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    status_code: int
+    headers: dict[str, str]
+    body: bytes
+    stored_at: float = field(default_factory=time.time)
+    truncated: bool = False
+    from_cache: bool = False
+
+    @property
+    def encoding(self) -> str:
+        return _charset(self.headers.get("content-type", ""))
+
+    @property
+    def text(self) -> str:
+        try:
+            return self.body.decode(self.encoding, errors="replace")
+        except LookupError:
+            return self.body.decode("utf-8", errors="replace")
+
+    def freshness_lifetime(self) -> float:
+        directives = _parse_cache_control(self.headers.get("cache-control"))
+        if "no-cache" in directives:
+            return 0
+        for name in ("s-maxage", "max-age"):
+            if directives.get(name):
+                try:
+                    return float(directives[name])
+                except ValueError:
+                    return 0
+
+        date = _parse_http_date(self.headers.get("date")) or self.stored_at
+        expires = _parse_http_date(self.headers.get("expires"))
+        if expires is not None:
+            return max(0.0, expires - date)
+
+        last_modified = _parse_http_date(self.headers.get("last-modified"))
+        if last_modified is not None:
+            return min(HEURISTIC_MAX_AGE, max(0.0, date - last_modified) * HEURISTIC_FRACTION)
+        return 0
+
+    def is_fresh(self, now: float | None = None) -> bool:
+        now = time.time() if now is None else now
+        return now - self.stored_at < self.freshness_lifetime()
+
+    def is_storable(self) -> bool:
+        directives = _parse_cache_control(self.headers.get("cache-control"))
+        if self.status_code != 200 or "no-store" in directives:
+            return False
+        return bool(
+            self.freshness_lifetime() > 0
+            or self.headers.get("etag")
+            or self.headers.get("last-modified")
+        )
+
+
+class HttpCache:
+    """Two-level (memory + disk) cache of GET responses keyed by URL.
+
+    The memory level is an LRU bounded by body bytes (memory_max_bytes);
+    older entries are read back from disk. get() and put() do file I/O,
+    so async callers run them through run_blocking, as fetch() does.
+    Entries are never changed once cached: callers get copies to adjust.
+    """
+
+    CACHED_HEADERS = ("content-type", "cache-control", "etag", "last-modified", "expires", "date")
+
+    def __init__(self, cache_dir: Path | None = None, max_entries: int = 500, memory_max_bytes: int = MEMORY_MAX_BYTES) -> None:
+        self.cache_dir = cache_dir or get_data_dir() / "http_cache"
+        self.max_entries = max_entries
+        self.memory_max_bytes = memory_max_bytes
+        self._memory: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            self._forget(key)
+            if len(entry.body) > self.memory_max_bytes:
+                return
+            self._memory[key] = entry
+            self._memory_bytes += len(entry.body)
+            while self._memory_bytes > self.memory_max_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted.body)
+
+    def _forget(self, key: str) -> None:
+        # Caller holds the lock
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old.body)
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    def get(self, url: str) -> CachedResponse | None:
+        key = self._key(url)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+
+        meta_path = self.cache_dir / f"{key}.json"
+        body_path = self.cache_dir / f"{key}.body"
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url:
+            return None
+
+        entry = CachedResponse(
+            url=url,
+            status_code=meta.get("status_code", 200),
+            headers=meta.get("headers", {}),
+            body=body,
+            stored_at=meta.get("stored_at", 0),
+            truncated=meta.get("truncated", False),
+        )
+        self._remember(key, entry)
+        return entry
+
+    def put(self, entry: CachedResponse) -> None:
+        key = self._key(entry.url)
+        self._remember(key, entry)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            meta = {
+                "url": entry.url,
+                "status_code": entry.status_code,
+                "headers": {k: v for k, v in entry.headers.items() if k in self.CACHED_HEADERS},
+                "stored_at": entry.stored_at,
+                "truncated": entry.truncated,
+            }
+            body_tmp = self.cache_dir / f"{key}.body.tmp"
+            body_tmp.write_bytes(entry.body)
+            os.replace(body_tmp, self.cache_dir / f"{key}.body")
+            meta_tmp = self.cache_dir / f"{key}.json.tmp"
+            meta_tmp.write_text(json.dumps(meta), encoding="utf-8")
+            os.replace(meta_tmp, self.cache_dir / f"{key}.json")
+            self._evict()
+        except OSError:
+            pass  # the disk cache is best-effort
+
+    def touch(self, entry: CachedResponse, headers: httpx.Headers) -> CachedResponse:
+        """Store a refreshed copy of a cached entry after a 304 Not Modified response."""
+        updated = {name: headers[name] for name in self.CACHED_HEADERS if name in headers and name != "content-type"}
+        refreshed = replace(entry, headers={**entry.headers, **updated}, stored_at=time.time())
+        self.put(refreshed)
+        return refreshed
+
+    def _evict(self) -> None:
+        metas = list(self.cache_dir.glob("*.json"))
+        if len(metas) <= self.max_entries:
+            return
+        metas.sort(key=lambda p: p.stat().st_mtime)
+        for meta_path in metas[:len(metas) - self.max_entries]:
+            key = meta_path.stem
+            with self._lock:
+                self._forget(key)
+            meta_path.unlink(missing_ok=True)
+            (self.cache_dir / f"{key}.body").unlink(missing_ok=True)
+
+
+_default_cache: HttpCache | None = None
+
+
+def get_http_cache() -> HttpCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = HttpCache()
+    return _default_cache
+
+
+def _feed_cached(consumer: BodyConsumer, entry: CachedResponse) -> bool:
+    consumer.start(entry.headers.get("content-type", ""))
+    consumer.feed(entry.text)
+    return consumer.done
+
+
+async def fetch(
+    url: str,
+    *,
+    timeout: float = 30,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    cache: HttpCache | None = None,
+    client: httpx.AsyncClient | None = None,
+    consumer: BodyConsumer | None = None,
+    revalidate: bool = True,
+) -> CachedResponse:
+    """GET url through the shared client, reading at most max_bytes of body.
+
+    With a consumer, the decoded body is fed to it while it downloads and
+    reading stops as soon as consumer.done is set; the body kept in the
+    returned response (and the cache) is then only the part that was read.
+    A 304 for a cached body that was cut shorter than this request needs
+    is treated as a miss, and the body is downloaded again.
+
+    Raises httpx.HTTPStatusError for error responses, like raise_for_status().
+    """
+    cached = await run_blocking(cache.get, url) if cache else None
+    if cached and cached.is_fresh():
+        usable = not cached.truncated or len(cached.body) >= max_bytes
+        if consumer:
+            # A body cut short by an earlier consumer is still enough if this
+            # consumer also finishes before reaching its end.
+            usable = _feed_cached(consumer, cached) or usable
+        if usable:
+            return replace(cached, from_cache=True)
+
+    request_headers = {}
+    if cached and revalidate:
+        if cached.headers.get("etag"):
+            request_headers["If-None-Match"] = cached.headers["etag"]
+        if cached.headers.get("last-modified"):
+            request_headers["If-Modified-Since"] = cached.headers["last-modified"]
+
+    client = client or get_http_client()
+    async with client.stream(
+        "GET",
+        url,
+        headers=request_headers,
+        timeout=httpx.Timeout(timeout, connect=timeout),
+    ) as response:
+        if response.status_code == 304 and request_headers:
+            entry = await run_blocking(cache.touch, cached, response.headers)
+            usable = not entry.truncated or len(entry.body) >= max_bytes
+            if consumer:
+                usable = _feed_cached(consumer, entry) or usable
+            if usable:
+                return replace(entry, from_cache=True)
+            # Not modified, but too short for this request: download it again
+            await response.aclose()
+            return await fetch(url, timeout=timeout, max_bytes=max_bytes, cache=cache, client=client, consumer=consumer, revalidate=False)
+
+        response.raise_for_status()
+
+        decoder = None
+        if consumer:
+            content_type = response.headers.get("content-type", "")
+            consumer.start(content_type)
+            try:
+                decoder = codecs.getincrementaldecoder(_charset(content_type))(errors="replace")
+            except LookupError:
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+        chunks: list[bytes] = []
+        size = 0
+        truncated = False
+        async for chunk in response.aiter_bytes():
+            if size + len(chunk) > max_bytes:
+                chunk = chunk[:max_bytes - size]
+                truncated = True
+            chunks.append(chunk)
+            size += len(chunk)
+            if decoder:
+                consumer.feed(decoder.decode(chunk))
+                if consumer.done:
+                    truncated = True
+                    break
+            if truncated:
+                break
+
+        entry = CachedResponse(
+            url=url,
+            status_code=response.status_code,
+            headers={k.lower(): v for k, v in response.headers.items()},
+            body=b"".join(chunks),
+            truncated=truncated,
+        )
+
+    if cache and entry.is_storable():
+        await run_blocking(cache.put, entry)
+    return entry
@@ -1,30 +1,73 @@
-from openai import AsyncOpenAI
-from typing import AsyncGenerator, Any
+from __future__ import annotations
+from typing import TYPE_CHECKING, AsyncGenerator, Any
 from codentis.client.response import StreamEvent, TextDelta, TokenUsage, StreamEventType, ToolCall, ToolCallDelta, parse_tool_call_arguements
-from openai import RateLimitError, APIConnectionError, APIError
-from codentis.config.config import Config
+from codentis.config.config import Config, ModelRoute
+from codentis.client.rate_limit import get_rate_limiter
+from codentis.client.usage import get_usage_tracker
 import asyncio
 import os
+import time
+
+# openai is imported on first use (about half a second of startup); see utils/warmup.py
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+# OpenAI clients by (base_url, api_key)
+SharedClients = dict[tuple[str | None, str | None], "AsyncOpenAI"]
 
 class LLMClient:
-    def __init__(self, config: Config)->None:
+    def __init__(
+        self,
+        config: Config,
+        shared_clients: SharedClients | None = None,
+    )->None:
         self.client : AsyncOpenAI | None = None
+        # Clients for routes that point at another endpoint or key
+        self._route_clients: dict[tuple[str | None, str | None], AsyncOpenAI] = {}
+        # Clients (and their connection pools) owned by the caller and reused across
+        # sessions, e.g. by batch jobs; they are never closed here
+        self._shared_clients = shared_clients
         self.max_attempts: int = 3
         self.config = config
 
-    def get_client(self)->AsyncOpenAI:
-        if self.client is None:
-            self.client = AsyncOpenAI(
-                api_key=self.config.api_key,
-                base_url=self.config.base_url
-            )
-        return self.client
+    def get_client(self, route: ModelRoute | None = None)->AsyncOpenAI:
+        if route is None or (route.base_url, route.api_key) == (self.config.base_url, self.config.api_key):
+            if self.client is None:
+                self.client = self._new_client(self.config.base_url, self.config.api_key)
+            return self.client
+
+        key = (route.base_url, route.api_key)
+        if key not in self._route_clients:
+            self._route_clients[key] = self._new_client(route.base_url, route.api_key)
+        return self._route_clients[key]
+
+    def _new_client(self, base_url: str | None, api_key: str | None)->AsyncOpenAI:
+        from openai import AsyncOpenAI
+
+        if not api_key:
+            # AsyncOpenAI would fall back to $OPENAI_API_KEY and send it to whatever base_url is
+            raise ValueError(f"No API key configured for {base_url or 'the default endpoint'}. Set `api_key` for this model route.")
+
+        if self._shared_clients is None:
+            return AsyncOpenAI(api_key=api_key, base_url=base_url)
+        key = (base_url, api_key)
+        client = self._shared_clients.get(key)
+        if client is None:
+            # Sessions may be built in worker threads; setdefault keeps one client per key
+            client = self._shared_clients.setdefault(key, AsyncOpenAI(api_key=api_key, base_url=base_url))
+        return client
 
     async def close(self)->None:
+        if self._shared_clients is not None:
+            self.client = None
+            self._route_clients.clear()
+            return
         if self.client is not None:
             await self.client.close()
             self.client = None
-        pass
+        for client in self._route_clients.values():
+            await client.close()
+        self._route_clients.clear()
 
     def build_tools(self, tools: list[dict[str, Any]])->list[dict[str, Any]]:
         return [
@@ -39,26 +82,76 @@ class LLMClient:
             for tool in tools
         ]
 
-    async def chat_completion(self, messages: list[dict[str, Any]], tools: list[dict[str, Any]] | None = None, stream: bool = True)->AsyncGenerator[StreamEvent, None]:
-        client = self.get_client()
+    async def chat_completion(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        stream: bool = True,
+        task: str | None = None,
+    )->AsyncGenerator[StreamEvent, None]:
+        """Stream one completion. task names a class of call (e.g. 'summary') that Config.model_routes can send to another model."""
+        route = self.config.resolve_route(task)
+        client = self.get_client(route)
         kwargs = {
-                "model": self.config.model_name,
+                "model": route.model,
                 "messages": messages,
                 "stream": stream,
             }
         
+        if stream and not route.base_url:
+            # Only the official endpoint is known to accept this; other
+            # providers fall back to estimated usage.
+            kwargs["stream_options"] = {"include_usage": True}
+
         if tools: 
             kwargs["tools"] = self.build_tools(tools)
             kwargs["tool_choice"] = "auto"
-        
+
+        started = time.monotonic()
+        first_token: float | None = None
+        usage: TokenUsage | None = None
+        completion_chars = 0
+        error = False
+        try:
+            async for event in self._complete(client, kwargs, stream):
+                if first_token is None:
+                    first_token = time.monotonic() - started
+                if event.text_delta:
+                    completion_chars += len(event.text_delta.content)
+                if event.type == StreamEventType.MESSAGE_COMPLETE:
+                    usage = event.usage
+                elif event.type == StreamEventType.ERROR:
+                    error = True
+                yield event
+        finally:
+            # Rough figures for providers that report no usage
+            estimated = TokenUsage(
+                prompt_tokens=sum(len(str(message.get("content") or "")) for message in messages) // 4,
+                completion_tokens=completion_chars // 4,
+            )
+            get_usage_tracker().record(
+                route.model,
+                latency=time.monotonic() - started,
+                first_token=first_token,
+                usage=usage,
+                estimated=estimated,
+                error=error,
+            )
+
+    async def _complete(self, client: AsyncOpenAI, kwargs: dict[str, Any], stream: bool)->AsyncGenerator[StreamEvent, None]:
+        from openai import RateLimitError, APIConnectionError, APIError
+
+        limiter = get_rate_limiter(self.config.max_concurrent_requests, self.config.requests_per_minute)
+
         for attempt in range(self.max_attempts+1):
             try:
-                if stream:
-                    async for event in self.stream_response(client, kwargs):
+                async with limiter.slot():
+                    if stream:
+                        async for event in self.stream_response(client, kwargs):
+                            yield event
+                    else:
+                        event = await self.non_stream_response(client, kwargs)
                         yield event
-                else:
-                    event = await self.non_stream_response(client, kwargs)
-                    yield event
                 return
             except KeyboardInterrupt:
                 # Handle interruption during API calls
@@ -108,61 +201,65 @@ class LLMClient:
             finish_reason : str | None = None
             tool_calls: dict[int, dict[str, Any]] = {}
 
-            async for chunk in response:
-                if hasattr(chunk, "usage") and chunk.usage:
-                    usage = TokenUsage(
-                        prompt_tokens=chunk.usage.prompt_tokens,
-                        completion_tokens=chunk.usage.completion_tokens,
-                        total_tokens=chunk.usage.total_tokens,
-                        cached_tokens=chunk.usage.prompt_tokens_details.cached_tokens,
-                    )
+            try:
+                async for chunk in response:
+                    if hasattr(chunk, "usage") and chunk.usage:
+                        usage = TokenUsage(
+                            prompt_tokens=chunk.usage.prompt_tokens,
+                            completion_tokens=chunk.usage.completion_tokens,
+                            total_tokens=chunk.usage.total_tokens,
+                            cached_tokens=getattr(chunk.usage.prompt_tokens_details, "cached_tokens", 0) or 0,
+                        )
 
-                if not chunk.choices:
-                    continue
+                    if not chunk.choices:
+                        continue
 
-                choice = chunk.choices[0]
-                delta = choice.delta
+                    choice = chunk.choices[0]
+                    delta = choice.delta
 
-                if choice.finish_reason:
-                    finish_reason = choice.finish_reason
+                    if choice.finish_reason:
+                        finish_reason = choice.finish_reason
                 
-                if delta.content:
-                    yield StreamEvent(
-                        type=StreamEventType.TEXT_DELTA,
-                        text_delta=TextDelta(content=delta.content),
-                    )
+                    if delta.content:
+                        yield StreamEvent(
+                            type=StreamEventType.TEXT_DELTA,
+                            text_delta=TextDelta(content=delta.content),
+                        )
+
+                    if delta.tool_calls:
+                        for tool_call_delta in delta.tool_calls:
+                            idx = tool_call_delta.index
+                            if idx not in tool_calls:
+                                tool_calls[idx] = {
+                                    'id' : tool_call_delta.id or "",
+                                    'name' : "",
+                                    'arguments' : "",
+                                }
 
-                if delta.tool_calls:
-                    for tool_call_delta in delta.tool_calls:
-                        idx = tool_call_delta.index
-                        if idx not in tool_calls:
-                            tool_calls[idx] = {
-                                'id' : tool_call_delta.id or "",
-                                'name' : "",
-                                'arguments' : "",
-                            }
-
-                        if tool_call_delta.function:
-                            if tool_call_delta.function.name:
-                                tool_calls[idx]['name'] = tool_call_delta.function.name
-                                yield StreamEvent(
-                                    type=StreamEventType.TOOL_CALL_START,
-                                    tool_call_delta=ToolCallDelta(
-                                        call_id=tool_calls[idx]['id'],
-                                        name=tool_calls[idx]['name'],
-                                    ),
-                                )
+                            if tool_call_delta.function:
+                                if tool_call_delta.function.name:
+                                    tool_calls[idx]['name'] = tool_call_delta.function.name
+                                    yield StreamEvent(
+                                        type=StreamEventType.TOOL_CALL_START,
+                                        tool_call_delta=ToolCallDelta(
+                                            call_id=tool_calls[idx]['id'],
+                                            name=tool_calls[idx]['name'],
+                                        ),
+                                    )
                             
-                            if tool_call_delta.function.arguments:
-                                tool_calls[idx]['arguments'] += tool_call_delta.function.arguments
-                                yield StreamEvent(
-                                    type=StreamEventType.TOOL_CALL_DELTA,
-                                    tool_call_delta=ToolCallDelta(
-                                        call_id=tool_calls[idx]['id'],
-                                        name=tool_calls[idx]['name'],
-                                        arguments=tool_calls[idx]['arguments'],
-                                    ),
-                                )
+                                if tool_call_delta.function.arguments:
+                                    tool_calls[idx]['arguments'] += tool_call_delta.function.arguments
+                                    yield StreamEvent(
+                                        type=StreamEventType.TOOL_CALL_DELTA,
+                                        tool_call_delta=ToolCallDelta(
+                                            call_id=tool_calls[idx]['id'],
+                                            name=tool_calls[idx]['name'],
+                                            arguments=tool_calls[idx]['arguments'],
+                                        ),
+                                    )
+            finally:
+                # Releases the HTTP connection when the consumer is cancelled mid-stream
+                await response.close()
 
             for idx, tc in tool_calls.items():
                 yield StreamEvent(
@@ -220,7 +317,7 @@ class LLMClient:
                 prompt_tokens=response.usage.prompt_tokens,
                 completion_tokens=response.usage.completion_tokens,
                 total_tokens=response.usage.total_tokens,
-                cached_tokens=response.usage.prompt_tokens_details.cached_tokens,
+                cached_tokens=getattr(response.usage.prompt_tokens_details, "cached_tokens", 0) or 0,
             )
         
         return StreamEvent(
@@ -0,0 +1,66 @@
+"""Process-wide limit on LLM requests.
+
+Every LLMClient (main agent, sub-agents, batch workers) goes through the same
+RateLimiter, so fanning out to many concurrent agents cannot open an
+unbounded number of streams or exceed a requests-per-minute budget.
+"""
+from __future__ import annotations
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+DEFAULT_MAX_CONCURRENT = 8
+
+
+class RateLimiter:
+    def __init__(self, max_concurrent: int = DEFAULT_MAX_CONCURRENT, requests_per_minute: int | None = None) -> None:
+        self.max_concurrent = max_concurrent
+        self.requests_per_minute = requests_per_minute
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+        self.active = 0
+        self.waiting = 0
+
+    async def _pace(self) -> None:
+        # Space request starts evenly instead of allowing bursts
+        if not self.requests_per_minute:
+            return
+        interval = 60.0 / self.requests_per_minute
+        async with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one request slot for the duration of a request (including streaming)."""
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        try:
+            await self._pace()
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+
+_limiter: RateLimiter | None = None
+_limiter_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_rate_limiter(max_concurrent: int | None = None, requests_per_minute: int | None = None) -> RateLimiter:
+    """Shared limiter for the running event loop, created with the first caller's settings."""
+    global _limiter, _limiter_loop
+    loop = asyncio.get_running_loop()
+    if _limiter is None or _limiter_loop is not loop:
+        _limiter = RateLimiter(max_concurrent or DEFAULT_MAX_CONCURRENT, requests_per_minute)
+        _limiter_loop = loop
+    return _limiter
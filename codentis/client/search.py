@@ -0,0 +1,233 @@
+"""Web search backends and result cache for the web_search tool.
+
+Backends are plain blocking callables behind the SearchBackend interface;
+search() runs them in an executor so the event loop (spinner, concurrent
+tools) keeps running, and caches results for a while keyed on the
+normalized query, max_results and backend name.
+"""
+from __future__ import annotations
+import abc
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_BACKEND = "duckduckgo"
+SEARCH_TIMEOUT = 15
+CACHE_TTL = 15 * 60
+CACHE_MAX_ENTRIES = 256
+
+
+@dataclass
+class SearchResult:
+    title: str
+    url: str
+    snippet: str = ""
+
+    def to_dict(self) -> dict[str, str]:
+        # Same keys as the raw ddgs results previously passed in metadata
+        return {"title": self.title, "href": self.url, "body": self.snippet}
+
+
+class SearchBackend(abc.ABC):
+    name: str = "base"
+
+    @abc.abstractmethod
+    def search(self, query: str, max_results: int) -> list[SearchResult]:
+        """Blocking search; called from a worker thread."""
+
+
+class DuckDuckGoBackend(SearchBackend):
+    name = "duckduckgo"
+
+    def search(self, query: str, max_results: int) -> list[SearchResult]:
+        from ddgs import DDGS
+
+        results = DDGS().text(
+            query,
+            region="us-en",
+            safesearch="off",
+            timeout=10,
+            lang="en",
+            backend="auto",
+            max_results=max_results,
+        ) or []
+        return [
+            SearchResult(
+                title=result.get("title") or "No Title",
+                url=result.get("href") or result.get("link") or "",
+                snippet=result.get("body") or "",
+            )
+            for result in results
+        ]
+
+
+class StaticSearchBackend(SearchBackend):
+    """Local stand-in backend returning canned results, for tests and benchmarks.
+
+    Queries without canned results get generated ones; latency simulates a
+    slow remote backend.
+    """
+
+    name = "static"
+
+    def __init__(self, results: dict[str, list[SearchResult]] | None = None, latency: float = 0) -> None:
+        self.results = {normalize_query(q): r for q, r in (results or {}).items()}
+        self.latency = latency
+        self.calls = 0
+
+    def search(self, query: str, max_results: int) -> list[SearchResult]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        key = normalize_query(query)
+        if key in self.results:
+            return self.results[key][:max_results]
+        slug = "-".join(key.split())
+        return [
+            SearchResult(
+                title=f"{query} ({i + 1})",
+                url=f"https://example.com/{slug}/{i + 1}",
+                snippet=f"Result {i + 1} for {query}",
+            )
+            for i in range(max_results)
+        ]
+
+
+_backend_factories: dict[str, Callable[[], SearchBackend]] = {
+    DuckDuckGoBackend.name: DuckDuckGoBackend,
+    StaticSearchBackend.name: StaticSearchBackend,
+}
+_default_backend: SearchBackend | None = None
+
+
+def register_search_backend(name: str, factory: Callable[[], SearchBackend]) -> None:
+    _backend_factories[name] = factory
+
+
+def get_search_backend(name: str | None = None) -> SearchBackend:
+    global _default_backend
+    if name is not None:
+        if name not in _backend_factories:
+            raise ValueError(f"Unknown search backend: {name}")
+        return _backend_factories[name]()
+    if _default_backend is None:
+        _default_backend = _backend_factories[DEFAULT_BACKEND]()
+    return _default_backend
+
+
+def set_search_backend(backend: SearchBackend | None) -> None:
+    """Replace the backend used by web_search (None restores the default)."""
+    global _default_backend
+    _default_backend = backend
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def normalize_url(url: str) -> str:
+    """Key used to deduplicate results: no fragment, case-insensitive host, no trailing slash."""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/")
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+
+class SearchCache:
+    """In-memory TTL cache of search results with LRU eviction."""
+
+    def __init__(self, ttl: float = CACHE_TTL, max_entries: int = CACHE_MAX_ENTRIES) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, int, str], tuple[float, list[SearchResult]]] = OrderedDict()
+
+    def get(self, key: tuple[str, int, str]) -> list[SearchResult] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, results = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return results
+
+    def put(self, key: tuple[str, int, str], results: list[SearchResult]) -> None:
+        self._entries[key] = (time.monotonic(), results)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_default_cache: SearchCache | None = None
+
+
+def get_search_cache() -> SearchCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SearchCache()
+    return _default_cache
+
+
+async def search(
+    query: str,
+    max_results: int,
+    *,
+    backend: SearchBackend | None = None,
+    cache: SearchCache | None = None,
+    timeout: float = SEARCH_TIMEOUT,
+) -> tuple[list[SearchResult], bool]:
+    """Run one search off the event loop. Returns (results, from_cache)."""
+    backend = backend or get_search_backend()
+    key = (normalize_query(query), max_results, backend.name)
+    if cache:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached, True
+
+    loop = asyncio.get_running_loop()
+    results = await asyncio.wait_for(
+        loop.run_in_executor(None, backend.search, query, max_results),
+        timeout=timeout,
+    )
+    if cache and results:
+        cache.put(key, results)
+    return results, False
+
+
+async def search_many(
+    queries: list[str],
+    max_results: int,
+    *,
+    backend: SearchBackend | None = None,
+    cache: SearchCache | None = None,
+    timeout: float = SEARCH_TIMEOUT,
+) -> list[tuple[str, list[SearchResult] | BaseException, bool]]:
+    """Run several searches concurrently.
+
+    Queries that normalize to the same text are searched once. Returns one
+    (query, results or exception, from_cache) tuple per distinct query, in
+    input order.
+    """
+    distinct: dict[str, str] = {}
+    for query in queries:
+        distinct.setdefault(normalize_query(query), query)
+    unique = list(distinct.values())
+
+    outcomes = await asyncio.gather(
+        *(search(q, max_results, backend=backend, cache=cache, timeout=timeout) for q in unique),
+        return_exceptions=True,
+    )
+    merged = []
+    for query, outcome in zip(unique, outcomes):
+        if isinstance(outcome, BaseException):
+            merged.append((query, outcome, False))
+        else:
+            results, from_cache = outcome
+            merged.append((query, results, from_cache))
+    return merged
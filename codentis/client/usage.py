@@ -0,0 +1,88 @@
+"""Process-wide token and latency accounting per model.
+
+Every LLMClient call is recorded under the model it was sent to, so runs
+that route sub-agents or summaries to a faster model show how tokens,
+latency and throughput are split between models.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from codentis.client.response import TokenUsage
+
+
+@dataclass
+class ModelStats:
+    model: str
+    requests: int = 0
+    errors: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    estimated_requests: int = 0  # provider reported no usage; tokens are estimates
+    latency: float = 0.0  # seconds, summed over requests
+    first_token: float = 0.0  # seconds to the first streamed event, summed
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.completion_tokens / self.latency if self.latency else 0.0
+
+    def to_dict(self) -> dict[str, float | int | str]:
+        requests = self.requests or 1
+        return {
+            "model": self.model,
+            "requests": self.requests,
+            "errors": self.errors,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "estimated_requests": self.estimated_requests,
+            "avg_latency": round(self.latency / requests, 3),
+            "avg_first_token": round(self.first_token / requests, 3),
+            "tokens_per_second": round(self.tokens_per_second, 1),
+        }
+
+
+class UsageTracker:
+    def __init__(self) -> None:
+        self._stats: dict[str, ModelStats] = {}
+
+    def record(
+        self,
+        model: str,
+        *,
+        latency: float,
+        first_token: float | None,
+        usage: TokenUsage | None,
+        estimated: TokenUsage | None = None,
+        error: bool = False,
+    ) -> None:
+        stats = self._stats.get(model)
+        if stats is None:
+            stats = self._stats[model] = ModelStats(model)
+        stats.requests += 1
+        stats.errors += int(error)
+        stats.latency += latency
+        stats.first_token += first_token if first_token is not None else latency
+        if usage is None and estimated is not None:
+            usage = estimated
+            stats.estimated_requests += 1
+        if usage is not None:
+            stats.prompt_tokens += usage.prompt_tokens
+            stats.completion_tokens += usage.completion_tokens
+            stats.cached_tokens += usage.cached_tokens
+
+    def snapshot(self) -> list[ModelStats]:
+        return sorted(self._stats.values(), key=lambda stats: stats.total_tokens, reverse=True)
+
+    def reset(self) -> None:
+        self._stats.clear()
+
+
+_tracker = UsageTracker()
+
+
+def get_usage_tracker() -> UsageTracker:
+    return _tracker
@@ -9,6 +9,16 @@ class ModelConfig(BaseModel):
     temperature: float = Field(default=1, ge=0.0, le=2.0)
     context_window: int = 256000
 
+class ModelRoute(BaseModel):
+    """Model and endpoint for one class of LLM calls.
+
+    Unset fields fall back to the main config, except that the main
+    api_key is only used when the route's endpoint is the main one too.
+    """
+    model: str | None = None
+    base_url: str | None = None
+    api_key: str | None = None
+
 class ShellEnvironmentPolicy(BaseModel):
     ignore_default_excludes: bool = False
     exclude_patterns: list[str] = Field(
@@ -28,6 +38,21 @@ class Config(BaseModel):
     base_url: str | None = None
     allowed_tools: list[str] | None = Field(None, description="List of tools allowed for agent or subagents to use. If None, all tools are allowed")
     shell_environment: ShellEnvironmentPolicy = Field(default_factory=ShellEnvironmentPolicy)
+    max_concurrent_requests: int = Field(8, ge=1, description="Maximum number of LLM requests in flight at once, shared by the agent and its sub-agents")
+    requests_per_minute: int | None = Field(None, ge=1, description="Optional cap on LLM requests started per minute")
+    model_routes: dict[str, ModelRoute] = Field(
+        default_factory=dict,
+        description="Model overrides per task class: 'summary', 'subagent' or 'subagent.<name>'"
+    )
+    tool_concurrency_limits: dict[str, int] = Field(
+        default_factory=dict,
+        description="Maximum concurrent calls per tool name or kind (e.g. 'shell', 'network'), shared by the agent and its sub-agents"
+    )
+    cache_tool_results: bool = Field(True, description="Serve repeated read-only tool calls (grep, glob, list_dir, read_file) from cache until a write or shell call")
+    stats_file: Path | None = Field(None, description="Where tool and model stats are written at exit (default: stats.json in the data dir)")
+    tool_history_max_outputs: int = Field(50, ge=1, description="Tool outputs whose full details the TUI keeps in memory; older ones are compressed to disk")
+    tool_history_max_mb: float = Field(16.0, gt=0, description="Memory cap for tool output details in the TUI, in MB; older outputs are compressed to disk")
+    ui_fps: float = Field(30.0, ge=0, description="Terminal frames per second; output written between frames goes out in one write (0 writes immediately)")
 
     @property
     def model_name(self) -> str:
@@ -53,11 +78,39 @@ class Config(BaseModel):
     def model_context_window(self, value: int):
         self.model.context_window = value
 
+    def resolve_route(self, *routes: str | ModelRoute | None) -> ModelRoute:
+        """Complete route for a call.
+
+        routes are task classes (looked up in model_routes) or explicit
+        ModelRoutes, in priority order; each field comes from the first one
+        that sets it, falling back to this config. The main api_key is
+        never sent to another endpoint: a route whose base_url differs
+        from the main one gets api_key None unless a route sets it.
+        """
+        candidates = [self.model_routes.get(route) if isinstance(route, str) else route for route in routes]
+        candidates = [route for route in candidates if route is not None]
+
+        def pick(field_name: str) -> str | None:
+            return next((getattr(route, field_name) for route in candidates if getattr(route, field_name)), None)
+
+        base_url = pick("base_url") or self.base_url
+        return ModelRoute(
+            model=pick("model") or self.model_name,
+            base_url=base_url,
+            api_key=pick("api_key") or (self.api_key if base_url == self.base_url else None),
+        )
+
     def validate(self)->list[str]:
         errors = []
 
         if not self.api_key:
             errors.append("No API key found. Please define `api_key` in your `codentis.toml` config file.")
+
+        for name in self.model_routes:
+            # subagent.<name> routes fall back to the 'subagent' route
+            route = self.resolve_route(name, "subagent") if name.startswith("subagent.") else self.resolve_route(name)
+            if not route.api_key:
+                errors.append(f"No API key for model route '{name}': its base_url ({route.base_url}) is not the main endpoint, so define its own `api_key`.")
         
         if not self.cwd.exists():
             errors.append("Working directory does not exist : " + str(self.cwd))
@@ -1,11 +1,14 @@
 from codentis.prompts.system import get_system_prompt
-from codentis.utils.text import count_tokens
+from codentis.utils.text import count_tokens, estimate_tokens
 from dataclasses import dataclass, field
 from typing import Any
 from codentis.config.config import Config
-import json
-from codentis.config.loader import get_data_dir
-from pathlib import Path
+from codentis.context.memory_store import MemoryStore
+
+# Memory entries included in the system prompt; the rest stay reachable
+# through the memory tool's 'search' action.
+MEMORY_PROMPT_ENTRIES = 20
+MEMORY_PROMPT_VALUE_CHARS = 500
 
 @dataclass
 class MessageItem:
@@ -36,6 +39,8 @@ from codentis.tools.base import Tool
 class ContextManager:
     def __init__(self, config: Config, tools: list[Tool] | None = None)->None:
         self.config = config
+        self.tools = tools
+        self._memory_partial = False
         
         # Load persistent memory
         memory_str = self._load_persistent_memory()
@@ -43,29 +48,40 @@ class ContextManager:
         self.system_prompt = get_system_prompt(self.config, user_memory=memory_str, tools=tools)
         self.messages: list[MessageItem] = []
         self.model_name = self.config.model_name
+        self._initial_state = (self.system_prompt, self._memory_partial)
     
-    def _load_persistent_memory(self) -> str | None:
+    def _load_persistent_memory(self, request: str = "") -> str | None:
         try:
-            memory_path = get_data_dir() / "memory.json"
-            if not memory_path.exists():
-                return None
-            
-            content = memory_path.read_text(encoding="utf-8")
-            data = json.loads(content)
-            entries = data.get("entries", {})
-            
-            if not entries:
-                return None
-            
-            memory_parts = []
-            for k, v in entries.items():
-                memory_parts.append(f"{k}: {v}")
-            
-            return "\n".join(memory_parts)
+            with MemoryStore() as store:
+                total = store.count()
+                if not total:
+                    return None
+                workspace = str(self.config.cwd.resolve())
+                entries = store.relevant(workspace, request, MEMORY_PROMPT_ENTRIES)
         except Exception:
             return None
+
+        memory_parts = []
+        for entry in entries:
+            value = entry.value
+            if len(value) > MEMORY_PROMPT_VALUE_CHARS:
+                value = value[:MEMORY_PROMPT_VALUE_CHARS] + "..."
+            memory_parts.append(f"{entry.key}: {value}")
+
+        self._memory_partial = total > len(entries)
+        if self._memory_partial:
+            memory_parts.append(
+                f"({total - len(entries)} more entries not shown; use the memory tool's 'search' action to find them.)"
+            )
+        return "\n".join(memory_parts)
     
     def add_user_message(self, content: str)->None:
+        if self._memory_partial:
+            # Pick the memory entries relevant to the first request
+            memory_str = self._load_persistent_memory(content)
+            self.system_prompt = get_system_prompt(self.config, user_memory=memory_str, tools=self.tools)
+            self._memory_partial = False
+
         item = MessageItem(
             role="user",
             content=content,
@@ -96,6 +112,16 @@ class ContextManager:
         self.messages.append(item)
         return item
 
+    def reset(self) -> None:
+        """Drop all messages and go back to the system prompt built at startup."""
+        self.messages.clear()
+        self.system_prompt, self._memory_partial = self._initial_state
+
+    def estimated_prompt_tokens(self) -> int:
+        """Approximate size of the next request, used when the API reports no usage."""
+        total = estimate_tokens(self.system_prompt or "", self.model_name)
+        return total + sum(item.token_count or 0 for item in self.messages)
+
     def get_messages(self)->list[MessageItem]:
         messages = []
         
@@ -0,0 +1,206 @@
+"""SQLite-backed persistent memory.
+
+Entries live in <data dir>/memory.db (WAL mode) with an FTS5 index over keys
+and values, so single entries are read and written without touching the
+rest of the store and the system prompt can include only the entries that
+are relevant to the current workspace and request. A legacy memory.json is
+imported on first open and renamed to memory.json.migrated.
+"""
+from __future__ import annotations
+import json
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from codentis.config.loader import get_data_dir
+
+DB_FILE_NAME = "memory.db"
+LEGACY_FILE_NAME = "memory.json"
+MAX_QUERY_TERMS = 32
+
+_TERM = re.compile(r"\w{2,}", re.UNICODE)
+
+
+@dataclass
+class MemoryEntry:
+    key: str
+    value: str
+    workspace: str | None = None
+    updated_at: float = 0.0
+
+
+def _match_expression(text: str, prefix: bool = False) -> str | None:
+    """FTS5 query matching any word of text (terms are quoted, so no syntax leaks through)."""
+    terms: list[str] = []
+    for term in _TERM.findall(text.lower()):
+        if term not in terms:
+            terms.append(term)
+        if len(terms) >= MAX_QUERY_TERMS:
+            break
+    if not terms:
+        return None
+    star = "*" if prefix else ""
+    return " OR ".join(f'"{term}"{star}' for term in terms)
+
+
+class MemoryStore:
+    def __init__(self, path: Path | None = None) -> None:
+        data_dir = get_data_dir()
+        self.path = path or data_dir / DB_FILE_NAME
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.has_fts = True
+        self._create_schema()
+        if path is None:
+            self._migrate_json(data_dir / LEGACY_FILE_NAME)
+
+    def _create_schema(self) -> None:
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS memory ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " workspace TEXT,"
+            " updated_at REAL NOT NULL)"
+        )
+        try:
+            self.conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS memory_fts
+                    USING fts5(key, value, content='memory', content_rowid='rowid');
+                CREATE TRIGGER IF NOT EXISTS memory_ai AFTER INSERT ON memory BEGIN
+                    INSERT INTO memory_fts(rowid, key, value) VALUES (new.rowid, new.key, new.value);
+                END;
+                CREATE TRIGGER IF NOT EXISTS memory_ad AFTER DELETE ON memory BEGIN
+                    INSERT INTO memory_fts(memory_fts, rowid, key, value) VALUES ('delete', old.rowid, old.key, old.value);
+                END;
+                CREATE TRIGGER IF NOT EXISTS memory_au AFTER UPDATE ON memory BEGIN
+                    INSERT INTO memory_fts(memory_fts, rowid, key, value) VALUES ('delete', old.rowid, old.key, old.value);
+                    INSERT INTO memory_fts(rowid, key, value) VALUES (new.rowid, new.key, new.value);
+                END;
+            """)
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: search falls back to LIKE
+            self.has_fts = False
+
+    def _migrate_json(self, legacy_path: Path) -> None:
+        if not legacy_path.exists():
+            return
+        try:
+            entries = json.loads(legacy_path.read_text(encoding="utf-8")).get("entries", {})
+        except (OSError, ValueError, AttributeError):
+            return
+        now = time.time()
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO memory (key, value, workspace, updated_at) VALUES (?, ?, NULL, ?)",
+                [(str(k), str(v), now) for k, v in entries.items()],
+            )
+        try:
+            legacy_path.replace(legacy_path.with_name(LEGACY_FILE_NAME + ".migrated"))
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> MemoryStore:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @staticmethod
+    def _entry(row: tuple) -> MemoryEntry:
+        return MemoryEntry(key=row[0], value=row[1], workspace=row[2], updated_at=row[3])
+
+    def set(self, key: str, value: str, workspace: str | None = None) -> None:
+        self.conn.execute(
+            "INSERT INTO memory (key, value, workspace, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, "
+            "workspace = excluded.workspace, updated_at = excluded.updated_at",
+            (key, value, workspace, time.time()),
+        )
+
+    def get(self, key: str) -> MemoryEntry | None:
+        row = self.conn.execute(
+            "SELECT key, value, workspace, updated_at FROM memory WHERE key = ?", (key,)
+        ).fetchone()
+        return self._entry(row) if row else None
+
+    def delete(self, key: str) -> bool:
+        return self.conn.execute("DELETE FROM memory WHERE key = ?", (key,)).rowcount > 0
+
+    def clear(self) -> int:
+        return self.conn.execute("DELETE FROM memory").rowcount
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM memory").fetchone()[0]
+
+    def entries(self) -> list[MemoryEntry]:
+        rows = self.conn.execute("SELECT key, value, workspace, updated_at FROM memory ORDER BY rowid")
+        return [self._entry(row) for row in rows]
+
+    def search(self, query: str, limit: int = 10) -> list[MemoryEntry]:
+        """Entries matching any word of query, best matches first."""
+        if self.has_fts:
+            expression = _match_expression(query, prefix=True)
+            if expression is None:
+                return []
+            rows = self.conn.execute(
+                "SELECT m.key, m.value, m.workspace, m.updated_at FROM memory_fts "
+                "JOIN memory m ON m.rowid = memory_fts.rowid "
+                "WHERE memory_fts MATCH ? ORDER BY bm25(memory_fts) LIMIT ?",
+                (expression, limit),
+            )
+        else:
+            pattern = f"%{query.strip()}%"
+            rows = self.conn.execute(
+                "SELECT key, value, workspace, updated_at FROM memory "
+                "WHERE key LIKE ? OR value LIKE ? ORDER BY updated_at DESC LIMIT ?",
+                (pattern, pattern, limit),
+            )
+        return [self._entry(row) for row in rows]
+
+    def relevant(self, workspace: str | None, text: str, limit: int) -> list[MemoryEntry]:
+        """Up to limit entries for the system prompt.
+
+        Full-text matches for the workspace name and text come first (entries
+        saved in this workspace before others), then entries saved in this
+        workspace, then the most recently updated ones.
+        """
+        if self.count() <= limit:
+            return self.entries()
+
+        picked: dict[str, MemoryEntry] = {}
+        query = " ".join(part for part in (Path(workspace).name if workspace else "", text) if part)
+        if query:
+            matches = self.search(query, limit=limit * 2)
+            matches.sort(key=lambda entry: entry.workspace != workspace)  # stable: keeps bm25 order
+            for entry in matches[:limit]:
+                picked[entry.key] = entry
+
+        if len(picked) < limit and workspace:
+            rows = self.conn.execute(
+                "SELECT key, value, workspace, updated_at FROM memory WHERE workspace = ? "
+                "ORDER BY updated_at DESC LIMIT ?",
+                (workspace, limit),
+            )
+            for row in rows:
+                if len(picked) >= limit:
+                    break
+                picked.setdefault(row[0], self._entry(row))
+
+        if len(picked) < limit:
+            rows = self.conn.execute(
+                "SELECT key, value, workspace, updated_at FROM memory ORDER BY updated_at DESC LIMIT ?",
+                (limit * 2,),
+            )
+            for row in rows:
+                if len(picked) >= limit:
+                    break
+                picked.setdefault(row[0], self._entry(row))
+
+        return list(picked.values())
@@ -0,0 +1,192 @@
+"""Per-workspace todo list stored in SQLite.
+
+All workspaces share <data dir>/todos.db (WAL mode); every row belongs to
+one workspace, so each project sees only its own plan. Adding or updating
+an item touches a single row, and batches run in one transaction. The old
+global todos.json is imported into the first workspace that opens the store
+and renamed to todos.json.migrated.
+"""
+from __future__ import annotations
+import json
+import sqlite3
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from codentis.config.loader import get_data_dir
+
+DB_FILE_NAME = "todos.db"
+LEGACY_FILE_NAME = "todos.json"
+
+STATUSES = ("pending", "in_progress", "completed", "cancelled")
+PRIORITIES = ("high", "medium", "low")
+_COLUMNS = "id, content, status, priority, position, created_at, updated_at"
+
+
+@dataclass
+class TodoItem:
+    id: str
+    content: str
+    status: str = "pending"
+    priority: str = "medium"
+    position: int = 0
+    created_at: float = 0.0
+    updated_at: float = 0.0
+
+    def to_dict(self) -> dict[str, str | int]:
+        return {
+            "id": self.id,
+            "content": self.content,
+            "status": self.status,
+            "priority": self.priority,
+            "position": self.position,
+        }
+
+
+def new_todo_id() -> str:
+    return str(uuid.uuid4())[:8]
+
+
+class TodoStore:
+    def __init__(self, workspace: str, path: Path | None = None) -> None:
+        data_dir = get_data_dir()
+        self.workspace = workspace
+        self.path = path or data_dir / DB_FILE_NAME
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS todos (
+                workspace TEXT NOT NULL,
+                id TEXT NOT NULL,
+                content TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                priority TEXT NOT NULL DEFAULT 'medium',
+                position INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (workspace, id)
+            );
+            CREATE INDEX IF NOT EXISTS todos_order ON todos (workspace, position);
+        """)
+        if path is None:
+            self._migrate_json(data_dir / LEGACY_FILE_NAME)
+
+    def _migrate_json(self, legacy_path: Path) -> None:
+        if not legacy_path.exists():
+            return
+        try:
+            data = json.loads(legacy_path.read_text(encoding="utf-8"))
+            items = [(todo_id, content, "completed") for todo_id, content in data.get("completed", {}).items()]
+            items += [(todo_id, content, "pending") for todo_id, content in data.get("todos", {}).items()]
+        except (OSError, ValueError, AttributeError):
+            return
+        # One row per id; a task listed as both done and pending stays pending
+        by_id = {str(todo_id): {"id": str(todo_id), "content": str(content), "status": status} for todo_id, content, status in items}
+        self.add_many(list(by_id.values()))
+        try:
+            legacy_path.replace(legacy_path.with_name(LEGACY_FILE_NAME + ".migrated"))
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        self.conn.close()
+
+    @staticmethod
+    def _item(row: tuple) -> TodoItem:
+        return TodoItem(*row)
+
+    def _next_position(self) -> int:
+        row = self.conn.execute(
+            "SELECT MAX(position) FROM todos WHERE workspace = ?", (self.workspace,)
+        ).fetchone()
+        return 0 if row[0] is None else row[0] + 1
+
+    def add_many(self, items: list[dict]) -> tuple[list[TodoItem], list[str]]:
+        """Insert items (dicts with content and optional id/status/priority/position) in one transaction.
+
+        Returns (added items, duplicate ids). If any given id is already
+        taken or appears twice in items, nothing is added, so an add never
+        overwrites an existing task.
+        """
+        now = time.time()
+        added = []
+        given = [item["id"] for item in items if item.get("id")]
+        with self.conn:
+            self.conn.execute("BEGIN")
+            duplicates = {todo_id for todo_id, count in Counter(given).items() if count > 1}
+            duplicates.update(todo_id for todo_id in set(given) if self.get(todo_id) is not None)
+            if duplicates:
+                return [], sorted(duplicates)
+            position = self._next_position()
+            for item in items:
+                todo = TodoItem(
+                    id=item.get("id") or new_todo_id(),
+                    content=item["content"],
+                    status=item.get("status") or "pending",
+                    priority=item.get("priority") or "medium",
+                    position=item["position"] if item.get("position") is not None else position,
+                    created_at=now,
+                    updated_at=now,
+                )
+                position = max(position, todo.position) + 1
+                self.conn.execute(
+                    f"INSERT INTO todos (workspace, {_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (self.workspace, todo.id, todo.content, todo.status, todo.priority,
+                     todo.position, todo.created_at, todo.updated_at),
+                )
+                added.append(todo)
+        return added, []
+
+    def update_many(self, updates: list[dict]) -> tuple[list[TodoItem], list[str]]:
+        """Apply {id, field: value} updates in one transaction.
+
+        Returns (updated items, ids that were not found).
+        """
+        now = time.time()
+        updated: list[TodoItem] = []
+        missing: list[str] = []
+        with self.conn:
+            self.conn.execute("BEGIN")
+            for update in updates:
+                fields = {
+                    name: update[name]
+                    for name in ("content", "status", "priority", "position")
+                    if update.get(name) is not None
+                }
+                assignments = "".join(f"{name} = ?, " for name in fields)
+                cursor = self.conn.execute(
+                    f"UPDATE todos SET {assignments}updated_at = ? WHERE workspace = ? AND id = ?",
+                    (*fields.values(), now, self.workspace, update["id"]),
+                )
+                if cursor.rowcount:
+                    updated.append(self.get(update["id"]))
+                else:
+                    missing.append(update["id"])
+        return updated, missing
+
+    def get(self, todo_id: str) -> TodoItem | None:
+        row = self.conn.execute(
+            f"SELECT {_COLUMNS} FROM todos WHERE workspace = ? AND id = ?", (self.workspace, todo_id)
+        ).fetchone()
+        return self._item(row) if row else None
+
+    def remove(self, todo_id: str) -> TodoItem | None:
+        item = self.get(todo_id)
+        if item is not None:
+            self.conn.execute("DELETE FROM todos WHERE workspace = ? AND id = ?", (self.workspace, todo_id))
+        return item
+
+    def items(self, status: str | None = None) -> list[TodoItem]:
+        query = f"SELECT {_COLUMNS} FROM todos WHERE workspace = ?"
+        args: tuple = (self.workspace,)
+        if status:
+            query += " AND status = ?"
+            args += (status,)
+        rows = self.conn.execute(query + " ORDER BY position, created_at", args)
+        return [self._item(row) for row in rows]
+
+    def clear(self) -> int:
+        return self.conn.execute("DELETE FROM todos WHERE workspace = ?", (self.workspace,)).rowcount
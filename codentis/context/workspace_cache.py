@@ -0,0 +1,217 @@
+"""Per-session caches of file contents and directory listings.
+
+Every lookup is revalidated against the file system (mtime and size for
+files, the mtimes of every walked directory for listings), so an edit, a
+shell command or an outside change is never hidden by the cache. A
+sub-agent session gets a child view: it reads through to the parent's
+caches but keeps whatever it loads itself in its own layer, so children
+never modify the parent's state.
+
+Tools call into these caches from the shared I/O thread pool, so each
+layer guards its entries with a lock; file reads and tree walks happen
+outside it.
+"""
+from __future__ import annotations
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterator
+
+EXCLUDED_DIRS = frozenset({
+    "node_modules", "venv", ".venv", "build", "dist", "__pycache__",
+    "target", ".git", ".vscode", ".idea", "out",
+})
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+MAX_ENTRY_BYTES = 4 * 1024 * 1024
+MAX_LISTINGS = 16
+# Files modified this recently may still change within the same mtime tick
+# (coarse file systems), so they are read but not cached.
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def read_text_file(path: Path) -> str:
+    data = path.read_bytes()
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("latin-1")
+
+
+def iter_files(root: Path, dir_mtimes: dict[str, int] | None = None) -> Iterator[str]:
+    """Paths of all files under root outside EXCLUDED_DIRS, walked lazily; see walk_files."""
+    for dirpath, dirs, filenames in os.walk(root):
+        dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
+        if dir_mtimes is not None:
+            try:
+                dir_mtimes[dirpath] = os.stat(dirpath).st_mtime_ns
+            except OSError:
+                pass
+        for name in filenames:
+            yield os.path.join(dirpath, name)
+
+
+def walk_files(root: Path, dir_mtimes: dict[str, int] | None = None) -> list[str]:
+    """Paths (as strings) of all files under root outside EXCLUDED_DIRS, in os.walk order.
+
+    Strings rather than Path objects: a large tree has hundreds of
+    thousands of entries and callers only need a few of them as Paths, so
+    this halves the walk and keeps garbage collection pauses short.
+
+    If dir_mtimes is given it is filled with the mtime of every directory
+    visited, which is what a cached listing is validated against.
+    """
+    return list(iter_files(root, dir_mtimes))
+
+
+class FileCache:
+    """LRU cache of decoded file contents keyed by path, mtime and size."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, parent: FileCache | None = None) -> None:
+        self.max_bytes = max_bytes
+        self.parent = parent
+        self._entries: OrderedDict[Path, tuple[int, int, str]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _peek(self, path: Path, mtime_ns: int, size: int) -> str | None:
+        # Read-only lookup through this layer and its parents (no LRU update)
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is not None and entry[0] == mtime_ns and entry[1] == size:
+            return entry[2]
+        return self.parent._peek(path, mtime_ns, size) if self.parent else None
+
+    def read_text(self, path: Path) -> str:
+        stat = path.stat()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[2]
+
+        text = self.parent._peek(path, stat.st_mtime_ns, stat.st_size) if self.parent else None
+        if text is not None:
+            self.hits += 1
+            return text
+
+        self.misses += 1
+        text = read_text_file(path)
+        if stat.st_size <= MAX_ENTRY_BYTES and time.time_ns() - stat.st_mtime_ns > RACY_WINDOW_NS:
+            self._store(path, stat.st_mtime_ns, stat.st_size, text)
+        return text
+
+    def _store(self, path: Path, mtime_ns: int, size: int, text: str) -> None:
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[path] = (mtime_ns, size, text)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class DirectoryIndex:
+    """Recursive file listings keyed by root, revalidated by directory mtimes.
+
+    Adding, removing or renaming a file changes the mtime of its directory,
+    so checking one stat per directory is enough to know a listing is still
+    current, which is much cheaper than walking the tree again.
+    """
+
+    def __init__(self, parent: DirectoryIndex | None = None) -> None:
+        self.parent = parent
+        self._listings: OrderedDict[Path, tuple[dict[str, int], list[str]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _is_current(dir_mtimes: dict[str, int]) -> bool:
+        for dirpath, mtime_ns in dir_mtimes.items():
+            try:
+                if os.stat(dirpath).st_mtime_ns != mtime_ns:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def _peek(self, root: Path) -> list[str] | None:
+        with self._lock:
+            listing = self._listings.get(root)
+        if listing is not None and self._is_current(listing[0]):
+            return listing[1]
+        return self.parent._peek(root) if self.parent else None
+
+    def cached(self, root: Path) -> list[str] | None:
+        """The listing of root if this index or a parent has a current one, without walking."""
+        with self._lock:
+            listing = self._listings.get(root)
+        if listing is not None and self._is_current(listing[0]):
+            with self._lock:
+                if root in self._listings:
+                    self._listings.move_to_end(root)
+                self.hits += 1
+            return listing[1]
+
+        files = self.parent._peek(root) if self.parent else None
+        if files is not None:
+            self.hits += 1
+        return files
+
+    def files(self, root: Path) -> list[str]:
+        files = self.cached(root)
+        if files is not None:
+            return files
+
+        dir_mtimes: dict[str, int] = {}
+        files = walk_files(root, dir_mtimes)
+        with self._lock:
+            self.misses += 1
+            self._listings[root] = (dir_mtimes, files)
+            self._listings.move_to_end(root)
+            while len(self._listings) > MAX_LISTINGS:
+                self._listings.popitem(last=False)
+        return files
+
+    def clear(self) -> None:
+        with self._lock:
+            self._listings.clear()
+
+
+class WorkspaceCache:
+    """File contents and listings for one session's tools."""
+
+    def __init__(self, parent: WorkspaceCache | None = None) -> None:
+        self.parent = parent
+        self.files = FileCache(parent=parent.files if parent else None)
+        self.index = DirectoryIndex(parent=parent.index if parent else None)
+
+    def child(self) -> WorkspaceCache:
+        """A view for a sub-agent that reads this cache but never writes to it."""
+        return WorkspaceCache(parent=self)
+
+    def read_text(self, path: Path) -> str:
+        return self.files.read_text(path)
+
+    def list_files(self, root: Path) -> list[str]:
+        return self.index.files(root)
+
+    def cached_listing(self, root: Path) -> list[str] | None:
+        return self.index.cached(root)
+
+    def clear(self) -> None:
+        self.files.clear()
+        self.index.clear()
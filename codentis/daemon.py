@@ -0,0 +1,396 @@
+"""Resident agent server for `codentis serve`.
+
+A `codentis chat` process pays for Python start-up, imports, config
+loading, the tool registry, the system prompt and a new HTTPS connection
+before its first request goes out. The daemon pays for them once and
+keeps them warm between prompts:
+- openai and the tokenizer are imported and loaded at start-up.
+- Each workspace (a working directory) keeps its loaded config, one
+  WorkspaceCache of file contents and listings, and a SessionPool of idle
+  sessions with their tool registry and system prompt already built.
+- All sessions share one OpenAI client, and its connection pool, per
+  endpoint and API key, plus the process-wide rate limiter and HTTP client.
+
+Clients talk to it with JSON-RPC 2.0 over a Unix-domain socket, one JSON
+object per line (see daemon_client for the wire format and the thin
+client). Methods:
+- run {cwd, prompt, session?, delta_coalesce_ms?}: runs the prompt and
+  streams its events as "event" notifications. Without a session name it
+  uses a pooled session that is reset afterwards; with one, the named
+  conversation is kept and continued by later runs with the same name.
+  The result's usage covers this run only. A run cut short (the client
+  went away) discards its session, pooled or named, instead of reusing it.
+- close_session {session}: forgets a named conversation.
+- ping: version, pid, uptime and what is warm.
+- shutdown: stops the daemon.
+
+The config is re-read for every run, so edits to config files take
+effect: a workspace whose config changed gets new sessions, and a named
+session built from the old config starts a new conversation. At most
+MAX_NAMED_SESSIONS named conversations are kept; ones idle for
+NAMED_SESSION_TTL seconds, then the least recently used, make room for a
+new one. The trust
+list is re-read too. Environment variables, such as OPENAI_API_KEY, are
+the daemon's own.
+"""
+from __future__ import annotations
+import asyncio
+import json
+import os
+import signal
+import socket
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from codentis import __version__
+from codentis.agent.agent import Agent
+from codentis.agent.session import Session, SessionPool
+from codentis.client.http_client import close_http_client
+from codentis.client.llm_client import SharedClients
+from codentis.config.config import Config
+from codentis.config.loader import load_config
+from codentis.context.workspace_cache import WorkspaceCache
+from codentis.daemon_client import check_private_dir
+from codentis.headless import JsonlWriter, stream_events
+from codentis.utils.errors import ConfigError
+from codentis.utils.workspace_trust import WorkspaceTrust
+
+# JSON-RPC 2.0 error codes, and the daemon's own from the server error range
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+WORKSPACE_ERROR = -32001
+SESSION_BUSY = -32002
+
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+IDLE_SESSIONS_PER_WORKSPACE = 2
+MAX_NAMED_SESSIONS = 16
+NAMED_SESSION_TTL = 4 * 60 * 60.0
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+class Workspace:
+    """Warm state for one working directory, built from one config."""
+
+    def __init__(self, config: Config, shared_clients: SharedClients):
+        self.config = config
+        self.cache = WorkspaceCache()
+        # Pooled sessions share the cache, so resetting one must not empty it
+        self.pool = SessionPool(
+            lambda: Session(config, workspace=self.cache, shared_clients=shared_clients),
+            max_idle=IDLE_SESSIONS_PER_WORKSPACE,
+            clear_workspace=False,
+        )
+
+    async def close(self) -> None:
+        await self.pool.close()
+
+
+class NamedSession:
+    """A conversation kept across runs, and the workspace state it was built from."""
+
+    def __init__(self, cwd: Path, workspace: Workspace, session: Session):
+        self.cwd = cwd
+        self.workspace = workspace
+        self.session = session
+        self.last_used = time.monotonic()
+
+
+class _EventWriter(JsonlWriter):
+    """Sends the JSONL records as JSON-RPC "event" notifications on a connection."""
+
+    def __init__(self, writer: asyncio.StreamWriter, delta_coalesce_ms: float):
+        super().__init__(stream=None, delta_coalesce_ms=delta_coalesce_ms)
+        self.writer = writer
+
+    def _send(self, record: dict[str, Any]) -> None:
+        if not self.writer.is_closing():
+            self.writer.write(_encode({"jsonrpc": "2.0", "method": "event", "params": record}))
+
+    async def drain(self) -> None:
+        await self.writer.drain()
+
+
+class Daemon:
+    """Serves agent runs on a Unix socket until shutdown or idle_timeout seconds without requests."""
+
+    def __init__(self, path: Path, idle_timeout: float = 0.0):
+        self.path = path
+        self.idle_timeout = idle_timeout
+        self.started = time.monotonic()
+        self.requests = 0
+        self.shared_clients: SharedClients = {}
+        self.workspaces: dict[Path, Workspace] = {}
+        self.sessions: dict[str, NamedSession] = {}
+        self._busy: set[str] = set()
+        self._active = 0
+        self._last_request = time.monotonic()
+        self._stopped: asyncio.Event | None = None
+
+    async def serve(self) -> None:
+        self._stopped = asyncio.Event()
+        self._prepare_socket()
+        server = await asyncio.start_unix_server(self._handle_connection, path=str(self.path), limit=MAX_MESSAGE_BYTES)
+        os.chmod(self.path, 0o600)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stop)
+        watchdog = loop.create_task(self._watch_idle()) if self.idle_timeout > 0 else None
+        self._log(f"codentis {__version__} serving on {self.path} (pid {os.getpid()})")
+        try:
+            async with server:
+                await self._stopped.wait()
+        finally:
+            if watchdog is not None:
+                watchdog.cancel()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(sig)
+            await self._close()
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+            self._log("stopped")
+
+    def stop(self) -> None:
+        if self._stopped is not None:
+            self._stopped.set()
+
+    def _prepare_socket(self) -> None:
+        directory = self.path.parent
+        directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        check_private_dir(directory)
+        if self.path.exists():
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(str(self.path))
+            except OSError:
+                self.path.unlink()  # left behind by a daemon that did not shut down cleanly
+            else:
+                raise RuntimeError(f"A codentis daemon is already listening on {self.path}")
+            finally:
+                probe.close()
+
+    async def _watch_idle(self) -> None:
+        while True:
+            await asyncio.sleep(min(60.0, self.idle_timeout))
+            if self._active == 0 and time.monotonic() - self._last_request >= self.idle_timeout:
+                self._log(f"idle for {self.idle_timeout:.0f}s, shutting down")
+                self.stop()
+                return
+
+    async def _close(self) -> None:
+        for entry in self.sessions.values():
+            await entry.session.close()
+        self.sessions.clear()
+        for workspace in self.workspaces.values():
+            await workspace.close()
+        self.workspaces.clear()
+        for client in self.shared_clients.values():
+            await client.close()
+        self.shared_clients.clear()
+        await close_http_client()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while not reader.at_eof():
+                try:
+                    line = await reader.readline()
+                except ValueError:  # longer than MAX_MESSAGE_BYTES
+                    writer.write(_encode(_error_response(None, INVALID_REQUEST, "Message too large")))
+                    break
+                if not line.strip():
+                    continue
+                response = await self._dispatch(line, writer)
+                if response is not None:
+                    writer.write(_encode(response))
+                    await writer.drain()
+        except ConnectionError:
+            pass  # the client went away, possibly in the middle of a run
+        except asyncio.CancelledError:
+            pass  # the daemon is shutting down; nothing awaits this task
+        finally:
+            writer.close()
+
+    async def _dispatch(self, line: bytes, writer: asyncio.StreamWriter) -> dict[str, Any] | None:
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            return _error_response(None, PARSE_ERROR, f"Parse error: {e}")
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return _error_response(None, INVALID_REQUEST, "Invalid request")
+        request_id = request.get("id")
+        params = request.get("params") or {}
+        handler = getattr(self, f"_rpc_{request['method']}", None)
+        self.requests += 1
+        self._active += 1
+        try:
+            if handler is None:
+                raise RpcError(METHOD_NOT_FOUND, f"Method not found: {request['method']}")
+            if not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, "params must be an object")
+            result = await handler(params, writer)
+        except RpcError as e:
+            return _error_response(request_id, e.code, str(e))
+        except ConnectionError:
+            raise
+        except Exception as e:
+            return _error_response(request_id, INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+        finally:
+            self._active -= 1
+            self._last_request = time.monotonic()
+        if "id" not in request:
+            return None  # a notification gets no response
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    async def _rpc_ping(self, params: dict[str, Any], writer: asyncio.StreamWriter) -> dict[str, Any]:
+        return {
+            "version": __version__,
+            "pid": os.getpid(),
+            "uptime": round(time.monotonic() - self.started, 1),
+            "requests": self.requests,
+            "workspaces": [str(cwd) for cwd in self.workspaces],
+            "sessions": sorted(self.sessions),
+        }
+
+    async def _rpc_shutdown(self, params: dict[str, Any], writer: asyncio.StreamWriter) -> dict[str, Any]:
+        asyncio.get_running_loop().call_soon(self.stop)  # after this response is sent
+        return {}
+
+    async def _rpc_close_session(self, params: dict[str, Any], writer: asyncio.StreamWriter) -> dict[str, Any]:
+        name = _param(params, "session", str)
+        if name in self._busy:
+            raise RpcError(SESSION_BUSY, f"Session '{name}' is running a prompt")
+        entry = self.sessions.pop(name, None)
+        if entry is not None:
+            await entry.session.close()
+        return {"closed": entry is not None}
+
+    async def _rpc_run(self, params: dict[str, Any], writer: asyncio.StreamWriter) -> dict[str, Any]:
+        cwd = Path(_param(params, "cwd", str)).expanduser().resolve()
+        prompt = _param(params, "prompt", str)
+        name = _param(params, "session", str, required=False)
+        delta_coalesce_ms = _param(params, "delta_coalesce_ms", (int, float), required=False) or 0.0
+        started = time.perf_counter()
+
+        workspace = await self._workspace(cwd)
+        if name is not None:
+            session = await self._named_session(name, cwd, workspace)
+            self._busy.add(name)
+        else:
+            session = await workspace.pool.acquire()
+
+        before = session.usage
+        events = _EventWriter(writer, delta_coalesce_ms)
+        outcome = "failed"
+        try:
+            failed = await stream_events(Agent(session.config, session=session), prompt, events)
+            outcome = "error" if failed else "ok"
+            usage = dict((session.usage - before).__dict__)
+        except ConnectionError:
+            outcome = "client disconnected"
+            raise
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            # A run cut short may have left a tool call without its result
+            # in the conversation, so its session is not used again
+            finished = outcome in ("ok", "error")
+            if name is not None:
+                self._busy.discard(name)
+                if finished:
+                    self.sessions[name].last_used = time.monotonic()
+                else:
+                    await self.sessions.pop(name).session.close()
+            elif finished:
+                await workspace.pool.release(session)
+            else:
+                await session.close()
+            self._log(f"run {cwd}{f' [{name}]' if name else ''}: {outcome} in {time.perf_counter() - started:.1f}s")
+        return {"session": name, "exit_code": 1 if failed else 0, "usage": usage}
+
+    async def _named_session(self, name: str, cwd: Path, workspace: Workspace) -> Session:
+        if name in self._busy:
+            raise RpcError(SESSION_BUSY, f"Session '{name}' is already running a prompt")
+        entry = self.sessions.get(name)
+        if entry is not None and entry.cwd != cwd:
+            raise RpcError(INVALID_PARAMS, f"Session '{name}' belongs to {entry.cwd}")
+        if entry is not None and entry.workspace is not workspace:
+            # Built from a config (and cache) that _workspace() has since replaced
+            self._log(f"session [{name}]: config changed, starting a new conversation")
+            del self.sessions[name]
+            await entry.session.close()
+            entry = None
+        if entry is None:
+            await self._make_room()
+            session = Session(workspace.config, workspace=workspace.cache, shared_clients=self.shared_clients)
+            entry = self.sessions[name] = NamedSession(cwd, workspace, session)
+        return entry.session
+
+    async def _make_room(self) -> None:
+        """Close expired named sessions, then the least recently used ones, until one more fits."""
+        now = time.monotonic()
+        idle = sorted((entry.last_used, name) for name, entry in self.sessions.items() if name not in self._busy)
+        expired = sum(1 for last_used, _ in idle if now - last_used >= NAMED_SESSION_TTL)
+        count = max(expired, len(self.sessions) + 1 - MAX_NAMED_SESSIONS)
+        if count > len(idle):
+            raise RpcError(SESSION_BUSY, f"All {MAX_NAMED_SESSIONS} named sessions are running a prompt")
+        for _, name in idle[:count]:
+            await self.sessions.pop(name).session.close()
+
+    async def _workspace(self, cwd: Path) -> Workspace:
+        if not cwd.is_dir():
+            raise RpcError(WORKSPACE_ERROR, f"Not a directory: {cwd}")
+        if not WorkspaceTrust().is_trusted(cwd):
+            raise RpcError(WORKSPACE_ERROR, f"Workspace not trusted: {cwd}. Run 'codentis chat' there once to trust it.")
+        try:
+            config = load_config(cwd)
+        except ConfigError as e:
+            raise RpcError(WORKSPACE_ERROR, str(e)) from e
+        errors = config.validate()
+        if errors:
+            raise RpcError(WORKSPACE_ERROR, "; ".join(errors))
+
+        workspace = self.workspaces.get(cwd)
+        if workspace is None or workspace.config != config:
+            if workspace is not None:
+                await workspace.close()  # idle sessions were built from the old config
+            workspace = self.workspaces[cwd] = Workspace(config, self.shared_clients)
+        return workspace
+
+    def _log(self, message: str) -> None:
+        print(f"[{datetime.now():%H:%M:%S}] {message}", file=sys.stderr, flush=True)
+
+
+def _param(params: dict[str, Any], name: str, kind: type | tuple[type, ...], required: bool = True) -> Any:
+    value = params.get(name)
+    if value is None:
+        if required:
+            raise RpcError(INVALID_PARAMS, f"Missing parameter: {name}")
+        return None
+    if not isinstance(value, kind) or isinstance(value, bool):
+        raise RpcError(INVALID_PARAMS, f"Invalid parameter: {name}")
+    return value
+
+
+def _error_response(request_id: Any, code: int, message: str) -> dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def _encode(message: dict[str, Any]) -> bytes:
+    return (json.dumps(message, ensure_ascii=False, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+
+
+async def serve(path: Path, idle_timeout: float = 0.0) -> None:
+    """Run a daemon on path until it is shut down."""
+    await Daemon(path, idle_timeout).serve()
@@ -0,0 +1,195 @@
+"""Thin client for the `codentis serve` daemon.
+
+`codentis chat --daemon "<prompt>"` sends the prompt to a running daemon
+and prints the events it streams back, instead of starting an agent in
+this process. This module only imports the standard library:
+codentis.launcher calls main() before the Typer CLI is imported, so a
+forwarded prompt reaches the daemon after Python start-up and nothing
+else.
+
+The protocol is JSON-RPC 2.0 over the daemon's Unix-domain socket, one
+JSON object per line. A "run" request is answered by "event"
+notifications, one per agent event in the `--output jsonl` format, and
+then by its response:
+
+    -> {"jsonrpc": "2.0", "id": 1, "method": "run", "params": {"cwd": "/src/app", "prompt": "..."}}
+    <- {"jsonrpc": "2.0", "method": "event", "params": {"type": "text_delta", "data": {...}, "t": 0.41}}
+    <- {"jsonrpc": "2.0", "id": 1, "result": {"session": null, "exit_code": 0, "usage": {...}}}
+"""
+from __future__ import annotations
+import json
+import os
+import socket
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Callable
+
+SOCKET_ENV = "CODENTIS_SOCKET"
+
+
+class DaemonError(Exception):
+    """No daemon to talk to, or an error response from it."""
+
+    def __init__(self, message: str, code: int | None = None):
+        super().__init__(message)
+        self.code = code
+
+
+def socket_path() -> Path:
+    """Where the daemon listens: $CODENTIS_SOCKET, else a private per-user directory."""
+    override = os.environ.get(SOCKET_ENV)
+    if override:
+        return Path(override).expanduser()
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "codentis" / "daemon.sock"
+    return Path(tempfile.gettempdir()) / f"codentis-{os.getuid()}" / "daemon.sock"
+
+
+def check_private_dir(directory: Path) -> None:
+    """Refuse a socket directory other users could reach (or plant a socket in)."""
+    try:
+        info = directory.stat()
+    except FileNotFoundError:
+        return
+    if info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise DaemonError(f"{directory} must be owned by you and private (mode 700)")
+
+
+class DaemonClient:
+    """One connection to the daemon; its requests run one at a time."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self._sock: socket.socket | None = None
+        self._file = None
+        self._next_id = 0
+
+    def connect(self) -> DaemonClient:
+        if not hasattr(socket, "AF_UNIX"):
+            raise DaemonError("The codentis daemon needs Unix-domain sockets, which this platform does not have")
+        self.path = self.path or socket_path()
+        check_private_dir(self.path.parent)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(str(self.path))
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            sock.close()
+            raise DaemonError(f"No codentis daemon is listening on {self.path}. Start one with 'codentis serve'.") from e
+        self._sock = sock
+        self._file = sock.makefile("rb")
+        return self
+
+    def call(self, method: str, params: dict[str, Any] | None = None, on_event: Callable[[dict[str, Any]], None] | None = None) -> Any:
+        """Send a request and return its result, passing event notifications to on_event until then."""
+        self._next_id += 1
+        request = {"jsonrpc": "2.0", "id": self._next_id, "method": method, "params": params or {}}
+        self._sock.sendall(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        for line in self._file:
+            message = json.loads(line)
+            if "id" not in message:
+                if message.get("method") == "event" and on_event is not None:
+                    on_event(message["params"])
+                continue
+            error = message.get("error")
+            if error:
+                raise DaemonError(error.get("message", "Unknown error"), error.get("code"))
+            return message.get("result")
+        raise DaemonError("The daemon closed the connection")
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._file.close()
+            self._sock.close()
+            self._sock = None
+
+    def __enter__(self) -> DaemonClient:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+class _TextPrinter:
+    """Assistant text to stdout as it streams; tool calls and errors to stderr."""
+
+    def __init__(self):
+        self.at_line_start = True
+
+    def __call__(self, event: dict[str, Any]) -> None:
+        kind, data = event.get("type"), event.get("data") or {}
+        if kind == "text_delta":
+            content = data.get("content") or ""
+            if content:
+                sys.stdout.write(content)
+                sys.stdout.flush()
+                self.at_line_start = content.endswith("\n")
+        elif kind == "tool_call_start":
+            self._end_line()
+            print(f"⏺ {data.get('name')}", file=sys.stderr)
+        elif kind == "agent_error":
+            self._end_line()
+            print(f"Error: {data.get('error')}", file=sys.stderr)
+        elif kind == "agent_end":
+            self._end_line()
+
+    def _end_line(self) -> None:
+        if not self.at_line_start:
+            sys.stdout.write("\n")
+            sys.stdout.flush()
+            self.at_line_start = True
+
+
+def _print_jsonl(event: dict[str, Any]) -> None:
+    sys.stdout.write(json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n")
+    sys.stdout.flush()
+
+
+def forward_chat(prompt: str, cwd: Path | None = None, output: str = "text", delta_coalesce_ms: float = 0.0, session: str | None = None) -> int:
+    """Run prompt on the daemon, print its events and return the exit code."""
+    params: dict[str, Any] = {
+        "cwd": str((cwd or Path.cwd()).resolve()),
+        "prompt": prompt,
+        "delta_coalesce_ms": delta_coalesce_ms,
+    }
+    if session:
+        params["session"] = session
+    try:
+        with DaemonClient().connect() as client:
+            result = client.call("run", params, on_event=_print_jsonl if output == "jsonl" else _TextPrinter())
+    except DaemonError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        # Closing the connection stops the run in the daemon
+        return 130
+    return int(result.get("exit_code", 1))
+
+
+def main(argv: list[str]) -> int | None:
+    """Handle `codentis chat --daemon ...` here; None for anything the full CLI should parse."""
+    if not argv or argv[0] != "chat" or "--daemon" not in argv:
+        return None
+    options: dict[str, str] = {}
+    prompt: str | None = None
+    args = iter(argv[1:])
+    for arg in args:
+        if arg == "--daemon":
+            continue
+        name, eq, value = arg.partition("=")
+        if name in ("--cwd", "--output", "--delta-coalesce-ms", "--session"):
+            options[name] = value if eq else next(args, "")
+        elif arg.startswith("-") or prompt is not None:
+            return None  # --help, unknown options and mistakes get Typer's handling
+        else:
+            prompt = arg
+    try:
+        delta_coalesce_ms = float(options.get("--delta-coalesce-ms", "0"))
+    except ValueError:
+        return None
+    output = options.get("--output", "text")
+    if not prompt or output not in ("text", "jsonl") or delta_coalesce_ms < 0:
+        return None
+    cwd = options.get("--cwd")
+    return forward_chat(prompt, Path(cwd) if cwd else None, output, delta_coalesce_ms, options.get("--session"))
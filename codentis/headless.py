@@ -0,0 +1,111 @@
+"""Headless JSONL event stream for `codentis chat --output jsonl`.
+
+Every AgentEvent of a single-prompt run is written to stdout as one
+compact JSON line, with no TUI, spinner or terminal setup, so CI jobs and
+batch pipelines can consume the run (and measure its throughput) without
+terminal rendering in the way:
+
+    {"type":"text_delta","data":{"content":"Looking"},"t":0.412}
+
+t is seconds since the run started. Diffs are rendered to unified-diff
+text. With delta_coalesce_ms > 0, text deltas arriving within that window
+are joined into one text_delta line; any other event flushes them first,
+so the order of events is kept.
+
+The `codentis serve` daemon streams the same records to its clients,
+through a JsonlWriter subclass that wraps them in JSON-RPC notifications.
+"""
+from __future__ import annotations
+import asyncio
+import contextlib
+import json
+import sys
+import time
+from typing import Any, TextIO
+from codentis.agent.agent import Agent
+from codentis.agent.events import AgentEvent, AgentEventType
+from codentis.client.http_client import close_http_client
+from codentis.config.config import Config
+
+
+class JsonlWriter:
+    """Writes AgentEvents as JSON lines, optionally batching text deltas."""
+
+    def __init__(self, stream: TextIO, delta_coalesce_ms: float = 0.0):
+        self.stream = stream
+        self.window = delta_coalesce_ms / 1000
+        self.started = time.perf_counter()
+        self.lines = 0
+        self._text: list[str] = []
+        self._timer: asyncio.TimerHandle | None = None
+
+    def emit(self, event: AgentEvent) -> None:
+        if event.type == AgentEventType.TEXT_DELTA and self.window > 0:
+            self._text.append(event.data.get("content") or "")
+            if self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(self.window, self.flush_text)
+            return
+        self.flush_text()
+        self._write(event.to_dict())
+
+    def flush_text(self) -> None:
+        """Write the batched text deltas, if any, as one text_delta line."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._text:
+            content = "".join(self._text)
+            self._text.clear()
+            self._write(AgentEvent.text_delta(content).to_dict())
+
+    async def drain(self) -> None:
+        """Wait until written lines have been handed off; streams that buffer override it."""
+
+    def _write(self, record: dict[str, Any]) -> None:
+        record["t"] = round(time.perf_counter() - self.started, 4)
+        self._send(record)
+        self.lines += 1
+
+    def _send(self, record: dict[str, Any]) -> None:
+        self.stream.write(json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str) + "\n")
+        self.stream.flush()
+
+
+async def run_jsonl(config: Config, message: str, delta_coalesce_ms: float = 0.0, stream: TextIO | None = None) -> int:
+    """Run one prompt and write its events as JSONL; returns 1 if the agent reported an error, else 0."""
+    writer = JsonlWriter(stream or sys.stdout, delta_coalesce_ms)
+    try:
+        async with Agent(config) as agent:
+            failed = await stream_events(agent, message, writer)
+    finally:
+        await close_http_client()
+    return 1 if failed else 0
+
+
+async def stream_events(agent: Agent, message: str, writer: JsonlWriter) -> bool:
+    """Run message on agent and emit every event through writer; True if the agent reported an error."""
+    failed = False
+    try:
+        # Closed even when drain() fails (the daemon's client went away), so
+        # the run's own cleanup happens before its session is reused
+        async with contextlib.aclosing(agent.run(message)) as events:
+            async for event in events:
+                if event.type == AgentEventType.TOOL_CALL_START:
+                    _attach_progress(agent, writer, event)
+                elif event.type == AgentEventType.AGENT_ERROR:
+                    failed = True
+                writer.emit(event)
+                await writer.drain()
+    finally:
+        writer.flush_text()
+    return failed
+
+
+def _attach_progress(agent: Agent, writer: JsonlWriter, event: AgentEvent) -> None:
+    # Sub-agents report progress through the registry callback, not as events
+    registry = agent.session.tool_registry
+    if event.data.get("name", "").startswith("subagent_"):
+        call_id = event.data.get("call_id", "")
+        registry.progress_callback = lambda status: writer.emit(AgentEvent.tool_call_progress(call_id, status))
+    else:
+        registry.progress_callback = None
@@ -0,0 +1,23 @@
+"""Console entry point for the `codentis` command.
+
+`codentis chat --daemon ...` is handed to the thin daemon client before
+the Typer CLI is imported. Loading typer, rich and cli.py takes longer
+than a warm daemon needs to answer, so a forwarded prompt skips it.
+Everything else goes to codentis.cli.
+"""
+import sys
+
+
+def run() -> None:
+    from codentis.daemon_client import main
+
+    code = main(sys.argv[1:])
+    if code is not None:
+        sys.exit(code)
+
+    from codentis.cli import run as run_cli
+    run_cli()
+
+
+if __name__ == "__main__":
+    run()
@@ -1,13 +1,17 @@
 from __future__ import annotations
 import abc
 from enum import Enum
-from typing import Any
+from functools import lru_cache
+from typing import Any, TypeVar
 from pydantic import BaseModel
 from dataclasses import dataclass
 from pathlib import Path
 from pydantic import ValidationError
 from dataclasses import field
 from codentis.config.config import Config
+from codentis.context.workspace_cache import WorkspaceCache
+
+ParamsT = TypeVar("ParamsT", bound=BaseModel)
 
 class ToolKind(Enum):
     READ = "read"
@@ -24,9 +28,22 @@ class FileDiff:
     new_content: str
     is_new_file: bool = False
     is_deletion: bool = False
-    
+    _rendered: str | None = field(default=None, init=False, repr=False, compare=False)
+
     def to_diff(self) -> str:
-        import difflib
+        # Rendering is deferred until someone asks for it (the TUI expanding a
+        # tool output, a JSON consumer, ...) and cached afterwards.
+        if self._rendered is None:
+            self._rendered = self._render()
+        return self._rendered
+
+    @property
+    def rendered(self) -> str | None:
+        """The rendered diff if to_diff() has already run, else None."""
+        return self._rendered
+
+    def _render(self) -> str:
+        from codentis.utils.diff import MAX_OUTPUT_LINES, diff_summary, unified_diff
 
         old_lines = self.old_content.splitlines(keepends=True)
         new_lines = self.new_content.splitlines(keepends=True)
@@ -39,7 +56,9 @@ class FileDiff:
         path_str = str(self.path)
 
         if self.is_new_file:
-            # difflib produces no hunks when old is empty; build the header manually
+            if len(new_lines) > MAX_OUTPUT_LINES:
+                return diff_summary(path_str, old_lines, new_lines)
+            # No hunks to compute when old is empty; build the header manually
             diff_lines = [
                 f"--- /dev/null\n",
                 f"+++ {path_str}\n",
@@ -50,6 +69,8 @@ class FileDiff:
             return "".join(diff_lines)
 
         if self.is_deletion:
+            if len(old_lines) > MAX_OUTPUT_LINES:
+                return diff_summary(path_str, old_lines, new_lines)
             diff_lines = [
                 f"--- {path_str}\n",
                 f"+++ /dev/null\n",
@@ -59,19 +80,47 @@ class FileDiff:
                 diff_lines.extend(f"-{line}" for line in old_lines)
             return "".join(diff_lines)
 
-        result = "".join(difflib.unified_diff(
+        result = unified_diff(
             old_lines,
             new_lines,
             fromfile=path_str,
             tofile=path_str,
-        ))
+        )
         return result or "(no changes)"
 
+    def __str__(self) -> str:
+        return self.to_diff()
+
+@dataclass
+class MultiFileDiff:
+    """Diffs of several files changed by one tool call, rendered on demand."""
+    diffs: list[FileDiff] = field(default_factory=list)
+
+    def to_diff(self) -> str:
+        return "\n".join(diff.to_diff() for diff in self.diffs)
+
+    def __str__(self) -> str:
+        return self.to_diff()
+
+def render_diff(diff: FileDiff | MultiFileDiff | str | None) -> str | None:
+    if diff is None or isinstance(diff, str):
+        return diff
+    return diff.to_diff()
+
 @dataclass
 class ToolInvocation:
     params: dict[str, Any] 
     cwd: Path
     metadata: dict[str, Any] = field(default_factory=dict)
+    workspace: WorkspaceCache | None = None
+    # params already validated against the tool's schema by the registry
+    parsed: BaseModel | None = None
+
+    def parsed_params(self, schema: type[ParamsT]) -> ParamsT:
+        """The validated params model, validating here only if the registry has not."""
+        if isinstance(self.parsed, schema):
+            return self.parsed
+        return schema.model_validate(self.params)
 
 @dataclass
 class ToolResult:
@@ -80,7 +129,7 @@ class ToolResult:
     error: str | None = None
     metadata: dict[str, Any] = field(default_factory=dict)
     truncated: bool = False
-    diff: FileDiff | str | None = None
+    diff: FileDiff | MultiFileDiff | str | None = None
     exit_code: int | None = None
 
     @classmethod
@@ -119,24 +168,36 @@ class Tool(abc.ABC):
     async def execute(self,invocation: ToolInvocation)->Any:
         raise NotImplementedError("Tool must define execute method")
 
-    def validate_params(self, params: dict[str, Any])->list[str]:
+    def parse_params(self, params: dict[str, Any])->tuple[BaseModel | None, list[str]]:
+        """Validate params once, returning (model instance, errors)."""
         schema = self.schema
         if isinstance(schema, type) and issubclass(schema, BaseModel):
             try:
-                schema(**params)
+                return schema.model_validate(params), []
             except ValidationError as e:
                 errors = []
                 for error in e.errors():
                     field = ".".join(str(x) for x in error.get("loc", []))
                     message = error.get("msg", "Unknown error")
                     errors.append(f"Parameter {field}: {message}")
-                return errors
+                return None, errors
             except Exception as e:
-                return [str(e)] 
+                return None, [str(e)]
+        return None, []
+
+    def validate_params(self, params: dict[str, Any])->list[str]:
+        return self.parse_params(params)[1]
     
     def is_mutating(self, params: dict[str, Any])->bool:
         return self.kind in {ToolKind.WRITE, ToolKind.SHELL, ToolKind.NETWORK, ToolKind.MEMORY}
 
+    def is_cacheable(self, params: dict[str, Any])->bool:
+        """Whether identical calls return identical results until the workspace changes."""
+        return self.kind == ToolKind.READ
+
+    async def close(self)->None:
+        """Release resources the tool holds; called when its session closes."""
+
     async def get_confirmation(self, invocation: ToolInvocation)->ToolInvocation | None:
         if not self.is_mutating(invocation.params):
             return None
@@ -184,32 +245,10 @@ class Tool(abc.ABC):
         schema = self.schema
 
         if isinstance(schema, type) and issubclass(schema, BaseModel):
-            json_schema = schema.model_json_schema(mode="serialization")
-            
-            def resolve_refs(obj: Any, defs: dict[str, Any]) -> Any:
-                if isinstance(obj, dict):
-                    if "$ref" in obj:
-                        ref_path = obj["$ref"]
-                        if ref_path.startswith("#/$defs/"):
-                            def_name = ref_path.split("/")[-1]
-                            return resolve_refs(defs.get(def_name, {}), defs)
-                    return {k: resolve_refs(v, defs) for k, v in obj.items()}
-                elif isinstance(obj, list):
-                    return [resolve_refs(item, defs) for item in obj]
-                return obj
-
-            defs = json_schema.get("$defs", {})
-            properties = resolve_refs(json_schema.get("properties", {}), defs)
-            required = json_schema.get("required", [])
-
             return {
                 "name": self.name,
                 "description": self.description,
-                "parameters": {
-                    "type": "object",
-                    "properties": properties,
-                    "required": required
-                }
+                "parameters": _model_parameters(schema),
             }
 
         if isinstance(schema, dict):
@@ -225,4 +264,32 @@ class Tool(abc.ABC):
 
             return result
 
-        raise ValueError(f"Invalid schema type for tool {self.name}: {type(schema)}")
\ No newline at end of file
+        raise ValueError(f"Invalid schema type for tool {self.name}: {type(schema)}")
+
+@lru_cache(maxsize=None)
+def _model_parameters(schema: type[BaseModel]) -> dict[str, Any]:
+    # Building the JSON schema is far more expensive than validating, and the
+    # registry asks for every tool's schema on every turn, so do it once per class.
+    json_schema = schema.model_json_schema(mode="serialization")
+
+    def resolve_refs(obj: Any, defs: dict[str, Any]) -> Any:
+        if isinstance(obj, dict):
+            if "$ref" in obj:
+                ref_path = obj["$ref"]
+                if ref_path.startswith("#/$defs/"):
+                    def_name = ref_path.split("/")[-1]
+                    return resolve_refs(defs.get(def_name, {}), defs)
+            return {k: resolve_refs(v, defs) for k, v in obj.items()}
+        elif isinstance(obj, list):
+            return [resolve_refs(item, defs) for item in obj]
+        return obj
+
+    defs = json_schema.get("$defs", {})
+    properties = resolve_refs(json_schema.get("properties", {}), defs)
+    required = json_schema.get("required", [])
+
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": required
+    }
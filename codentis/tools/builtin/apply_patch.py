@@ -4,7 +4,9 @@ import subprocess
 import tempfile
 import os
 
-from codentis.tools.base import Tool, ToolKind, ToolResult, ToolInvocation
+from codentis.tools.base import Tool, ToolKind, ToolResult, ToolInvocation, FileDiff, MultiFileDiff
+from codentis.utils.blocking import run_blocking
+from codentis.utils.edits import plan_edits, apply_spans
 
 class FileEdit(BaseModel):
     path: str = Field(..., description="Path to the file to modify")
@@ -24,20 +26,25 @@ class ApplyPatchTool(Tool):
         "and you MUST use this for making multiple separate edits within a single file or across multiple files. "
         "DO NOT use unified diff format. Instead, provide a list of exact text replacements for each file. "
         "Each 'old_string' MUST match the file contents EXACTLY, including all indentation and whitespace. "
+        "All edits to a file are matched against its ORIGINAL contents and must not overlap. "
         "If a string is not unique, include more context lines."
     )
     kind = ToolKind.WRITE
     schema = ApplyPatchToolParams
 
     async def execute(self, invocation: ToolInvocation) -> ToolResult:
-        params = ApplyPatchToolParams(**invocation.params)
+        return await run_blocking(self._execute, invocation)
+
+    def _execute(self, invocation: ToolInvocation) -> ToolResult:
+        params = invocation.parsed_params(ApplyPatchToolParams)
         cwd = invocation.cwd
 
         error_log = ""
         original_contents = {}
         file_contents = {}
+        file_edits: dict[Path, list[tuple[int, str, str]]] = {}
         
-        # Phase 1: validate and apply in memory
+        # Phase 1: resolve paths and group the edits per file
         for idx, edit in enumerate(params.edits):
             try:
                 file_path = (cwd / edit.path).resolve()
@@ -51,53 +58,54 @@ class ApplyPatchTool(Tool):
                     error_log += f"Edit {idx+1} failed: Path {edit.path} is outside workspace.\n"
                     continue
 
-                if file_path not in file_contents:
-                    orig_content = file_path.read_text(encoding='utf-8')
-                    original_contents[file_path] = orig_content
-                    file_contents[file_path] = orig_content
-                    
-                content = file_contents[file_path]
-                
-                if edit.old_string not in content:
-                    match_err = self.no_match_error(edit.old_string, content, file_path)
-                    error_log += f"Edit {idx+1} failed: {match_err.error}\n"
-                    continue
-                
-                if content.count(edit.old_string) > 1:
-                    error_log += f"Edit {idx+1} failed: Found multiple matches for old_string in {edit.path}, please include more context lines to make it unique.\n"
-                    continue
-                
-                # Apply in memory
-                file_contents[file_path] = content.replace(edit.old_string, edit.new_string)
+                if file_path not in original_contents:
+                    original_contents[file_path] = file_path.read_text(encoding='utf-8')
+                    file_edits[file_path] = []
+                file_edits[file_path].append((idx, edit.old_string, edit.new_string))
                 
             except Exception as e:
                 error_log += f"Error processing edit {idx+1} for {edit.path}: {e}\n"
 
+        # Phase 2: locate every anchor against the original content and
+        # build each file in a single splice
+        edit_errors: dict[int, str] = {}
+        normalized_edits = 0
+        for file_path, edits in file_edits.items():
+            content = original_contents[file_path]
+            plan = plan_edits(content, edits)
+
+            for idx in plan.not_found:
+                match_err = self.no_match_error(params.edits[idx].old_string, content, file_path)
+                edit_errors[idx] = match_err.error
+            for idx, message in plan.errors.items():
+                edit_errors[idx] = f"{message} ({params.edits[idx].path})"
+
+            if plan.ok:
+                file_contents[file_path] = apply_spans(content, plan.spans)
+                normalized_edits += sum(1 for span in plan.spans if span.view != "exact")
+
+        for idx in sorted(edit_errors):
+            error_log += f"Edit {idx+1} failed: {edit_errors[idx]}\n"
+
         if error_log:
             return ToolResult.error_result(f"Failed to apply patch due to errors. NO CHANGES WERE MADE:\n{error_log}", output="")
             
-        # Phase 2: Compute overall diff and write all to disk
-        consolidated_diff = ""
-        from tools.base import FileDiff
+        # Phase 3: Write all to disk; the combined diff is rendered lazily
+        consolidated_diff = MultiFileDiff()
 
         try:
             for file_path, content in file_contents.items():
-                diff_obj = FileDiff(
+                consolidated_diff.diffs.append(FileDiff(
                     path=file_path,
                     old_content=original_contents[file_path],
                     new_content=content
-                )
-                if diff_str := diff_obj.to_diff():
-                    if consolidated_diff:
-                        consolidated_diff += "\n"
-                    consolidated_diff += diff_str
-                    
+                ))
                 file_path.write_text(content, encoding='utf-8')
         except Exception as e:
             return ToolResult.error_result(f"Error saving files: {e}", output="")
         
         return ToolResult.success_result(
             output=f"Successfully applied {len(params.edits)} edits affecting {len(file_contents)} file(s).", 
-            metadata={"edits_applied": len(params.edits)},
+            metadata={"edits_applied": len(params.edits), "normalized_edits": normalized_edits},
             diff=consolidated_diff
         )
@@ -28,7 +28,7 @@ class AskUserTool(Tool):
     schema: type[BaseModel] = AskUserParams
 
     async def execute(self, invocation: ToolInvocation) -> ToolResult:
-        params = AskUserParams(**invocation.params)
+        params = invocation.parsed_params(AskUserParams)
         
         # Return a special result that signals the app to prompt the user
         return ToolResult(
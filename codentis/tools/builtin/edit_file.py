@@ -1,6 +1,7 @@
 from pathlib import Path
 from pydantic import BaseModel, Field
 from codentis.tools.base import Tool, ToolKind, FileDiff, ToolResult, ToolInvocation
+from codentis.utils.blocking import run_blocking
 from codentis.utils.paths import resolve_path, ensure_parent_directory_exists
 
 class EditFileToolParams(BaseModel):
@@ -35,8 +36,11 @@ class EditFileTool(Tool):
     kind = ToolKind.WRITE
     schema = EditFileToolParams
 
-    async def execute(self, invocation: ToolInvocation)->ToolResult:
-        params = EditFileToolParams(**invocation.params)
+    async def execute(self, invocation: ToolInvocation) -> ToolResult:
+        return await run_blocking(self._execute, invocation)
+
+    def _execute(self, invocation: ToolInvocation) -> ToolResult:
+        params = invocation.parsed_params(EditFileToolParams)
         path = resolve_path(invocation.cwd, params.path)
 
         if not path.exists():
@@ -1,4 +1,5 @@
 from codentis.tools.base import Tool, ToolResult, ToolKind, ToolInvocation
+from codentis.utils.blocking import run_blocking
 from pydantic import BaseModel, Field
 from codentis.utils.paths import resolve_path
 import re
@@ -6,6 +7,7 @@ import os
 import sys
 from codentis.utils.paths import is_binary_file
 from pathlib import Path
+from codentis.context.workspace_cache import walk_files
 
 class GlobParams(BaseModel):
     pattern: str = Field(..., description="The glob pattern to match. (e.g **/*.py)")
@@ -18,7 +20,10 @@ class GlobTool(Tool):
     schema = GlobParams
     
     async def execute(self, invocation: ToolInvocation) -> ToolResult:
-        params = GlobParams(**invocation.params)
+        return await run_blocking(self._execute, invocation)
+
+    def _execute(self, invocation: ToolInvocation) -> ToolResult:
+        params = invocation.parsed_params(GlobParams)
         search_path = resolve_path(invocation.cwd, params.path)
 
         if not search_path.exists():
@@ -27,20 +32,22 @@ class GlobTool(Tool):
         try:
             import fnmatch
             matched_files_list = []
-            EXCLUDED_DIRS = {"node_modules", "venv", ".venv", "build", "dist", "__pycache__", "target", ".git", ".vscode", ".idea", "out"}
-            
             pattern = params.pattern
-            
-            for root, dirs, filenames in os.walk(search_path):
-                dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
-                
-                for filename in filenames:
-                    file_path = Path(root) / filename
-                    rel_path = file_path.relative_to(search_path)
-                    
-                    # Match against pattern
-                    if fnmatch.fnmatch(str(rel_path).replace("\\", "/"), pattern.replace("\\", "/")):
-                        matched_files_list.append(file_path)
+            if invocation.workspace:
+                listing = invocation.workspace.list_files(search_path)
+            else:
+                listing = walk_files(search_path)
+
+            pattern = pattern.replace("\\", "/")
+            # Compiled once instead of fnmatch.fnmatch() per entry
+            match = re.compile(fnmatch.translate(os.path.normcase(pattern))).match
+            prefix = len(os.path.join(str(search_path), ""))
+            for name in listing:
+                rel_path = name[prefix:]
+
+                # Match against pattern
+                if match(os.path.normcase(rel_path.replace("\\", "/"))):
+                    matched_files_list.append(Path(name))
 
         except Exception as e:
             return ToolResult.error_result(f"Error globbing pattern: {e}")
@@ -1,4 +1,5 @@
 from codentis.tools.base import Tool, ToolResult, ToolKind, ToolInvocation
+from codentis.utils.blocking import run_blocking
 from pydantic import BaseModel, Field
 from codentis.utils.paths import resolve_path
 import re
@@ -6,6 +7,7 @@ import os
 import sys
 from codentis.utils.paths import is_binary_file
 from pathlib import Path
+from codentis.context.workspace_cache import WorkspaceCache, iter_files, read_text_file
 
 class GrepParams(BaseModel):
     pattern: str = Field(..., description="The pattern to search for.")
@@ -20,7 +22,10 @@ class GrepTool(Tool):
     schema = GrepParams
     
     async def execute(self, invocation: ToolInvocation) -> ToolResult:
-        params = GrepParams(**invocation.params)
+        return await run_blocking(self._execute, invocation)
+
+    def _execute(self, invocation: ToolInvocation) -> ToolResult:
+        params = invocation.parsed_params(GrepParams)
         search_path = resolve_path(invocation.cwd, params.path)
 
         if not search_path.exists():
@@ -34,17 +39,22 @@ class GrepTool(Tool):
             return ToolResult.error_result(f"Error compiling pattern: {e}")
         
         if search_path.is_dir():
-            files = self.find_files(search_path)
+            files = self.find_files(search_path, invocation.workspace)
         else:
             files = [search_path]
 
         output_lines = []
         matches = 0
+        bytes_read = 0
         for file_path in files:
             try:
-                content = file_path.read_text(encoding="utf-8")        
+                if invocation.workspace:
+                    content = invocation.workspace.read_text(file_path)
+                else:
+                    content = read_text_file(file_path)
             except Exception as e:
                 return ToolResult.error_result(f"Error reading file: {e}")
+            bytes_read += len(content)
             
             lines = content.splitlines()
             file_matches = False
@@ -67,7 +77,8 @@ class GrepTool(Tool):
                 metadata={
                     "path": str(search_path),
                     "matches": 0,
-                    "files_searched": len(files)
+                    "files_searched": len(files),
+                    "bytes_read": bytes_read,
                 }
             )
 
@@ -79,22 +90,25 @@ class GrepTool(Tool):
             metadata={
                 "path": str(search_path),
                 "matches": matches,
-                "files_searched": len(files)
+                "files_searched": len(files),
+                "bytes_read": bytes_read,
             }
         )
         
-    def find_files(self,search_path: Path) -> list[Path]:
+    def find_files(self, search_path: Path, workspace: WorkspaceCache | None = None) -> list[Path]:
         files = []
-        for root, dirs, filenames in os.walk(search_path):
-            dirs[:] = [d for d in dirs if d not in {"node_modules", "venv", ".venv", "build", "dist", "__pycache__", "target", ".git", ".vscode", ".idea", "out"}]
-            for filename in filenames:
-                if filename.startswith('.'):
-                    continue
-
-                file_path = Path(root) / filename
+        # A cached listing is reused, but a fresh walk stops at the cap
+        # below instead of listing (and caching) the whole tree first
+        listing = workspace.cached_listing(search_path) if workspace else None
+        if listing is None:
+            listing = iter_files(search_path)
+        for name in listing:
+            if os.path.basename(name).startswith('.'):
+                continue
 
-                if not is_binary_file(file_path):
-                    files.append(file_path)
-                    if len(files) >= 500:
-                        return files
+            file_path = Path(name)
+            if not is_binary_file(file_path):
+                files.append(file_path)
+                if len(files) >= 500:
+                    return files
         return files
\ No newline at end of file
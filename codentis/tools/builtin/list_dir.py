@@ -1,4 +1,5 @@
 from codentis.tools.base import Tool, ToolResult, ToolKind, ToolInvocation
+from codentis.utils.blocking import run_blocking
 from pydantic import BaseModel, Field
 from codentis.utils.paths import resolve_path
 
@@ -16,7 +17,10 @@ class ListDirTool(Tool):
     schema = ListDirParams
     
     async def execute(self, invocation: ToolInvocation) -> ToolResult:
-        params = ListDirParams(**invocation.params)
+        return await run_blocking(self._execute, invocation)
+
+    def _execute(self, invocation: ToolInvocation) -> ToolResult:
+        params = invocation.parsed_params(ListDirParams)
         dir_path = resolve_path(invocation.cwd, params.path)
 
         if not dir_path.exists() or not dir_path.is_dir():
@@ -1,9 +1,11 @@
 from pydantic import BaseModel
 from codentis.tools.base import Tool
+from codentis.utils.blocking import run_blocking
 from pydantic import Field
 from codentis.tools.base import ToolInvocation, ToolResult, ToolKind
 from codentis.utils.paths import resolve_path, is_binary_file
 from codentis.utils.text import count_tokens, truncate_text
+from codentis.context.workspace_cache import read_text_file
 import os
 
 MODEL_NAME = os.getenv("MODEL_NAME")
@@ -30,7 +32,10 @@ class ReadFileTool(Tool):
     MAX_OUTPUT_TOKENS = 25000
 
     async def execute(self, invocation: ToolInvocation) -> ToolResult:
-        params = ReadFileParams(**invocation.params)
+        return await run_blocking(self._execute, invocation)
+
+    def _execute(self, invocation: ToolInvocation) -> ToolResult:
+        params = invocation.parsed_params(ReadFileParams)
         path = resolve_path(invocation.cwd, params.path)
 
         if not path.exists():
@@ -55,16 +60,16 @@ class ReadFileTool(Tool):
             )
         
         try:
-            try:
-                content = path.read_text(encoding="utf-8")
-            except UnicodeDecodeError:
-                content = path.read_text(encoding="latin-1")
+            if invocation.workspace:
+                content = invocation.workspace.read_text(path)
+            else:
+                content = read_text_file(path)
             
             lines = content.splitlines()
             total_lines = len(lines)
 
             if total_lines == 0:
-                return ToolResult.success_result("File is empty.", metadata={"total_lines": total_lines})
+                return ToolResult.success_result("File is empty.", metadata={"total_lines": total_lines, "bytes_read": file_size})
 
             start_idx = max(0, params.offset-1)
             
@@ -111,6 +116,7 @@ class ReadFileTool(Tool):
                     'shown_start': start_idx+1,
                     'shown_end': end_idx,
                     "lines_read": len(selected_lines),
+                    "bytes_read": file_size,
                 }
             )
         except Exception as e:
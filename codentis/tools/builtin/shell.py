@@ -104,8 +104,19 @@ class ShellTool(Tool):
     kind: ToolKind = ToolKind.SHELL
     schema: type[BaseModel] = ShellParams
 
+    async def _kill(self, process: asyncio.subprocess.Process) -> None:
+        if process.returncode is None:
+            try:
+                if self.config.shell_environment.platform != "Windows":
+                    os.killpg(os.getpgid(process.pid), signal.SIGKILL)
+                else:
+                    process.kill()
+            except ProcessLookupError:
+                pass
+        await process.wait()
+
     async def execute(self, invocation: ToolInvocation) -> ToolResult:
-        params = ShellParams(**invocation.params)
+        params = invocation.parsed_params(ShellParams)
 
         cmd_lower = params.command.strip().lower()
         cmd_parts = cmd_lower.split()
@@ -185,13 +196,13 @@ class ShellTool(Tool):
                     process.communicate(),
                     timeout=params.timeout
                 )
+            except asyncio.CancelledError:
+                # The caller gave up (e.g. a sub-agent timeout): don't leave the
+                # detached process group running
+                await self._kill(process)
+                raise
             except asyncio.TimeoutError:
-                platform_name = self.config.shell_environment.platform
-                if platform_name != "Windows":
-                    os.killpg(os.getpgid(process.pid), signal.SIGKILL)
-                else:
-                    process.kill()
-                await process.wait()
+                await self._kill(process)
                 return ToolResult.error_result(
                     f"Command timed out after {params.timeout} seconds",
                     metadata={
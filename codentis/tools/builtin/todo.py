@@ -1,119 +1,158 @@
-import uuid
-import json
 from codentis.tools.base import Tool, ToolResult, ToolKind, ToolInvocation
+from codentis.utils.blocking import run_blocking
 from pydantic import BaseModel, Field
-from pathlib import Path
 from codentis.config.config import Config
-from codentis.config.loader import get_data_dir
+from codentis.context.todo_store import PRIORITIES, STATUSES, TodoItem, TodoStore
+
+STATUS_ICONS = {"pending": "☐", "in_progress": "◐", "completed": "☑", "cancelled": "☒"}
+
+class TodoItemParams(BaseModel):
+    id: str | None = Field(None, description="Task ID (required when updating)")
+    content: str | None = Field(None, description="Task description (required when adding)")
+    status: str | None = Field(None, description=f"One of: {', '.join(STATUSES)}")
+    priority: str | None = Field(None, description=f"One of: {', '.join(PRIORITIES)}")
+    position: int | None = Field(None, description="Sort position in the list (lower comes first)")
 
 class TodoParams(BaseModel):
-    action: str = Field(..., description="Action : 'add', 'remove', 'list', 'clear', 'complete'")
-    id: str = Field(None, description="Task ID (for complete or remove)")
-    content: str = Field(None, description="Todo content (for add)")
+    action: str = Field(..., description="Action : 'add', 'update', 'complete', 'remove', 'list', 'clear'")
+    id: str = Field(None, description="Task ID (for update, complete or remove)")
+    content: str = Field(None, description="Todo content (for add, or new content for update)")
+    status: str | None = Field(None, description=f"Task status for add/update ({', '.join(STATUSES)}), or a status filter for list")
+    priority: str | None = Field(None, description=f"Task priority for add/update ({', '.join(PRIORITIES)})")
+    position: int | None = Field(None, description="Sort position for add/update (lower comes first)")
+    items: list[TodoItemParams] | None = Field(
+        None,
+        description="Batch of tasks for 'add' (each with content) or 'update' (each with id). Use this to write or revise a whole plan in one call."
+    )
 
 class TodoTool(Tool):
     name = "todo"
-    description = "Manage a task list for the current project. Supports adding, removing, and listing tasks. Use this to track your progress on the project."
+    description = "Manage a task list for the current project. Supports adding (one task or a batch), updating status, priority and order, completing, removing, and listing tasks. Use this to track your progress on the project."
     kind = ToolKind.MEMORY
     schema = TodoParams
 
     def __init__(self, config: Config):
         super().__init__(config)
-    
-    def _get_todo_path(self) -> Path:
-        data_dir = get_data_dir()
-        data_dir.mkdir(parents=True, exist_ok=True)
-        return data_dir / "todos.json"
-
-    def load_todos(self) -> dict:
-        path = self._get_todo_path()
-        if not path.exists():
-            return {'todos': {}, 'completed': {}}
-        
-        try:
-            content = path.read_text(encoding="utf-8")
-            return json.loads(content)
-        except Exception:
-            return {'todos': {}, 'completed': {}}
-    
-    def save_todos(self, data: dict):
-        path = self._get_todo_path()
-        path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
-    
+        self._stores: dict[str, TodoStore] = {}
+
+    def _get_store(self, cwd) -> TodoStore:
+        workspace = str(cwd.resolve())
+        if workspace not in self._stores:
+            self._stores[workspace] = TodoStore(workspace)
+        return self._stores[workspace]
+
+    @staticmethod
+    def _check_fields(item: dict) -> str | None:
+        if item.get("status") is not None and item["status"] not in STATUSES:
+            return f"Invalid status '{item['status']}'. Use one of: {', '.join(STATUSES)}"
+        if item.get("priority") is not None and item["priority"] not in PRIORITIES:
+            return f"Invalid priority '{item['priority']}'. Use one of: {', '.join(PRIORITIES)}"
+        return None
+
+    @staticmethod
+    def _format(item: TodoItem) -> str:
+        priority = "" if item.priority == "medium" else f" [{item.priority}]"
+        return f"{STATUS_ICONS.get(item.status, '☐')} {item.content}{priority} (ID: {item.id})"
+
     async def execute(self, invocation: ToolInvocation) -> ToolResult:
-        params = TodoParams(**invocation.params)
-        data = self.load_todos()
-        todos = data.get('todos', {})
-        completed = data.get('completed', {})
+        return await run_blocking(self._execute, invocation)
+
+    def _execute(self, invocation: ToolInvocation) -> ToolResult:
+        params = invocation.parsed_params(TodoParams)
+        store = self._get_store(invocation.cwd)
+        single = {
+            "id": params.id,
+            "content": params.content,
+            "status": params.status,
+            "priority": params.priority,
+            "position": params.position,
+        }
+        batch = [item.model_dump() for item in params.items] if params.items else None
 
         if params.action == "add":
-            if not params.content:
-                return ToolResult.error_result("`content` is required for `add` action")
+            items = batch or [single]
+            for item in items:
+                if not item.get("content"):
+                    return ToolResult.error_result("`content` is required for `add` action")
+                error = self._check_fields(item)
+                if error:
+                    return ToolResult.error_result(error)
 
-            todo_id = str(uuid.uuid4())[:8]
-            todos[todo_id] = params.content
-            data['todos'] = todos
-            self.save_todos(data)
+            added, duplicates = store.add_many(items)
+            if duplicates:
+                return ToolResult.error_result(
+                    f"Todo with ID: {', '.join(duplicates)} already exists. Use `update` to change it, or leave `id` out to get a new one"
+                )
+            if len(added) == 1:
+                return ToolResult.success_result(
+                    f"✓ Adding task: {added[0].content}",
+                    metadata={"action": "add", "id": added[0].id, "content": added[0].content}
+                )
+            lines = [f"✓ Added {len(added)} tasks:"] + [self._format(item) for item in added]
             return ToolResult.success_result(
-                f"✓ Adding task: {params.content}",
-                metadata={"action": "add", "id": todo_id, "content": params.content}
+                "\n".join(lines),
+                metadata={"action": "add", "count": len(added), "ids": [item.id for item in added]}
             )
 
-        elif params.action == "complete":
-            if not params.id:
-                return ToolResult.error_result("`id` is required for `complete` action")
-            if params.id not in todos:
-                return ToolResult.error_result(f"Todo with ID: {params.id} not found")
+        elif params.action in ("update", "complete"):
+            items = batch or [single]
+            for item in items:
+                if not item.get("id"):
+                    return ToolResult.error_result(f"`id` is required for `{params.action}` action")
+                if params.action == "complete":
+                    item["status"] = "completed"
+                error = self._check_fields(item)
+                if error:
+                    return ToolResult.error_result(error)
 
-            content = todos.pop(params.id)
-            completed[params.id] = content
-            data['todos'] = todos
-            data['completed'] = completed
-            self.save_todos(data)
+            updated, missing = store.update_many(items)
+            if not updated:
+                return ToolResult.error_result(f"Todo with ID: {', '.join(missing)} not found")
+
+            if len(items) == 1:
+                item = updated[0]
+                message = f"☑ Completed: {item.content}" if params.action == "complete" else f"Updated: {self._format(item)}"
+                return ToolResult.success_result(
+                    message,
+                    metadata={"action": params.action, "id": item.id, "content": item.content, "status": item.status}
+                )
+            lines = [f"Updated {len(updated)} tasks:"] + [self._format(item) for item in updated]
+            if missing:
+                lines.append(f"Not found: {', '.join(missing)}")
             return ToolResult.success_result(
-                f"☑ Completed: {content}",
-                metadata={"action": "complete", "id": params.id, "content": content}
+                "\n".join(lines),
+                metadata={"action": params.action, "count": len(updated), "missing": missing}
             )
-        
+
         elif params.action == "remove":
             if not params.id:
                 return ToolResult.error_result("`id` is required for `remove` action")
-            
-            removed_content = None
-            if params.id in todos:
-                removed_content = todos.pop(params.id)
-            elif params.id in completed:
-                removed_content = completed.pop(params.id)
-            else:
+
+            removed = store.remove(params.id)
+            if removed is None:
                 return ToolResult.error_result(f"Todo with ID: {params.id} not found")
 
-            data['todos'] = todos
-            data['completed'] = completed
-            self.save_todos(data)
             return ToolResult.success_result(
-                f"🗑 Removed task: {removed_content}",
-                metadata={"action": "remove", "id": params.id, "content": removed_content}
+                f"🗑 Removed task: {removed.content}",
+                metadata={"action": "remove", "id": params.id, "content": removed.content}
             )
-        
+
         elif params.action == "list":
-            if not todos and not completed:
+            if params.status is not None and params.status not in STATUSES:
+                return ToolResult.error_result(f"Invalid status '{params.status}'. Use one of: {', '.join(STATUSES)}")
+
+            items = store.items(status=params.status)
+            if not items:
                 return ToolResult.success_result("No tasks found", metadata={"action": "list", "count": 0})
-            
+
             lines = ['Task List:']
-            for todo_id, content in completed.items():
-                lines.append(f"☑ {content} (ID: {todo_id})")
-            for todo_id, content in todos.items():
-                lines.append(f"☐ {content} (ID: {todo_id})")
-            
-            total_count = len(todos) + len(completed)
-            return ToolResult.success_result("\n".join(lines), metadata={"action": "list", "count": total_count, "show_complete_list": True})
-        
+            lines.extend(self._format(item) for item in items)
+
+            return ToolResult.success_result("\n".join(lines), metadata={"action": "list", "count": len(items), "show_complete_list": True})
+
         elif params.action == "clear":
-            count = len(todos) + len(completed)
-            data['todos'] = {}
-            data['completed'] = {}
-            self.save_todos(data)
+            count = store.clear()
             return ToolResult.success_result(f"{count} todos cleared", metadata={"action": "clear", "count": count})
-        
+
         else:
-            return ToolResult.error_result(f"Invalid action: {params.action}")
\ No newline at end of file
+            return ToolResult.error_result(f"Invalid action: {params.action}")
@@ -2,10 +2,8 @@ from codentis.tools.base import Tool, ToolResult, ToolKind, ToolInvocation
 from pydantic import BaseModel, Field
 from urllib.parse import urlparse
 import httpx
-try:
-    from bs4 import BeautifulSoup
-except ImportError:
-    BeautifulSoup = None
+from codentis.client.http_client import fetch, get_http_cache
+from codentis.utils.html_text import HtmlTextExtractor
 
 class WebFetchParams(BaseModel):
     url: str = Field(..., description="The URL to fetch.")
@@ -14,55 +12,53 @@ class WebFetchParams(BaseModel):
 
 class WebFetchTool(Tool):
     name = "web_fetch"
-    description = "Fetch a web page. By default, it extracts clean text to save tokens and avoid noise."
+    description = "Fetch a web page. By default, it extracts the main content as markdown-like text (headings, code blocks, links) to save tokens and avoid noise."
     kind = ToolKind.NETWORK
     schema = WebFetchParams
+
+    MAX_OUTPUT_CHARS = 50*1024
+    MAX_DOWNLOAD_BYTES = 2*1024*1024
     
     async def execute(self, invocation: ToolInvocation) -> ToolResult:
-        params = WebFetchParams(**invocation.params)
+        params = invocation.parsed_params(WebFetchParams)
 
         parsed_url = urlparse(params.url)
         if parsed_url.scheme not in ["http", "https"]:
             return ToolResult.error_result(f"Invalid URL scheme: {parsed_url.scheme}")
         
+        # Raw HTML is returned as-is, so there is no point downloading more
+        # than the output cap. Cleaned pages are extracted while they
+        # download and the download stops once the output budget is full.
+        max_bytes = self.MAX_OUTPUT_CHARS * 4 if params.raw else self.MAX_DOWNLOAD_BYTES
+        extractor = None if params.raw else HtmlTextExtractor(self.MAX_OUTPUT_CHARS, base_url=params.url)
+
         try:
-            async with httpx.AsyncClient(
-                timeout=httpx.Timeout(params.timeout, connect=params.timeout),
-                follow_redirects=True,
-                headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"}
-            ) as client:
-                response = await client.get(params.url)
-                response.raise_for_status()
-                text = response.text
-                
-                if not params.raw and BeautifulSoup:
-                    soup = BeautifulSoup(text, 'html.parser')
-                    # Remove all script and style elements
-                    for script in soup(["script", "style"]):
-                        script.decompose()
-                    
-                    # Get text and clean it up
-                    text = soup.get_text(separator='\n')
-                    # break into lines and remove leading and trailing space on each
-                    lines = (line.strip() for line in text.splitlines())
-                    # break multi-headlines into a line each
-                    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-                    # drop blank lines
-                    text = '\n'.join(chunk for chunk in chunks if chunk)
-                    
+            response = await fetch(
+                params.url,
+                timeout=params.timeout,
+                max_bytes=max_bytes,
+                cache=get_http_cache(),
+                consumer=extractor,
+            )
+            text = extractor.text() if extractor else response.text
         except httpx.HTTPStatusError as e:
             return ToolResult.error_result(f"HTTP error: {e.response.status_code} : {e.response.reason_phrase}")
         except Exception as e:  
             return ToolResult.error_result(f"Failed to fetch URL: {e}")
         
-        if len(text) > 50*1024:
-            text = text[:50*1024] + "\n... [content truncated]"
+        truncated = extractor.truncated if extractor else len(text) > self.MAX_OUTPUT_CHARS
+        if truncated:
+            text = text[:self.MAX_OUTPUT_CHARS] + "\n... [content truncated]"
             
         return ToolResult.success_result(text,
             metadata={
                 "status_code": response.status_code,
                 "url": params.url,
-                "content_length": len(response.content),
+                "content_length": len(response.body),
+                "bytes_read": len(response.body),
+                "download_truncated": response.truncated,
+                "cached": response.from_cache,
                 "is_raw": params.raw,
-                "title": soup.title.string.strip() if not params.raw and BeautifulSoup and soup.title else None
-            })
+                "title": extractor.title if extractor else None
+            },
+            truncated=truncated)
@@ -1,59 +1,73 @@
 from codentis.tools.base import Tool, ToolResult, ToolKind, ToolInvocation
 from pydantic import BaseModel, Field
-from ddgs import DDGS
+from codentis.client.search import get_search_cache, normalize_url, search_many
+
+MAX_QUERIES = 5
 
 class WebSearchParams(BaseModel):
-    query: str = Field(..., description="The search query.")
-    max_results: int = Field(10, ge=1, le=20, description="The maximum number of results to return.")
+    query: str | None = Field(None, description="The search query.")
+    queries: list[str] | None = Field(
+        None,
+        description=f"Several related search queries to run concurrently (up to {MAX_QUERIES}). Duplicate links across queries are returned once."
+    )
+    max_results: int = Field(10, ge=1, le=20, description="The maximum number of results to return per query.")
 
 class WebSearchTool(Tool):
     name = "web_search"
-    description = "Search the web for information. Returns search results as a list of links, titles, and snippets."
+    description = "Search the web for information. Returns search results as a list of links, titles, and snippets. Pass `queries` to run several searches at once."
     kind = ToolKind.NETWORK
     schema = WebSearchParams
-    
+
     async def execute(self, invocation: ToolInvocation) -> ToolResult:
-        params = WebSearchParams(**invocation.params)
-        
-        try:
-            ddgs = DDGS()
-            results = ddgs.text(
-                params.query, 
-                region="us-en", 
-                safesearch="off", 
-                timeout=10,
-                lang="en",
-                backend="auto"
-            )
-        except Exception as e:
-            return ToolResult.error_result(f"Search failed: {e}")
+        params = invocation.parsed_params(WebSearchParams)
 
-        if not results:
-            return ToolResult.error_result(f"No results found for : {params.query}",
-            metadata={
-                "query": params.query,
-                "results": 0
-            })
-
-        output_lines = [f"Search results for: {params.query}"]
-        for i, result in enumerate(results):
-            title = result.get('title', 'No Title')
-            link = result.get('href') or result.get('link') or 'No Link'
-            body = result.get('body', '')
-            
-            output_lines.append(f"{i+1}. Title: {title}\nLink: {link}")
-            if body:
-                output_lines.append(f"Snippet: {body}\n")
-        
-        output_lines.append("")
-
-        # The provided code edit block seems to be for a different file (web_fetch.py)
-        # as it references variables like 'response', 'status_code', 'url', 'soup', etc.
-        # For web_search.py, the instruction is to "pass structured results/data in the metadata field".
-        # The 'results' key in the metadata already contains the structured data from the search.
-        # I will ensure the 'results' key always contains a list of structured results.
-        return ToolResult.success_result("\n".join(output_lines), metadata={
-            "query": params.query,
+        queries = [q for q in ([params.query] if params.query else []) + (params.queries or []) if q.strip()]
+        if not queries:
+            return ToolResult.error_result("Either 'query' or 'queries' is required")
+        if len(queries) > MAX_QUERIES:
+            return ToolResult.error_result(f"At most {MAX_QUERIES} queries can be searched in one call")
+
+        outcomes = await search_many(queries, params.max_results, cache=get_search_cache())
+
+        seen: set[str] = set()
+        results = []
+        errors = []
+        output_lines = []
+        for query, outcome, _ in outcomes:
+            if isinstance(outcome, BaseException):
+                errors.append(f"Search failed for '{query}': {str(outcome) or type(outcome).__name__}")
+                continue
+
+            fresh = []
+            for result in outcome:
+                key = normalize_url(result.url) if result.url else result.title
+                if key in seen:
+                    continue
+                seen.add(key)
+                fresh.append(result)
+            if not fresh:
+                continue
+
+            output_lines.append(f"Search results for: {query}")
+            for result in fresh:
+                results.append(result.to_dict())
+                output_lines.append(f"{len(results)}. Title: {result.title}\nLink: {result.url or 'No Link'}")
+                if result.snippet:
+                    output_lines.append(f"Snippet: {result.snippet}\n")
+            output_lines.append("")
+
+        metadata = {
+            "query": params.query or "; ".join(queries),
+            "queries": [query for query, _, _ in outcomes],
             "results_count": len(results),
-            "results": results # This already passes the structured results/data
-        })
+            "results": results,
+            "cached": all(from_cache for _, outcome, from_cache in outcomes if not isinstance(outcome, BaseException)),
+        }
+
+        if not results:
+            if errors and len(errors) == len(outcomes):
+                return ToolResult.error_result("\n".join(errors), metadata=metadata)
+            return ToolResult.error_result(f"No results found for : {metadata['query']}", metadata=metadata)
+
+        output_lines.extend(errors)
+        return ToolResult.success_result("\n".join(output_lines), metadata=metadata)
@@ -1,4 +1,5 @@
 from codentis.tools.base import Tool
+from codentis.utils.blocking import run_blocking
 from pydantic import BaseModel, Field
 from codentis.tools.base import ToolResult, FileDiff, ToolInvocation, ToolKind
 from codentis.utils.paths import resolve_path, ensure_parent_directory_exists
@@ -24,7 +25,10 @@ class WriteFileTool(Tool):
     schema: type[BaseModel] = WriteFileParams
 
     async def execute(self, invocation: ToolInvocation) -> ToolResult:
-        params = WriteFileParams(**invocation.params)
+        return await run_blocking(self._execute, invocation)
+
+    def _execute(self, invocation: ToolInvocation) -> ToolResult:
+        params = invocation.parsed_params(WriteFileParams)
         path = resolve_path(invocation.cwd, params.path)
 
         is_new_file = not path.exists()
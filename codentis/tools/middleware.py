@@ -0,0 +1,317 @@
+"""Hook points around tool execution.
+
+ToolRegistry.invoke runs every validated call through a chain of
+middlewares. Each one receives the tool, the invocation and the next
+handler, and may time the call, inspect or replace the result, hold a
+concurrency slot or skip execution entirely. The first middleware in the
+list is the outermost.
+
+Results of idempotent read tools are memoized in a process-wide
+ToolResultCache. Entries are tied to a workspace generation, which every
+write or shell call (from the agent or any sub-agent) bumps, so a cached
+grep never outlives a change that could affect it.
+
+Tool metrics are process-wide: the main agent and every sub-agent record
+into the same ToolMetrics, which backs the interactive /stats command and
+the stats file written at exit.
+"""
+from __future__ import annotations
+import asyncio
+import dataclasses
+import json
+import logging
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+from codentis.tools.base import ToolKind
+from codentis.utils.text import estimate_tokens
+
+if TYPE_CHECKING:
+    from codentis.tools.base import Tool, ToolInvocation, ToolResult
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[["Tool", "ToolInvocation"], Awaitable["ToolResult"]]
+ToolMiddleware = Callable[["Tool", "ToolInvocation", Handler], Awaitable["ToolResult"]]
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+# Kinds whose calls may change files, and so invalidate cached results
+INVALIDATING_KINDS = frozenset({ToolKind.WRITE, ToolKind.SHELL, ToolKind.MCP})
+RESULT_CACHE_MAX_ENTRIES = 256
+RESULT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+# Changes made outside the agent (an editor, a build) bump no generation, so entries also expire
+RESULT_CACHE_TTL = 60.0
+
+
+def compose(middlewares: list[ToolMiddleware], handler: Handler) -> Handler:
+    """Wrap handler in middlewares, the first one outermost."""
+    for middleware in reversed(middlewares):
+        handler = _bind(middleware, handler)
+    return handler
+
+
+def _bind(middleware: ToolMiddleware, call_next: Handler) -> Handler:
+    async def handler(tool: Tool, invocation: ToolInvocation) -> ToolResult:
+        return await middleware(tool, invocation, call_next)
+    return handler
+
+
+@dataclass
+class ToolStats:
+    name: str
+    calls: int = 0
+    errors: int = 0
+    cache_hits: int = 0
+    latency: float = 0.0  # seconds, summed over calls
+    max_latency: float = 0.0
+    bytes_read: int = 0  # reported by the tool in metadata["bytes_read"]
+    bytes_returned: int = 0
+    output_tokens: int = 0  # estimated from length; the exact count is taken once, by the context manager
+    histogram: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+
+    def percentile(self, q: float) -> float:
+        """Latency in ms at quantile q, as the upper bound of the bucket it falls in."""
+        if not self.calls:
+            return 0.0
+        rank = q * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.histogram):
+            seen += count
+            if seen >= rank:
+                return min(float(bound), self.max_latency * 1000)
+        return self.max_latency * 1000
+
+    def to_dict(self) -> dict[str, object]:
+        calls = self.calls or 1
+        return {
+            "tool": self.name,
+            "calls": self.calls,
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "avg_ms": round(self.latency / calls * 1000, 2),
+            "p50_ms": round(self.percentile(0.5), 2),
+            "p95_ms": round(self.percentile(0.95), 2),
+            "max_ms": round(self.max_latency * 1000, 2),
+            "bytes_read": self.bytes_read,
+            "bytes_returned": self.bytes_returned,
+            "output_tokens": self.output_tokens,
+            "histogram_ms": {
+                **{f"<={bound}": count for bound, count in zip(LATENCY_BUCKETS_MS, self.histogram)},
+                f">{LATENCY_BUCKETS_MS[-1]}": self.histogram[-1],
+            },
+        }
+
+
+class ToolMetrics:
+    def __init__(self) -> None:
+        self._stats: dict[str, ToolStats] = {}
+
+    def record(
+        self,
+        name: str,
+        *,
+        latency: float,
+        success: bool,
+        cache_hit: bool = False,
+        bytes_read: int = 0,
+        bytes_returned: int = 0,
+        output_tokens: int = 0,
+    ) -> None:
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = ToolStats(name)
+        stats.calls += 1
+        stats.errors += int(not success)
+        stats.cache_hits += int(cache_hit)
+        stats.latency += latency
+        stats.max_latency = max(stats.max_latency, latency)
+        stats.histogram[bisect_left(LATENCY_BUCKETS_MS, latency * 1000)] += 1
+        stats.bytes_read += bytes_read
+        stats.bytes_returned += bytes_returned
+        stats.output_tokens += output_tokens
+
+    def snapshot(self) -> list[ToolStats]:
+        return sorted(self._stats.values(), key=lambda stats: stats.latency, reverse=True)
+
+    def reset(self) -> None:
+        self._stats.clear()
+
+
+_metrics = ToolMetrics()
+
+
+def get_tool_metrics() -> ToolMetrics:
+    return _metrics
+
+
+class MetricsMiddleware:
+    """Records latency, bytes and the token cost of each result in ToolMetrics."""
+
+    def __init__(self, metrics: ToolMetrics | None = None) -> None:
+        self.metrics = metrics or get_tool_metrics()
+
+    async def __call__(self, tool: Tool, invocation: ToolInvocation, call_next: Handler) -> ToolResult:
+        start = time.perf_counter()
+        success = False
+        result = None
+        try:
+            result = await call_next(tool, invocation)
+            success = result.success
+            return result
+        finally:
+            # Cancelled calls are recorded too, as errors
+            output = result.to_model_output() if result is not None else ""
+            self.metrics.record(
+                tool.name,
+                latency=time.perf_counter() - start,
+                success=success,
+                cache_hit=result is not None and result.metadata.get("result_cache_hit", False),
+                bytes_read=int(result.metadata.get("bytes_read", 0)) if result is not None else 0,
+                bytes_returned=len(output.encode("utf-8")),
+                output_tokens=estimate_tokens(output, "") if output else 0,
+            )
+
+
+class ToolResultCache:
+    """Successful results of cacheable tools, keyed by tool, cwd and canonical params."""
+
+    def __init__(self, max_entries: int = RESULT_CACHE_MAX_ENTRIES, max_bytes: int = RESULT_CACHE_MAX_BYTES,
+                 ttl: float = RESULT_CACHE_TTL) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.generation = 0
+        self._entries: OrderedDict[tuple[str, str, str], tuple[int, float, ToolResult]] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(tool: Tool, invocation: ToolInvocation) -> tuple[str, str, str]:
+        # The validated model fills in defaults, so {} and {"path": "."} share an entry
+        params = invocation.parsed.model_dump(mode="json") if invocation.parsed is not None else invocation.params
+        return tool.name, str(invocation.cwd), json.dumps(params, sort_keys=True, default=str)
+
+    def get(self, key: tuple[str, str, str]) -> ToolResult | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != self.generation or time.monotonic() - entry[1] > self.ttl:
+            if entry is not None:
+                self._drop(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def put(self, key: tuple[str, str, str], result: ToolResult) -> None:
+        size = len(result.output)
+        if size > self.max_bytes // 8:
+            return
+        self._drop(key)
+        self._entries[key] = (self.generation, time.monotonic(), result)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: tuple[str, str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[2].output)
+
+    def invalidate(self) -> None:
+        """Bump the workspace generation; every existing entry becomes stale."""
+        self.generation += 1
+        self._entries.clear()
+        self._bytes = 0
+
+
+_result_cache = ToolResultCache()
+
+
+def get_result_cache() -> ToolResultCache:
+    return _result_cache
+
+
+class ResultCacheMiddleware:
+    """Serves repeated calls to cacheable tools from ToolResultCache; write and shell calls invalidate it."""
+
+    def __init__(self, cache: ToolResultCache | None = None) -> None:
+        self.cache = cache or get_result_cache()
+
+    async def __call__(self, tool: Tool, invocation: ToolInvocation, call_next: Handler) -> ToolResult:
+        if tool.kind in INVALIDATING_KINDS:
+            try:
+                return await call_next(tool, invocation)
+            finally:
+                # Also after a failed or cancelled call, which may have changed files part way
+                self.cache.invalidate()
+
+        if not tool.is_cacheable(invocation.params):
+            return await call_next(tool, invocation)
+
+        key = self.cache.key(tool, invocation)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return dataclasses.replace(cached, metadata={**cached.metadata, "result_cache_hit": True})
+
+        generation = self.cache.generation
+        result = await call_next(tool, invocation)
+        # A write that finished while this call ran may have raced with it, so only cache if none did
+        if result.success and self.cache.generation == generation:
+            self.cache.put(key, result)
+        return result
+
+
+class TracingMiddleware:
+    """Logs the start and end of every call at debug level."""
+
+    async def __call__(self, tool: Tool, invocation: ToolInvocation, call_next: Handler) -> ToolResult:
+        logger.debug("tool %s start params=%s", tool.name, invocation.params)
+        start = time.perf_counter()
+        try:
+            result = await call_next(tool, invocation)
+        except BaseException as e:
+            logger.debug("tool %s raised %r after %.1fms", tool.name, e, (time.perf_counter() - start) * 1000)
+            raise
+        logger.debug(
+            "tool %s done in %.1fms success=%s output=%d chars",
+            tool.name, (time.perf_counter() - start) * 1000, result.success, len(result.output),
+        )
+        return result
+
+
+_semaphores: dict[str, asyncio.Semaphore] = {}
+_semaphores_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _semaphore(key: str, limit: int) -> asyncio.Semaphore:
+    # Shared by every registry on the running loop, so sub-agents count against the same limit
+    global _semaphores_loop
+    loop = asyncio.get_running_loop()
+    if _semaphores_loop is not loop:
+        _semaphores.clear()
+        _semaphores_loop = loop
+    semaphore = _semaphores.get(key)
+    if semaphore is None:
+        semaphore = _semaphores[key] = asyncio.Semaphore(limit)
+    return semaphore
+
+
+class ConcurrencyLimitMiddleware:
+    """Caps concurrent calls per tool name or tool kind (e.g. {"shell": 2, "network": 4})."""
+
+    def __init__(self, limits: dict[str, int]) -> None:
+        self.limits = limits
+
+    async def __call__(self, tool: Tool, invocation: ToolInvocation, call_next: Handler) -> ToolResult:
+        key = tool.name if tool.name in self.limits else tool.kind.value
+        limit = self.limits.get(key)
+        if limit is None:
+            return await call_next(tool, invocation)
+        async with _semaphore(key, limit):
+            return await call_next(tool, invocation)
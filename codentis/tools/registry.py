@@ -4,7 +4,13 @@ from codentis.tools.base import Tool, ToolResult, ToolInvocation
 import logging
 from codentis.tools.builtin import get_all_builtin_tools
 from codentis.config.config import Config
+from codentis.client.llm_client import SharedClients
 from codentis.tools.subagents import get_default_subagent_definitions, SubAgentTool
+from codentis.context.workspace_cache import WorkspaceCache
+from codentis.tools.middleware import (
+    ConcurrencyLimitMiddleware, MetricsMiddleware, ResultCacheMiddleware, ToolMiddleware, TracingMiddleware,
+    compose,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +19,17 @@ class ToolRegistry:
         self.tools: dict[str, Tool] = {}
         self.config = config
         self.progress_callback: Any = None  # set by TUI to receive live sub-agent status
+        self.workspace: WorkspaceCache | None = None  # set by Session; shared by the read tools
+        self.middlewares: list[ToolMiddleware] = []
+        self._handler = self._execute
+
+    def add_middleware(self, middleware: ToolMiddleware, outermost: bool = False):
+        """Wrap every tool call in middleware (innermost by default, i.e. closest to execute)."""
+        if outermost:
+            self.middlewares.insert(0, middleware)
+        else:
+            self.middlewares.append(middleware)
+        self._handler = compose(self.middlewares, self._execute)
     
     def register(self, tool: Tool):
         if tool.name in self.tools:
@@ -63,7 +80,7 @@ class ToolRegistry:
                 }
             )
         
-        validation_error = tool.validate_params(params)
+        parsed, validation_error = tool.parse_params(params)
         if validation_error:
             return ToolResult.error_result(
                 f"Invalid parameters: {'; '.join(validation_error)}",
@@ -76,32 +93,47 @@ class ToolRegistry:
         invocation = ToolInvocation(
             params=params,
             cwd=cwd,
-            metadata={"progress_callback": self.progress_callback} if self.progress_callback else {}
+            metadata={"progress_callback": self.progress_callback} if self.progress_callback else {},
+            workspace=self.workspace,
+            parsed=parsed,
         )
+        return await self._handler(tool, invocation)
 
+    async def _execute(self, tool: Tool, invocation: ToolInvocation)->ToolResult:
         try:
             result = await tool.execute(invocation)
         except Exception as e:
-            logger.exception(f"Error invoking tool {name}: {e}")
+            logger.exception(f"Error invoking tool {tool.name}: {e}")
             result = ToolResult.error_result(
-                f"Internal error invoking tool {name}: {e}",
+                f"Internal error invoking tool {tool.name}: {e}",
                 metadata={
-                    "tool_name": name,
+                    "tool_name": tool.name,
                     "error": str(e)
                 }
             )
 
         return result
 
-def create_default_registry(config: Config) -> ToolRegistry:
+def install_default_middlewares(registry: ToolRegistry) -> None:
+    if registry.config.debug:
+        registry.add_middleware(TracingMiddleware())
+    if registry.config.tool_concurrency_limits:
+        registry.add_middleware(ConcurrencyLimitMiddleware(registry.config.tool_concurrency_limits))
+    registry.add_middleware(MetricsMiddleware())
+    if registry.config.cache_tool_results:
+        registry.add_middleware(ResultCacheMiddleware())
+
+def create_default_registry(config: Config, shared_clients: SharedClients | None = None) -> ToolRegistry:
+    """Registry for a top-level session; its sub-agents' sessions use shared_clients too."""
     registry = ToolRegistry(config)
 
     for tool_class in get_all_builtin_tools():
         registry.register(tool_class(config))
 
     for subagent_definition in get_default_subagent_definitions():
-        registry.register(SubAgentTool(config, subagent_definition))
-    
+        registry.register(SubAgentTool(config, subagent_definition, shared_clients=shared_clients))
+
+    install_default_middlewares(registry)
     return registry
 
 
@@ -110,4 +142,5 @@ def create_subagent_registry(config: Config) -> ToolRegistry:
     registry = ToolRegistry(config)
     for tool_class in get_all_builtin_tools():
         registry.register(tool_class(config))
+    install_default_middlewares(registry)
     return registry
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""Compact, structured results for sub-agent runs.
+
+The parent agent only needs what a child found, not how it got there, so a
+child's final answer is parsed into a summary and a list of findings with
+file:line references. That report is rendered under a token budget and is
+the only part kept in the parent's context. The full transcript (every
+message, tool call and tool output) goes to a spill file that the parent
+can page through with read_file when it needs the detail.
+"""
+from __future__ import annotations
+import re
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from codentis.config.loader import get_data_dir
+from codentis.utils.text import estimate_tokens
+
+TRANSCRIPT_DIR_NAME = "subagents"
+MAX_TRANSCRIPTS = 100
+SUMMARY_MAX_CHARS = 1200
+MAX_FINDINGS = 30
+
+REPORT_INSTRUCTIONS = """\
+End with your final answer in exactly this format:
+SUMMARY: <two or three sentences answering the task>
+FINDINGS:
+- <one finding per line, citing path/to/file.py:123 where it applies>"""
+
+# path/to/file.ext:12 or :12-20, not preceded by a URL scheme or another path character
+_REF = re.compile(r"(?<![\w/.:-])((?:[\w.-]+/)*[\w.-]+\.\w+):(\d+)(?:-\d+)?")
+_HEADER = re.compile(r"^[#*_\s]*(summary|findings)[*_\s]*(?::|$)[*_\s]*(.*)$", re.IGNORECASE)
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+(.*)$")
+
+
+@dataclass
+class Finding:
+    text: str
+    refs: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, object]:
+        return {"text": self.text, "refs": self.refs}
+
+
+@dataclass
+class SubAgentReport:
+    summary: str
+    findings: list[Finding] = field(default_factory=list)
+    files_read: list[str] = field(default_factory=list)
+    files_modified: list[str] = field(default_factory=list)
+    termination: str = "goal"
+    tokens: int = 0
+    duration: float = 0.0
+    tool_calls: int = 0
+    transcript_path: str | None = None
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "summary": self.summary,
+            "findings": [finding.to_dict() for finding in self.findings],
+            "files_read": self.files_read,
+            "files_modified": self.files_modified,
+            "termination": self.termination,
+            "tokens": self.tokens,
+            "duration": round(self.duration, 2),
+            "tool_calls": self.tool_calls,
+            "transcript": self.transcript_path,
+        }
+
+    def _render(self, findings: list[Finding], summary: str, omitted: int) -> str:
+        lines = [
+            f"Status: {self.termination} | {self.duration:.1f}s | {self.tokens:,} tokens | {self.tool_calls} tool calls",
+            f"Summary: {summary or 'No response from subagent'}",
+        ]
+        if findings:
+            lines.append("Findings:")
+            lines.extend(f"- {finding.text}" for finding in findings)
+        if omitted:
+            lines.append(f"({omitted} more findings in the transcript)")
+        if self.files_modified:
+            lines.append(f"Files modified: {', '.join(self.files_modified)}")
+        if self.files_read:
+            lines.append(f"Files read: {', '.join(self.files_read)}")
+        if self.transcript_path:
+            lines.append(f"Full transcript: {self.transcript_path} (page through it with read_file offset/limit)")
+        return "\n".join(lines)
+
+    def render(self, token_budget: int) -> str:
+        """Compact text for the parent's context, dropping findings (then summary text) to fit token_budget."""
+        findings = list(self.findings)
+        text = self._render(findings, self.summary, 0)
+        while findings and estimate_tokens(text, "") > token_budget:
+            findings.pop()
+            text = self._render(findings, self.summary, len(self.findings) - len(findings))
+        overflow = estimate_tokens(text, "") - token_budget
+        if overflow > 0:
+            keep = max(80, len(self.summary) - overflow * 4)
+            text = self._render(findings, self.summary[:keep].rstrip() + "...", len(self.findings) - len(findings))
+        return text
+
+
+def _finding(text: str) -> Finding:
+    text = text.strip()
+    return Finding(text=text, refs=[f"{path}:{line}" for path, line in _REF.findall(text)])
+
+
+def parse_report(response: str) -> tuple[str, list[Finding]]:
+    """Split a child's final answer into (summary, findings).
+
+    Answers in the SUMMARY/FINDINGS format are parsed directly. For free-form
+    answers the first paragraph becomes the summary and bullet points or
+    lines that cite file:line become findings.
+    """
+    summary_lines: list[str] = []
+    findings: list[Finding] = []
+    section = None
+    for line in response.splitlines():
+        header = _HEADER.match(line)
+        if header:
+            section = header.group(1).lower()
+            rest = header.group(2).strip()
+            if rest and section == "summary":
+                summary_lines.append(rest)
+            continue
+        if section == "summary":
+            if line.strip():
+                summary_lines.append(line.strip())
+        elif section == "findings":
+            bullet = _BULLET.match(line)
+            if bullet:
+                findings.append(_finding(bullet.group(1)))
+            elif line.strip() and findings:
+                findings[-1] = _finding(findings[-1].text + " " + line.strip())
+
+    if section is None:
+        paragraphs = [part.strip() for part in re.split(r"\n\s*\n", response) if part.strip()]
+        if paragraphs:
+            summary_lines = paragraphs[0].splitlines()
+        for paragraph in paragraphs[1:]:
+            for line in paragraph.splitlines():
+                bullet = _BULLET.match(line)
+                if bullet or _REF.search(line):
+                    findings.append(_finding(bullet.group(1) if bullet else line))
+
+    summary = " ".join(line.strip() for line in summary_lines)
+    if len(summary) > SUMMARY_MAX_CHARS:
+        summary = summary[:SUMMARY_MAX_CHARS].rstrip() + "..."
+    return summary, findings[:MAX_FINDINGS]
+
+
+def write_transcript(name: str, entries: list[str]) -> Path | None:
+    """Spill a child's full transcript to the data dir, keeping the newest MAX_TRANSCRIPTS files."""
+    directory = get_data_dir() / TRANSCRIPT_DIR_NAME
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{uuid.uuid4().hex[:6]}.md"
+        path.write_text("\n\n".join(entries) + "\n", encoding="utf-8")
+        transcripts = sorted(directory.glob("*.md"), key=lambda p: p.stat().st_mtime)
+        for old in transcripts[:-MAX_TRANSCRIPTS]:
+            old.unlink(missing_ok=True)
+    except OSError:
+        return None
+    return path
@@ -1,8 +1,16 @@
-from codentis.config.config import Config
+from __future__ import annotations
+from codentis.client.llm_client import SharedClients
+from codentis.config.config import Config, ModelRoute
+from codentis.context.workspace_cache import WorkspaceCache
 from codentis.tools.base import Tool, ToolInvocation, ToolResult
-from typing import Any
+from codentis.tools.subagent_report import REPORT_INSTRUCTIONS, SubAgentReport, parse_report, write_transcript
+from typing import Any, Callable
+from contextlib import aclosing
+from pathlib import Path
+from dataclasses import dataclass, field
 from pydantic import BaseModel, Field
 import asyncio
+import json
 
 class SubAgentDefinition(BaseModel):
     name: str
@@ -11,15 +19,139 @@ class SubAgentDefinition(BaseModel):
     allowed_tools: list[str] = Field(default_factory=list)
     max_turns: int = 20
     timeout_seconds: float = 600
+    token_budget: int | None = Field(
+        600_000,
+        description="Tokens (prompt + completion, summed over turns) a child may use before it is stopped"
+    )
+    max_parallel: int = Field(4, ge=1, description="Children run at once when the tool is given several goals")
+    model: str | None = Field(None, description="Model for this sub-agent instead of the main one")
+    base_url: str | None = Field(None, description="Endpoint for `model`, if it is served elsewhere")
+    api_key: str | None = Field(None, description="API key for `base_url`")
+    result_token_budget: int = Field(
+        1500, ge=100,
+        description="Tokens of a child's result kept in the parent's context; the rest stays in the transcript file"
+    )
 
 class SubAgentParams(BaseModel):
-    goal: str = Field(..., description="Goal to be achieved by the subagent")
+    goal: str | None = Field(None, description="Goal to be achieved by the subagent")
+    goals: list[str] | None = Field(
+        None,
+        description="Several independent goals, each handled by its own sub-agent in parallel. The results are merged into one report."
+    )
+
+@dataclass
+class SubAgentRun:
+    """Outcome of one child agent."""
+    goal: str
+    response: str | None = None
+    tool_calls: list[str] = field(default_factory=list)
+    error: str | None = None
+    termination: str = "goal"
+    duration: float = 0.0
+    tokens: int = 0
+    final_text: str | None = None
+    files_read: list[str] = field(default_factory=list)
+    files_modified: list[str] = field(default_factory=list)
+    transcript: list[str] = field(default_factory=list)
+    transcript_path: Path | None = None
+
+    @property
+    def stopped_early(self) -> bool:
+        return self.termination in ("timeout", "token_budget")
+
+    def report(self) -> SubAgentReport:
+        if self.error:
+            summary, findings = f"Subagent execution failed: {self.error}", []
+        elif self.termination == "goal" and self.final_text:
+            summary, findings = parse_report(self.final_text)
+        else:
+            # Stopped early: there is no final answer, only what was said so far
+            summary, findings = parse_report(self.response or "")
+        return SubAgentReport(
+            summary=summary,
+            findings=findings,
+            files_read=self.files_read,
+            files_modified=self.files_modified,
+            termination='error' if self.error else self.termination,
+            tokens=self.tokens,
+            duration=self.duration,
+            tool_calls=len(self.tool_calls),
+            transcript_path=str(self.transcript_path) if self.transcript_path else None,
+        )
+
+_FILE_WRITING_TOOLS = ("write_file", "edit_file", "apply_patch")
+
+def _tool_paths(tool_name: str, arguments: dict) -> list[str]:
+    if tool_name == "apply_patch":
+        return [edit.get("path", "") for edit in arguments.get("edits", []) if isinstance(edit, dict)]
+    path = arguments.get("path")
+    return [path] if isinstance(path, str) and path else []
+
+def _add_unique(items: list[str], values: list[str]) -> None:
+    for value in values:
+        if value and value not in items:
+            items.append(value)
+
+def _human_status(tool_name: str, arguments: dict) -> str:
+    """Convert a tool call into a short human-readable status string."""
+    if tool_name == "read_file":
+        path = arguments.get("path", "")
+        return f"Reading {path}"
+    elif tool_name == "list_dir":
+        path = arguments.get("path", ".")
+        return f"Exploring {path}"
+    elif tool_name == "grep":
+        pattern = arguments.get("pattern", "")
+        return f"Searching for '{pattern}'"
+    elif tool_name == "glob":
+        pattern = arguments.get("pattern", "")
+        return f"Finding files matching '{pattern}'"
+    elif tool_name == "web_search":
+        query = arguments.get("query", "")
+        return f"Searching web for '{query}'"
+    elif tool_name == "web_fetch":
+        url = arguments.get("url", "")
+        return f"Fetching {url}"
+    elif tool_name == "write_file":
+        path = arguments.get("path", "")
+        return f"Writing {path}"
+    elif tool_name == "edit_file":
+        path = arguments.get("path", "")
+        return f"Editing {path}"
+    elif tool_name == "shell":
+        cmd = arguments.get("command", "")
+        return f"Running: {cmd[:40]}"
+    else:
+        return f"Using {tool_name}"
 
 class SubAgentTool(Tool):
-    def __init__(self, config: Config, definition: SubAgentDefinition)->None:
+    def __init__(self, config: Config, definition: SubAgentDefinition, shared_clients: SharedClients | None = None)->None:
         super().__init__(config)
         self.config = config
         self.definition = definition
+        # The parent session's OpenAI clients, so children reuse their connection pools
+        self.shared_clients = shared_clients
+        self._pool = None
+        self._parent_workspace: WorkspaceCache | None = None
+
+    @property
+    def pool(self):
+        """Warm child sessions for this definition, created on first use."""
+        if self._pool is None:
+            from codentis.agent.session import SessionPool
+            self._pool = SessionPool(self._new_session, max_idle=self.definition.max_parallel)
+        return self._pool
+
+    async def close(self)->None:
+        # Only a pool that was actually created has sessions to close
+        if self._pool is not None:
+            await self._pool.close()
+
+    def _new_session(self):
+        from codentis.agent.session import Session
+        # Children see the parent's file and listing caches but only write to their own layer
+        workspace = self._parent_workspace.child() if self._parent_workspace else None
+        return Session(self._child_config(), is_subagent=True, workspace=workspace, shared_clients=self.shared_clients)
     
     @property
     def name(self)->str:
@@ -27,127 +159,249 @@ class SubAgentTool(Tool):
     
     @property
     def description(self)->str:
-        return self.definition.description
+        return (
+            f"{self.definition.description} "
+            f"Pass `goals` to run several independent investigations in parallel."
+        )
 
     schema = SubAgentParams
 
     def is_mutating(self, params: dict[str, Any]) -> bool:
         return True
 
-    async def execute(self, invocation: ToolInvocation)->ToolResult:
-        from codentis.agent.agent import Agent
-        from codentis.agent.events import AgentEventType
+    def is_cacheable(self, params: dict[str, Any]) -> bool:
+        return False
 
-        params = SubAgentParams(**invocation.params)
-        if not params.goal:
-            return ToolResult.error_result("Goal is required for subagent execution")
-        
+    def _child_config(self) -> Config:
         config_dict = self.config.to_dict()
         config_dict['max_turns'] = self.definition.max_turns
+        # A route configured for this sub-agent by name beats the definition's own
+        # override, which beats a route for all sub-agents
+        route = self.config.resolve_route(
+            f"subagent.{self.definition.name}",
+            ModelRoute(model=self.definition.model, base_url=self.definition.base_url, api_key=self.definition.api_key),
+            "subagent",
+        )
+        config_dict['model']['name'] = route.model
+        config_dict['base_url'] = route.base_url
+        config_dict['api_key'] = route.api_key
         if self.definition.allowed_tools:
             config_dict['allowed_tools'] = self.definition.allowed_tools 
+        return Config(**config_dict)
 
-        subagent_config = Config(**config_dict)
-        prompt = f"""
+    def _build_prompt(self, goal: str) -> str:
+        return f"""
         You are a specialized sub-agent with a specific task to complete.
 
         {self.definition.goal_prompt}
 
         YOUR TASK:
-        {params.goal}
+        {goal}
 
         IMPORTANT:
         - Focus only on completing the specified task
         - Do not engage in unrelated actions
         - Once you have completed the task or have the answer, provide your final output
         - Be concise and direct in your output
-        """
-
-        tool_calls = []
-        final_response = None
-        error_message = None
-        terminate_response = 'goal'
 
-        # Progress callback — updated in-place so the TUI spinner reads it live
-        progress_callback = invocation.metadata.get("progress_callback") if invocation.metadata else None
+        {REPORT_INSTRUCTIONS}
+        """
 
-        def _human_status(tool_name: str, arguments: dict) -> str:
-            """Convert a tool call into a short human-readable status string."""
-            if tool_name == "read_file":
-                path = arguments.get("path", "")
-                return f"Reading {path}"
-            elif tool_name == "list_dir":
-                path = arguments.get("path", ".")
-                return f"Exploring {path}"
-            elif tool_name == "grep":
-                pattern = arguments.get("pattern", "")
-                return f"Searching for '{pattern}'"
-            elif tool_name == "glob":
-                pattern = arguments.get("pattern", "")
-                return f"Finding files matching '{pattern}'"
-            elif tool_name == "web_search":
-                query = arguments.get("query", "")
-                return f"Searching web for '{query}'"
-            elif tool_name == "web_fetch":
-                url = arguments.get("url", "")
-                return f"Fetching {url}"
-            elif tool_name == "write_file":
-                path = arguments.get("path", "")
-                return f"Writing {path}"
-            elif tool_name == "edit_file":
-                path = arguments.get("path", "")
-                return f"Editing {path}"
-            elif tool_name == "shell":
-                cmd = arguments.get("command", "")
-                return f"Running: {cmd[:40]}"
-            else:
-                return f"Using {tool_name}"
+    async def _run_child(self, goal: str, report: Callable[[str], None] | None) -> SubAgentRun:
+        from codentis.agent.agent import Agent
+        from codentis.agent.events import AgentEventType
 
-        try:
-            async with Agent(subagent_config, is_subagent=True) as agent:
-                deadline = asyncio.get_event_loop().time() + self.definition.timeout_seconds
-
-                async for event in agent.run(prompt):
-                    if asyncio.get_event_loop().time() > deadline:
-                        terminate_response = 'timeout'
-                        final_response = f"Subagent execution timed out after {self.definition.timeout_seconds} seconds"
-                        break
-                    if event.type == AgentEventType.TOOL_CALL_START:
+        run = SubAgentRun(goal=goal)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        budget = self.definition.token_budget
+        completed: list[str] = []
+        partial: list[str] = []
+        pending_calls: dict[str, tuple[str, dict]] = {}
+        run.transcript.append(f"# Sub-agent {self.definition.name}\n\n## Goal\n{goal}")
+
+        def tokens_used(agent: Agent) -> int:
+            # Usage is only known per completed turn; count the text streamed since as ~4 chars/token
+            used = agent.session.usage.total_tokens if agent.session else 0
+            return used + sum(len(chunk) for chunk in partial) // 4
+
+        async def consume(agent: Agent) -> None:
+            async with aclosing(agent.run(self._build_prompt(goal))) as events:
+                async for event in events:
+                    if event.type == AgentEventType.TEXT_DELTA:
+                        partial.append(event.data.get("content", ""))
+                    elif event.type == AgentEventType.TOOL_CALL_START:
                         tool_name = event.data.get("name", "")
                         arguments = event.data.get("arguments", {})
-                        tool_calls.append(tool_name)
-                        status = _human_status(tool_name, arguments)
-                        if progress_callback:
-                            progress_callback(status)
+                        run.tool_calls.append(tool_name)
+                        pending_calls[event.data.get("call_id", "")] = (tool_name, arguments)
+                        run.transcript.append(
+                            f"## Tool call: {tool_name}\n```json\n{json.dumps(arguments, indent=2, default=str)}\n```"
+                        )
+                        if report:
+                            report(_human_status(tool_name, arguments))
+                    elif event.type == AgentEventType.TOOL_CALL_COMPLETE:
+                        tool_name, arguments = pending_calls.pop(event.data.get("call_id", ""), ("", {}))
+                        success = event.data.get("success")
+                        if success and tool_name == "read_file":
+                            _add_unique(run.files_read, _tool_paths(tool_name, arguments))
+                        elif success and tool_name in _FILE_WRITING_TOOLS:
+                            _add_unique(run.files_modified, _tool_paths(tool_name, arguments))
+                        body = event.data.get("output") or ""
+                        if not success:
+                            body = f"Error: {event.data.get('error')}\n{body}".rstrip()
+                        run.transcript.append(f"## Tool result: {event.data.get('name', tool_name)}\n{body}")
                     elif event.type == AgentEventType.TEXT_COMPLETE:
+                        partial.clear()
                         content = event.data.get("content")
-                        if content:
-                            if final_response is None:
-                                final_response = content
-                            else:
-                                final_response += "\n" + content
+                        # The agent repeats a turn's text once the turn is recorded
+                        if content and (not completed or completed[-1] != content):
+                            completed.append(content)
+                            run.transcript.append(f"## Assistant\n{content}")
                     elif event.type == AgentEventType.AGENT_END:
-                        if final_response is None:
-                            final_response = event.data.get("content")
+                        if not completed and event.data.get("response"):
+                            completed.append(event.data["response"])
                     elif event.type == AgentEventType.AGENT_ERROR:
-                        error_message = event.data.get("content")
-                        final_response = f"Subagent execution failed: {error_message}"
-                        break
+                        run.error = event.data.get("error") or "unknown error"
+                        return
+
+                    if budget is not None and tokens_used(agent) > budget:
+                        run.termination = 'token_budget'
+                        return
+
+        try:
+            session = await self.pool.acquire()
         except Exception as e:
-            terminate_response = 'error'
-            error_message = str(e)
-            final_response = f"Subagent execution failed: {error_message}"
-        
-        result = f"""Subagent {self.definition.name} execution completed with response: {final_response}
-        Tool calls: {', '.join(tool_calls) if tool_calls else 'None'}
-        
-        Result : {final_response or 'No response from subagent'}
-        """
+            run.termination = 'error'
+            run.error = str(e)
+            run.response = f"Subagent execution failed: {run.error}"
+            return run
+
+        try:
+            async with Agent(session.config, is_subagent=True, session=session) as agent:
+                # The child runs in its own task so the timeout can cancel it wherever
+                # it is blocked: an LLM stream, a tool call or a shell subprocess.
+                task = asyncio.create_task(consume(agent))
+                try:
+                    done, _ = await asyncio.wait({task}, timeout=self.definition.timeout_seconds)
+                finally:
+                    if not task.done():
+                        task.cancel()
+                        try:
+                            await task
+                        except asyncio.CancelledError:
+                            pass
+                if done:
+                    task.result()
+                else:
+                    run.termination = 'timeout'
+                run.tokens = tokens_used(agent)
+        except Exception as e:
+            run.termination = 'error'
+            run.error = str(e)
+        finally:
+            await self.pool.release(session)
+
+        if run.error:
+            run.response = f"Subagent execution failed: {run.error}"
+        else:
+            run.final_text = completed[-1] if completed else None
+            if partial:
+                completed.append("".join(partial) + " [cut off]")
+                run.transcript.append(f"## Assistant (cut off)\n{''.join(partial)}")
+            run.response = "\n".join(completed) or None
+            if run.termination == 'timeout':
+                note = f"Subagent stopped after the {self.definition.timeout_seconds:g}s timeout."
+            elif run.termination == 'token_budget':
+                note = f"Subagent stopped after exceeding its {budget:,} token budget."
+            else:
+                note = None
+            if note:
+                run.response = f"{note} Partial output:\n{run.response}" if run.response else note
+
+        run.duration = loop.time() - started
+        run.transcript.append(
+            f"## End\nTermination: {'error' if run.error else run.termination}"
+            f" | {run.duration:.1f}s | {run.tokens:,} tokens" + (f"\nError: {run.error}" if run.error else "")
+        )
+        run.transcript_path = write_transcript(self.definition.name, run.transcript)
+        return run
+
+    async def _fan_out(self, goals: list[str], progress_callback: Callable[[str], None] | None) -> list[SubAgentRun]:
+        """Run one child per goal, at most definition.max_parallel at a time."""
+        semaphore = asyncio.Semaphore(self.definition.max_parallel)
+        total = len(goals)
+        await self.pool.prewarm(total)
+        finished = 0
+
+        def reporter(index: int) -> Callable[[str], None] | None:
+            if not progress_callback:
+                return None
+            return lambda status: progress_callback(f"[{index + 1}/{total}] {status}")
+
+        async def run_one(index: int, goal: str) -> SubAgentRun:
+            nonlocal finished
+            async with semaphore:
+                run = await self._run_child(goal, reporter(index))
+            finished += 1
+            if progress_callback:
+                progress_callback(f"{finished}/{total} sub-agents finished")
+            return run
+
+        return await asyncio.gather(*(run_one(i, goal) for i, goal in enumerate(goals)))
+
+    async def execute(self, invocation: ToolInvocation)->ToolResult:
+        params = invocation.parsed_params(SubAgentParams)
+        goals = [goal for goal in ([params.goal] if params.goal else []) + (params.goals or []) if goal.strip()]
+        if not goals:
+            return ToolResult.error_result("Goal is required for subagent execution")
+        if invocation.workspace is not None:
+            self._parent_workspace = invocation.workspace
+
+        # Progress callback — updated in-place so the TUI spinner reads it live
+        progress_callback = invocation.metadata.get("progress_callback") if invocation.metadata else None
+
+        if len(goals) > 1:
+            return await self._execute_many(goals, progress_callback)
+
+        run = await self._run_child(goals[0], progress_callback)
+        report = run.report()
+        # Only this compact form goes into the parent's context
+        output = f"Subagent {self.definition.name} result:\n{report.render(self.definition.result_token_budget)}"
+        metadata = {"subagent": self.definition.name, **report.to_dict()}
 
-        if error_message:
-            return ToolResult.error_result(f"Subagent execution failed: {error_message}")
+        if run.error:
+            return ToolResult.error_result(f"Subagent execution failed: {run.error}", output=output, metadata=metadata)
         else:
-            return ToolResult.success_result(result)
+            return ToolResult.success_result(output, metadata=metadata)
+
+    async def _execute_many(self, goals: list[str], progress_callback: Callable[[str], None] | None) -> ToolResult:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        runs = await self._fan_out(goals, progress_callback)
+        elapsed = loop.time() - started
+
+        succeeded = sum(1 for run in runs if not run.error)
+        # The budget covers the whole merged report
+        per_goal_budget = max(200, self.definition.result_token_budget // len(runs))
+        reports = [run.report() for run in runs]
+        lines = [
+            f"Subagent {self.definition.name} ran {len(runs)} goals in parallel "
+            f"({elapsed:.1f}s, {succeeded}/{len(runs)} succeeded)."
+        ]
+        for i, (run, report) in enumerate(zip(runs, reports), 1):
+            lines.append("")
+            lines.append(f"### Goal {i}: {run.goal}")
+            lines.append(report.render(per_goal_budget))
+
+        metadata = {
+            "subagent": self.definition.name,
+            "elapsed": round(elapsed, 2),
+            "goals": [{"goal": run.goal, **report.to_dict()} for run, report in zip(runs, reports)],
+        }
+        if not succeeded:
+            return ToolResult.error_result("All sub-agents failed", output="\n".join(lines), metadata=metadata)
+        return ToolResult.success_result("\n".join(lines), metadata=metadata)
     
 CODEBASE_INVESTIGATOR = SubAgentDefinition(
     name="codebase_investigator",
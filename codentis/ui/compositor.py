@@ -0,0 +1,165 @@
+"""Frame-based terminal writer shared by everything the TUI prints.
+
+The TUI used to print and flush stdout on every text delta while a spinner
+thread printed its own line every 100 ms, with nothing ordering the two:
+one write syscall per token, and escape sequences from both writers could
+interleave. OutputCompositor is the only writer now. write() just appends
+to a buffer under a lock; one long-lived render task on the event loop
+turns whatever arrived during the last frame into one stdout write, at
+most `fps` times a second. Nothing on the hot path sleeps or joins a
+thread: starting, updating and stopping the spinner only change state
+that the next frame draws.
+
+The compositor also owns the spinner line. It is drawn below the output,
+erased before new output is written over it, redrawn after it, and only
+rewritten when its frame or message changes, so an idle spinner costs ten
+writes a second and a busy stream none extra.
+"""
+from __future__ import annotations
+import asyncio
+import sys
+import threading
+import time
+from typing import TextIO
+
+DEFAULT_FPS = 30.0
+SPINNER_FRAMES = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
+SPINNER_INTERVAL = 0.1
+
+_ERASE_LINE = "\r\033[2K"
+
+
+class OutputCompositor:
+    """Coalesces terminal output into frames written from one place.
+
+    Safe to use from any thread. Frames are drawn by the task start()
+    puts on the running loop; until then, and after stop(), every write
+    goes out immediately. flush() writes the pending frame at once and is
+    called before anything else touches the terminal (an input() prompt,
+    Rich output, process exit).
+    """
+
+    def __init__(self, stream: TextIO | None = None, fps: float = DEFAULT_FPS, spinner_style: str = "", reset: str = ""):
+        self.stream = stream
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.spinner_style = spinner_style
+        self.reset = reset
+        self.frames_written = 0
+
+        self._lock = threading.RLock()  # reentrant: the SIGINT handler stops the spinner
+        self._chunks: list[str] = []
+        self._spinner: str | None = None  # message while the spinner is shown
+        self._spinner_started = 0.0
+        self._spinner_drawn: str | None = None  # line currently on screen
+        self._at_line_start = True
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: int | None = None
+        self._pending: asyncio.Event | None = None  # set while there is something to draw
+        self._task: asyncio.Task | None = None
+
+    def write(self, text: str) -> None:
+        if not text:
+            return
+        with self._lock:
+            self._chunks.append(text)
+            self._wake()
+
+    def set_spinner(self, message: str | None) -> None:
+        """Show the spinner with message, update its message, or hide it (None)."""
+        with self._lock:
+            if message is not None and self._spinner is None:
+                self._spinner_started = time.monotonic()
+            self._spinner = message
+            self._wake()
+
+    @property
+    def spinner_active(self) -> bool:
+        return self._spinner is not None
+
+    def flush(self) -> None:
+        """Write everything pending now instead of at the next frame."""
+        with self._lock:
+            self._write_frame()
+
+    def start(self) -> None:
+        """Start the render task on the running event loop."""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._pending = asyncio.Event()
+        if self._dirty():
+            self._pending.set()
+        self._task = self._loop.create_task(self._render(), name="codentis-render")
+
+    async def stop(self) -> None:
+        """Stop the render task, hide the spinner and write what is pending."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        with self._lock:
+            self._spinner = None
+            self._write_frame()
+
+    def _wake(self) -> None:
+        # Caller holds the lock
+        if self._task is None or self.interval == 0.0:
+            self._write_frame()
+        elif threading.get_ident() == self._loop_thread:
+            self._pending.set()
+        else:
+            try:
+                self._loop.call_soon_threadsafe(self._pending.set)
+            except RuntimeError:  # the loop is already closed
+                self._write_frame()
+
+    async def _render(self) -> None:
+        while True:
+            await self._pending.wait()
+            # Everything written during this frame goes out in the same write
+            await asyncio.sleep(self.interval)
+            with self._lock:
+                self._write_frame()
+                if not self._chunks and self._spinner is None:
+                    self._pending.clear()
+
+    def _dirty(self) -> bool:
+        return bool(self._chunks) or self._spinner is not None or self._spinner_drawn is not None
+
+    def _spinner_line(self) -> str | None:
+        if self._spinner is None:
+            return None
+        frame = SPINNER_FRAMES[int((time.monotonic() - self._spinner_started) / SPINNER_INTERVAL) % len(SPINNER_FRAMES)]
+        return f"{self.spinner_style}{frame} {self._spinner}...\033[K{self.reset}"
+
+    def _write_frame(self) -> None:
+        # Caller holds the lock
+        parts: list[str] = []
+        spinner = self._spinner_line()
+        if self._chunks:
+            if self._spinner_drawn is not None:
+                parts.append(_ERASE_LINE)
+                self._spinner_drawn = None
+            text = "".join(self._chunks)
+            self._chunks.clear()
+            parts.append(text)
+            self._at_line_start = text.endswith("\n")
+        if spinner is not None and spinner != self._spinner_drawn:
+            if self._spinner_drawn is None and not self._at_line_start:
+                parts.append("\n")  # never draw over a partial line
+                self._at_line_start = True
+            parts.append(f"\r{spinner}")
+            self._spinner_drawn = spinner
+        elif spinner is None and self._spinner_drawn is not None:
+            parts.append(_ERASE_LINE)
+            self._spinner_drawn = None
+        if not parts:
+            return
+        stream = self.stream or sys.stdout
+        stream.write("".join(parts))
+        stream.flush()
+        self.frames_written += 1
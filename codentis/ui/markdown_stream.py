@@ -0,0 +1,193 @@
+"""Incremental markdown renderer for streamed assistant text.
+
+MarkdownStream keeps its parser state between deltas, so every character
+is looked at about once however long the answer gets. Plain text is
+written out as soon as it arrives; a construct that needs its closing
+marker (bold, inline code, a code fence's info line) is held back only
+until that marker shows up, and is given up as plain text at the end of
+the line or after MAX_INLINE characters. Header and code lines are
+streamed as they come, with the style opened at the start of the line and
+reset at its end.
+
+Supported: ATX headers, fenced code blocks, bullet and numbered list
+items, **bold** and `inline code`.
+"""
+from __future__ import annotations
+import re
+from typing import Any
+
+MAX_INLINE = 400
+
+_LINE_START, _INLINE, _HEADER, _FENCE_INFO, _CODE_LINE_START, _CODE, _FENCE_CLOSE = range(7)
+
+_HEADER_MARK = re.compile(r"#{1,6}[ \t]")
+_FENCE_MARK = re.compile(r"[ \t]*```")
+_LIST_MARK = re.compile(r"([ \t]*)([-*+]|\d{1,9}[.)])[ \t]")
+# Text that is still too short to tell which block it starts
+_BLOCK_PREFIX = re.compile(r"#{1,6}|[ \t]{0,40}(?:`{1,2}|[-*+]|\d{1,9}[.)]?)?")
+_FENCE_PREFIX = re.compile(r"[ \t]{0,40}`{0,2}")
+_INLINE_SPECIAL = re.compile(r"[*`\n]")
+
+
+class MarkdownStream:
+    """Turns markdown deltas into ANSI-styled terminal text.
+
+    styles is any object with BOLD, RESET, CYAN, YELLOW, DIM and GRAY
+    escape-code attributes (the TUI itself).
+    """
+
+    def __init__(self, styles: Any) -> None:
+        self.styles = styles
+        self._state = _LINE_START
+        self._pending = ""
+        self._in_code = False
+
+    def feed(self, delta: str) -> str:
+        """Consume delta and return whatever can be rendered so far."""
+        text = self._pending + delta if self._pending else delta
+        self._pending = ""
+        out: list[str] = []
+        i = self._advance(text, 0, out)
+        if i < len(text):
+            self._pending = text[i:]
+        return "".join(out)
+
+    def finish(self) -> str:
+        """Flush held-back text as-is and close any open style or code block."""
+        s = self.styles
+        out: list[str] = []
+        pending, self._pending = self._pending, ""
+        state = self._state
+        if state == _FENCE_INFO:
+            out.append(f"```{pending}")  # the block never opened
+        elif state == _CODE_LINE_START:
+            if pending:
+                out.append(f"  {s.DIM}{pending}{s.RESET}\n")
+        elif state != _FENCE_CLOSE:
+            out.append(pending)
+        if state in (_HEADER, _CODE):
+            out.append(s.RESET)
+        if self._in_code:
+            out.append(f"\n{s.GRAY}└─{s.RESET}" if state == _CODE else f"{s.GRAY}└─{s.RESET}")
+        self._state = _LINE_START
+        self._in_code = False
+        return "".join(out)
+
+    def _advance(self, text: str, i: int, out: list[str]) -> int:
+        # Returns the index of the first character that has to wait for more input
+        s = self.styles
+        n = len(text)
+        while i < n:
+            state = self._state
+
+            if state == _LINE_START:
+                if _BLOCK_PREFIX.fullmatch(text, i) and len(text) - i <= 64:
+                    return i
+                match = _FENCE_MARK.match(text, i)
+                if match:
+                    self._state = _FENCE_INFO
+                    i = match.end()
+                    continue
+                match = _HEADER_MARK.match(text, i)
+                if match:
+                    out.append(f"{s.CYAN}{s.BOLD}")
+                    self._state = _HEADER
+                    i = match.end()
+                    continue
+                match = _LIST_MARK.match(text, i)
+                if match:
+                    indent, bullet = match.group(1), match.group(2)
+                    out.append(f"{indent}{s.CYAN}{'•' if bullet in '-*+' else bullet}{s.RESET} ")
+                    i = match.end()
+                self._state = _INLINE
+
+            elif state == _INLINE:
+                match = _INLINE_SPECIAL.search(text, i)
+                if match is None:
+                    out.append(text[i:])
+                    return n
+                k = match.start()
+                out.append(text[i:k])
+                char = text[k]
+                if char == "\n":
+                    out.append("\n")
+                    self._state = _LINE_START
+                    i = k + 1
+                    continue
+                marker = "**" if char == "*" else "`"
+                if text.startswith(marker, k):
+                    closed = self._inline_span(text, k, marker, out)
+                    if closed is None:
+                        return k
+                    i = closed
+                elif k + 1 < n:
+                    out.append(char)  # a lone '*'
+                    i = k + 1
+                else:
+                    return k  # '*' at the end: may become '**'
+
+            elif state == _HEADER:
+                newline = text.find("\n", i)
+                if newline == -1:
+                    out.append(text[i:])
+                    return n
+                out.append(f"{text[i:newline]}{s.RESET}\n")
+                self._state = _LINE_START
+                i = newline + 1
+
+            elif state == _FENCE_INFO:
+                newline = text.find("\n", i)
+                if newline == -1:
+                    return i
+                out.append(f"\n{s.GRAY}┌─ {text[i:newline].strip()}{s.RESET}\n")
+                self._in_code = True
+                self._state = _CODE_LINE_START
+                i = newline + 1
+
+            elif state == _CODE_LINE_START:
+                match = _FENCE_MARK.match(text, i)
+                if match:
+                    self._state = _FENCE_CLOSE
+                    i = match.end()
+                    continue
+                if _FENCE_PREFIX.fullmatch(text, i) and len(text) - i <= 64:
+                    return i
+                out.append(f"  {s.DIM}")
+                self._state = _CODE
+
+            elif state == _CODE:
+                newline = text.find("\n", i)
+                if newline == -1:
+                    out.append(text[i:])
+                    return n
+                out.append(f"{text[i:newline]}{s.RESET}\n")
+                self._state = _CODE_LINE_START
+                i = newline + 1
+
+            else:  # _FENCE_CLOSE: drop the rest of the closing fence line
+                newline = text.find("\n", i)
+                if newline == -1:
+                    return n
+                out.append(f"{s.GRAY}└─{s.RESET}\n")
+                self._in_code = False
+                self._state = _LINE_START
+                i = newline + 1
+        return i
+
+    def _inline_span(self, text: str, k: int, marker: str, out: list[str]) -> int | None:
+        """Render **bold** or `code` opening at k; None if its end has not arrived yet."""
+        s = self.styles
+        start = k + len(marker)
+        end = text.find(marker, start)
+        newline = text.find("\n", start)
+        if end != -1 and (newline == -1 or end < newline):
+            if end == start:
+                out.append(marker * 2)  # empty span: plain text
+            else:
+                style = s.BOLD if marker == "**" else s.YELLOW
+                out.append(f"{style}{text[start:end]}{s.RESET}")
+            return end + len(marker)
+        if newline != -1 or len(text) - start > MAX_INLINE:
+            out.append(marker)  # never closed on this line: plain text
+            return start
+        return None
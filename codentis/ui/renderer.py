@@ -12,9 +12,11 @@ This provides a clean, streamlined experience similar to Claude Code.
 """
 
 import sys
-import threading
 from typing import Any, Dict, List
 from codentis.config.config import Config
+from codentis.ui.compositor import OutputCompositor
+from codentis.ui.markdown_stream import MarkdownStream
+from codentis.ui.tool_history import ToolOutput, ToolOutputHistory
 from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
@@ -23,34 +25,17 @@ from rich.table import Table
 console = Console()
 
 
-class ToolOutput:
-    """Represents a tool call output."""
-    
-    def __init__(self, call_id: str, name: str, summary: str, details: str, success: bool = True, short_id: str = "", metadata: Dict[str, Any] = None):
-        self.call_id = call_id
-        self.name = name
-        self.summary = summary
-        self.details = details
-        self.success = success
-        self.expanded = False
-        self.index = 0  # Position in the list
-        self.short_id = short_id  # Short numeric ID for easy reference
-        self.metadata = metadata or {}  # Store metadata
-
-
 class TUI:
     """Lightweight terminal UI."""
     
     def __init__(self, config: Config, console=None):
         self.config = config
-        self.tool_outputs: List[ToolOutput] = []
-        self.tool_outputs_by_id: Dict[str, ToolOutput] = {}  # Map short IDs to tool outputs
-        self.current_message = ""
+        # Newest outputs in memory, older ones compressed on disk until expanded
+        self.history = ToolOutputHistory(config.tool_history_max_outputs, int(config.tool_history_max_mb * 1024 * 1024))
+        self.markdown: MarkdownStream | None = None
         self.assistant_streaming = False
-        self.last_tool_index = -1
         self.next_tool_id = 1  # Counter for generating short IDs
         self.thinking_active = False
-        self.thinking_thread = None
         self.thinking_message = "Thinking"
         
         # ANSI escape codes
@@ -75,6 +60,9 @@ class TUI:
         self.SKY = "\033[38;5;117m"
         self.INDIGO = "\033[38;5;63m"
         
+        # Every write goes through here, coalesced into frames; it also draws the spinner
+        self.output = OutputCompositor(fps=config.ui_fps, spinner_style=self.DIM, reset=self.RESET)
+        
         # Tool color mapping
         self.tool_colors = {
             "web_search": self.PURPLE,
@@ -92,91 +80,128 @@ class TUI:
             "memory": self.INDIGO,
         }
     
+    def print(self, *values: Any, sep: str = " ", end: str = "\n", flush: bool = False):
+        """Like print(), but written with the next frame (or right away with flush=True)."""
+        self.output.write(sep.join(str(value) for value in values) + end)
+        if flush:
+            self.output.flush()
+    
+    def flush(self):
+        """Write pending output now; call before input() or anything else that uses the terminal."""
+        self.output.flush()
+    
     def toggle_tool(self, tool_id: str = None):
         """Toggle the expansion state of a tool output by ID, or the last one if no ID given."""
         if tool_id:
             # Toggle specific tool by ID
-            tool = self.tool_outputs_by_id.get(tool_id)
+            tool = self.history.get(tool_id)
             if tool:
                 tool.expanded = not tool.expanded
-                print()  # New line for separation
+                self.print()  # New line for separation
                 if tool.expanded:
                     self._print_expanded_tool(tool)
                 else:
-                    print(f"{self.DIM}Tool output #{tool_id} collapsed. Type /e {tool_id} to expand again.{self.RESET}")
+                    self.print(f"{self.DIM}Tool output #{tool_id} collapsed. Type /e {tool_id} to expand again.{self.RESET}")
             else:
-                print(f"{self.RED}Tool #{tool_id} not found. Use /list to see available tool IDs.{self.RESET}")
+                self.print(f"{self.RED}Tool #{tool_id} not found. Use /list to see available tool IDs.{self.RESET}")
         else:
             # Toggle last tool
-            if self.tool_outputs:
-                tool = self.tool_outputs[-1]
+            tool = self.history.last()
+            if tool:
                 tool.expanded = not tool.expanded
-                print()  # New line for separation
+                self.print()  # New line for separation
                 if tool.expanded:
                     self._print_expanded_tool(tool)
                 else:
-                    print(f"{self.DIM}Tool output collapsed. Type /e to expand again.{self.RESET}")
+                    self.print(f"{self.DIM}Tool output collapsed. Type /e to expand again.{self.RESET}")
             else:
-                print(f"{self.DIM}No tool outputs to expand.{self.RESET}")
+                self.print(f"{self.DIM}No tool outputs to expand.{self.RESET}")
     
     def list_tools(self):
         """List all tool outputs with their IDs."""
-        if not self.tool_outputs:
-            print(f"{self.DIM}No tool outputs yet.{self.RESET}")
+        if not len(self.history):
+            self.print(f"{self.DIM}No tool outputs yet.{self.RESET}")
             return
         
-        print(f"\n{self.BOLD}{self.CYAN}Tool Outputs:{self.RESET}\n")
-        for tool in self.tool_outputs:
+        self.print(f"\n{self.BOLD}{self.CYAN}Tool Outputs:{self.RESET}\n")
+        for tool in self.history:
             tool_color = self.tool_colors.get(tool.name, self.GRAY)
             status_color = self.GREEN if tool.success else self.RED
             status = "✓" if tool.success else "✗"
-            print(f"  {tool_color}●{self.RESET} {status_color}#{tool.short_id}{self.RESET} {status} {self.BOLD}{tool.name}{self.RESET} - {self.DIM}{tool.summary}{self.RESET}")
-        print(f"\n{self.DIM}Type /e <id> to expand a specific tool output{self.RESET}\n")
+            self.print(f"  {tool_color}●{self.RESET} {status_color}#{tool.short_id}{self.RESET} {status} {self.BOLD}{tool.name}{self.RESET} - {self.DIM}{tool.summary}{self.RESET}")
+        self.print(f"\n{self.DIM}Type /e <id> to expand a specific tool output{self.RESET}\n")
     
+    def print_model_usage(self, stats: list):
+        """Tokens, latency and throughput per model (ModelStats from the usage tracker)."""
+        if not stats:
+            self.print(f"{self.DIM}No model calls yet.{self.RESET}")
+            return
+
+        self.print(f"\n{self.BOLD}{self.CYAN}Model Usage:{self.RESET}\n")
+        for entry in stats:
+            row = entry.to_dict()
+            estimated = f" {self.DIM}(~{row['estimated_requests']} estimated){self.RESET}" if row["estimated_requests"] else ""
+            errors = f" {self.RED}{row['errors']} errors{self.RESET}" if row["errors"] else ""
+            self.print(f"  {self.BOLD}{entry.model}{self.RESET} - {row['requests']} requests{errors}{estimated}")
+            self.print(
+                f"    {self.DIM}tokens:{self.RESET} {row['prompt_tokens']:,} in / {row['completion_tokens']:,} out"
+                f" ({row['cached_tokens']:,} cached)"
+            )
+            self.print(
+                f"    {self.DIM}latency:{self.RESET} {row['avg_latency']:.2f}s avg, {row['avg_first_token']:.2f}s to first token,"
+                f" {row['tokens_per_second']:.1f} tok/s"
+            )
+        self.print()
+
+    def print_tool_stats(self, stats: list):
+        """Calls, latency percentiles, bytes and output tokens per tool (ToolStats from the tool metrics)."""
+        if not stats:
+            self.print(f"{self.DIM}No tool calls yet.{self.RESET}")
+            return
+
+        self.print(f"\n{self.BOLD}{self.CYAN}Tool Stats:{self.RESET}\n")
+        for entry in stats:
+            row = entry.to_dict()
+            errors = f" {self.RED}{row['errors']} errors{self.RESET}" if row["errors"] else ""
+            hits = f" {self.DIM}({row['cache_hits']} cached){self.RESET}" if row["cache_hits"] else ""
+            self.print(f"  {self.BOLD}{entry.name}{self.RESET} - {row['calls']} calls{hits}{errors}")
+            self.print(
+                f"    {self.DIM}latency:{self.RESET} {row['avg_ms']:.1f}ms avg, p50 {row['p50_ms']:.1f}ms,"
+                f" p95 {row['p95_ms']:.1f}ms, max {row['max_ms']:.1f}ms"
+            )
+            self.print(
+                f"    {self.DIM}output:{self.RESET} {row['bytes_returned']:,} bytes (~{row['output_tokens']:,} tokens),"
+                f" {row['bytes_read']:,} bytes read"
+            )
+        history = self.history.stats()
+        self.print(
+            f"\n  {self.BOLD}Output history{self.RESET} - {history['outputs']} outputs,"
+            f" {history['in_memory']} in memory ({history['memory_bytes'] / 1024:,.0f} KB),"
+            f" {history['spilled']} on disk ({history['disk_bytes'] / 1024:,.0f} KB compressed)"
+        )
+        self.print()
+
     def toggle_last_tool(self):
         """Toggle the expansion state of the most recent tool output."""
         self.toggle_tool()
     
     def start_thinking(self, message: str = "Thinking"):
-        """Start animated thinking indicator."""
-        # If already active, just update the message
-        if self.thinking_active:
-            self.thinking_message = message
-            return
-        
+        """Start animated thinking indicator (drawn by the compositor)."""
         self.thinking_active = True
         self.thinking_message = message
-        
-        def animate():
-            frames = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
-            idx = 0
-            while self.thinking_active:
-                frame = frames[idx % len(frames)]
-                msg = self.thinking_message
-                print(f"\r{self.DIM}{frame} {msg}...\033[K{self.RESET}", end="", flush=True)
-                idx += 1
-                import time
-                time.sleep(0.1)
-            # Clear the line when done
-            print(f"\r\033[2K\r", end="", flush=True)
-        
-        self.thinking_thread = threading.Thread(target=animate, daemon=True)
-        self.thinking_thread.start()
+        self.output.set_spinner(message)
     
     def update_thinking(self, message: str):
         """Update the thinking message."""
         if self.thinking_active:
             self.thinking_message = message
+            self.output.set_spinner(message)
     
     def stop_thinking(self):
-        """Stop thinking indicator."""
+        """Stop thinking indicator; its line is erased with the next frame."""
         if self.thinking_active:
             self.thinking_active = False
-            if self.thinking_thread:
-                self.thinking_thread.join(timeout=0.5)
-            # Small delay to ensure the line is fully cleared
-            import time
-            time.sleep(0.05)
+            self.output.set_spinner(None)
     
     def _print_expanded_tool(self, tool: ToolOutput):
         """Print the full expanded view of a tool output."""
@@ -184,14 +209,14 @@ class TUI:
         tool_color = self.tool_colors.get(tool.name, self.GRAY)
         status_color = self.GREEN if tool.success else self.RED
         
-        print(f"\n{self.GRAY}{'─' * 80}{self.RESET}")
-        print(f"{tool_color}● {self.RESET}{self.BOLD}{tool.name} #{tool.short_id}{self.RESET} {self.DIM}(expanded){self.RESET}")
-        print(f"  {self.DIM}└ {tool.summary}{self.RESET}")
-        print(f"{self.GRAY}{'─' * 80}{self.RESET}\n")
+        self.print(f"\n{self.GRAY}{'─' * 80}{self.RESET}")
+        self.print(f"{tool_color}● {self.RESET}{self.BOLD}{tool.name} #{tool.short_id}{self.RESET} {self.DIM}(expanded){self.RESET}")
+        self.print(f"  {self.DIM}└ {tool.summary}{self.RESET}")
+        self.print(f"{self.GRAY}{'─' * 80}{self.RESET}\n")
         
         # Show metadata if present
         if tool.metadata:
-            print(f"{self.CYAN}{self.BOLD}Metadata:{self.RESET}")
+            self.print(f"{self.CYAN}{self.BOLD}Metadata:{self.RESET}")
             import json
             for key, value in tool.metadata.items():
                 # Format value nicely
@@ -199,22 +224,39 @@ class TUI:
                     value_str = json.dumps(value, indent=2)
                 else:
                     value_str = str(value)
-                print(f"  {self.CYAN}{key}:{self.RESET} {self.DIM}{value_str}{self.RESET}")
-            print()
+                self.print(f"  {self.CYAN}{key}:{self.RESET} {self.DIM}{value_str}{self.RESET}")
+            self.print()
         
-        # Show full details
-        print(f"{self.CYAN}{self.BOLD}Output:{self.RESET}")
+        # Show full details (read back from disk if the output has been spilled)
+        details, diff_text = self.history.contents(tool)
+        self.print(f"{self.CYAN}{self.BOLD}Output:{self.RESET}")
         if tool.success:
-            lines = tool.details.split('\n')
+            lines = details.split('\n')
             for line in lines[:100]:  # Limit to 100 lines
-                print(f"{self.DIM}{line}{self.RESET}")
+                self.print(f"{self.DIM}{line}{self.RESET}")
             if len(lines) > 100:
-                print(f"\n{self.DIM}... ({len(lines) - 100} more lines truncated){self.RESET}")
+                self.print(f"\n{self.DIM}... ({len(lines) - 100} more lines truncated){self.RESET}")
         else:
-            print(f"{self.RED}{tool.details}{self.RESET}")
+            self.print(f"{self.RED}{details}{self.RESET}")
+        
+        # Show the diff for file-modifying tools (computed on first expand)
+        if diff_text:
+            self.print(f"\n{self.CYAN}{self.BOLD}Diff:{self.RESET}")
+            diff_lines = diff_text.split('\n')
+            for line in diff_lines[:200]:
+                if line.startswith('+') and not line.startswith('+++'):
+                    self.print(f"{self.GREEN}{line}{self.RESET}")
+                elif line.startswith('-') and not line.startswith('---'):
+                    self.print(f"{self.RED}{line}{self.RESET}")
+                elif line.startswith('@@'):
+                    self.print(f"{self.CYAN}{line}{self.RESET}")
+                else:
+                    self.print(f"{self.DIM}{line}{self.RESET}")
+            if len(diff_lines) > 200:
+                self.print(f"\n{self.DIM}... ({len(diff_lines) - 200} more diff lines truncated){self.RESET}")
         
-        print(f"\n{self.GRAY}{'─' * 80}{self.RESET}")
-        print(f"{self.DIM}Type /e {tool.short_id} to collapse{self.RESET}\n")
+        self.print(f"\n{self.GRAY}{'─' * 80}{self.RESET}")
+        self.print(f"{self.DIM}Type /e {tool.short_id} to collapse{self.RESET}\n")
     
     def print_welcome(self, title: str, lines: List[str]):
         """Print welcome message using Rich with ASCII art mascot."""
@@ -284,6 +326,10 @@ class TUI:
         tips_text.append(" - Expand/collapse last tool output\n", style="white")
         tips_text.append("/list", style="cyan")
         tips_text.append(" - List all tool outputs with IDs\n", style="white")
+        tips_text.append("/usage", style="cyan")
+        tips_text.append(" - Tokens and latency per model\n", style="white")
+        tips_text.append("/stats", style="cyan")
+        tips_text.append(" - Tool latency, bytes and tokens\n", style="white")
         tips_text.append("/exit", style="cyan")
         tips_text.append(" - Quit\n\n", style="white")
 
@@ -296,6 +342,7 @@ class TUI:
         layout_table.add_column(ratio=1)
         layout_table.add_row(welcome_text, tips_text)
 
+        self.flush()
         console.print()
         console.print(
             Panel(
@@ -312,159 +359,20 @@ class TUI:
     def begin_assistant(self):
         """Start streaming assistant message."""
         self.assistant_streaming = True
-        self.current_message = ""
-        self.markdown_buffer = ""  # Buffer for incomplete markdown patterns
+        self.markdown = MarkdownStream(self)  # parser state carried across deltas
         self.stop_thinking()  # Stop thinking indicator when response starts
-        
-        # Don't print new line or arrow - continue on the same line where thinking was
-        print(f"", end="", flush=True)
     
     def stream_assistant_delta(self, delta: str):
         """Stream assistant message delta with real-time markdown rendering."""
-        self.current_message += delta
-        self.markdown_buffer += delta
-        
-        # Process and render markdown patterns as they complete
-        rendered = self._render_streaming_markdown()
-        if rendered:
-            print(rendered, end="", flush=True)
+        self.output.write(self.markdown.feed(delta))
     
     def end_assistant(self):
         """End assistant message streaming."""
         self.assistant_streaming = False
         
-        # Flush any remaining buffer
-        if self.markdown_buffer:
-            print(self.markdown_buffer, end="", flush=True)
-            self.markdown_buffer = ""
-        
-        print()  # Add newline after output
-    
-    def _render_streaming_markdown(self) -> str:
-        """Render markdown patterns from buffer as they complete."""
-        import re
-        
-        output = ""
-        buffer = self.markdown_buffer
-        
-        # 1. Headers: (anywhere in buffer, complete when newline found)
-        header_match = re.search(r'(^|\n)(#{1,6})\s+([^\n]+)\n', buffer)
-        if header_match:
-            before = buffer[:header_match.start()]
-            prefix = header_match.group(1) # \n or empty
-            header_text = header_match.group(3)
-            after = buffer[header_match.end():]
-            
-            output = self._apply_inline_markdown(before) + prefix + f'{self.CYAN}{self.BOLD}{header_text}{self.RESET}\n'
-            self.markdown_buffer = after
-            return output
-        
-        # 2. Code Blocks: ```lang\ncode\n```
-        code_block_match = re.search(r'```([a-zA-Z0-9]*)\n(.*?)\n```', buffer, re.DOTALL)
-        if code_block_match:
-            before = buffer[:code_block_match.start()]
-            lang = code_block_match.group(1)
-            code_content = code_block_match.group(2)
-            after = buffer[code_block_match.end():]
-            
-            styled_code = "\n".join([f"  {self.DIM}{line}{self.RESET}" for line in code_content.split("\n")])
-            output = self._apply_inline_markdown(before) + f"\n{self.GRAY}┌─ {lang}{self.RESET}\n{styled_code}\n{self.GRAY}└─{self.RESET}\n"
-            self.markdown_buffer = after
-            return output
-
-        # 3. List items (bullets and numbers)
-        list_match = re.search(r'(^|\n)(\s*)([-*+]|\d+\.)\s+([^\n]+)\n', buffer)
-        if list_match:
-            before = buffer[:list_match.start()]
-            prefix = list_match.group(1)
-            indent = list_match.group(2)
-            bullet = list_match.group(3)
-            item_text = list_match.group(4)
-            after = buffer[list_match.end():]
-            
-            # Use a dot for bullets, keep number for numbered lists
-            display_bullet = f"{self.CYAN}•{self.RESET}" if bullet in "-*+" else f"{self.CYAN}{bullet}{self.RESET}"
-            output = self._apply_inline_markdown(before) + prefix + f'{indent}{display_bullet} {item_text}\n'
-            self.markdown_buffer = after
-            return output
-
-        # 4. Bold: **text**
-        bold_match = re.search(r'\*\*([^*]+)\*\*', buffer)
-        if bold_match:
-            before = buffer[:bold_match.start()]
-            bold_text = bold_match.group(1)
-            after = buffer[bold_match.end():]
-            
-            output = before + f'{self.BOLD}{bold_text}{self.RESET}'
-            self.markdown_buffer = after
-            return output
-        
-        # 5. Inline code: `code`
-        code_match = re.search(r'`([^`]+)`', buffer)
-        if code_match:
-            before = buffer[:code_match.start()]
-            code_text = code_match.group(1)
-            after = buffer[code_match.end():]
-            
-            output = before + f'{self.YELLOW}{code_text}{self.RESET}'
-            self.markdown_buffer = after
-            return output
-        
-        # If buffer has complete lines without markdown patterns potentially starting, output them
-        if '\n' in buffer and not any(p in buffer for p in ['**', '##', '```', '`', '- ', '* ', '1. ']):
-            lines = buffer.split('\n')
-            if len(lines) > 1:
-                output = '\n'.join(lines[:-1]) + '\n'
-                self.markdown_buffer = lines[-1]
-                return output
-        
-        # If buffer is getting very long, output some of it to keep things moving
-        if len(buffer) > 200:
-            # Output first 100 chars, being careful not to break an ongoing pattern
-            # (simple heuristic: don't break if we see start of a pattern near the end)
-            safe_to_output = True
-            for p in ['**', '#', '`', '-', '*', '1.']:
-                if p in buffer[80:100]:
-                    safe_to_output = False
-                    break
-            
-            if safe_to_output:
-                output = buffer[:100]
-                self.markdown_buffer = buffer[100:]
-                return output
-        
-        return ""
-    
-    def _apply_inline_markdown(self, text: str) -> str:
-        """Apply basic markdown styling to text for streaming."""
-        import re
-        
-        # Store original text for line-based processing
-        result = text
-        
-        # Bold: **text** -> styled text
-        result = re.sub(r'\*\*([^*]+)\*\*', f'{self.BOLD}\\1{self.RESET}', result)
-        
-        # Headers: ## Text -> colored and bold
-        result = re.sub(r'^(#{1,6})\s+(.+)$', f'{self.CYAN}{self.BOLD}\\2{self.RESET}', result, flags=re.MULTILINE)
-        
-        # List items: - Item or * Item or 1. Item -> colored bullet/number
-        result = re.sub(r'^(\s*)([-*+]|\d+\.)\s+', f'\\1{self.CYAN}\\2{self.RESET} ', result, flags=re.MULTILINE)
-        
-        # Replace bullets with dots for -*+ after styling if desired, but keep numbers
-        def replace_bullet(match):
-            indent = match.group(1)
-            bullet = match.group(2)
-            if bullet in "-*+":
-                return f"{indent}{self.CYAN}•{self.RESET} "
-            return f"{indent}{self.CYAN}{bullet}{self.RESET} "
-            
-        result = re.sub(r'^(\s*)([-*+]|\d+\.)\s+', replace_bullet, result, flags=re.MULTILINE)
-        
-        # Inline code: `code` -> styled
-        result = re.sub(r'`([^`]+)`', f'{self.YELLOW}\\1{self.RESET}', result)
-        
-        return result
+        # Flush held-back text and close any open block
+        self.output.write(self.markdown.finish())
+        self.print()  # Add newline after output
     
     def tool_call_start(self, call_id: str, name: str, tool_kind: str | None, arguments: Dict[str, Any]):
         """Show tool call started."""
@@ -478,19 +386,19 @@ class TUI:
         tool_color = self.tool_colors.get(name, self.GRAY)
         
         # Show loading indicator with ID and colored dot
-        print(f"\n{tool_color}● {self.RESET}{self.BOLD}{name} #{short_id}{self.RESET}")
+        self.print(f"\n{tool_color}● {self.RESET}{self.BOLD}{name} #{short_id}{self.RESET}")
         if summary:
-            print(f"  {self.DIM}└ {summary}{self.RESET}")
+            self.print(f"  {self.DIM}└ {summary}{self.RESET}")
         
         # Show appropriate status message based on tool type
         if name == "shell":
-            print(f"  {self.DIM}└ Executing...{self.RESET}")
+            self.print(f"  {self.DIM}└ Executing...{self.RESET}")
         elif name == "ask_user":
-            print(f"  {self.DIM}└ Waiting for input...{self.RESET}")
+            self.print(f"  {self.DIM}└ Waiting for input...{self.RESET}")
         elif name in ["web_search", "web_fetch"]:
-            print(f"  {self.DIM}└ Fetching...{self.RESET}")
+            self.print(f"  {self.DIM}└ Fetching...{self.RESET}")
         else:
-            print(f"  {self.DIM}└ Processing...{self.RESET}")
+            self.print(f"  {self.DIM}└ Processing...{self.RESET}")
         
         # Store the short_id temporarily (will be used in tool_call_complete)
         self._pending_tool_id = short_id
@@ -505,7 +413,7 @@ class TUI:
         error: str | None,
         metadata: Dict[str, Any],
         truncated: bool,
-        diff: str | None,
+        diff: Any,
         exit_code: int | None
     ):
         """Show completed tool output."""
@@ -523,27 +431,28 @@ class TUI:
             details=details,
             success=success,
             short_id=short_id,
-            metadata=metadata  # Store metadata
+            metadata=metadata,  # Store metadata
+            diff=diff
         )
-        tool.index = len(self.tool_outputs)
-        self.tool_outputs.append(tool)
-        self.tool_outputs_by_id[short_id] = tool
-        self.last_tool_index = tool.index
+        self.history.add(tool)
         
         # Clear the "Fetching..." line
-        print(f"\033[1A\033[2K", end="")  # Move up and clear line
+        self.print(f"\033[1A\033[2K", end="")  # Move up and clear line
         
         # Render collapsed by default - just show summary, no preview
         color = self.GREEN if success else self.RED
         status = "✓" if success else "✗"
+        cached = " (cached)" if metadata.get("result_cache_hit") else ""
         
         # Show tool name and summary with ID
-        print(f"  {self.DIM}└ {status} {summary}{self.RESET} {self.GRAY}(Type /e {short_id} to see output){self.RESET}")
+        self.print(f"  {self.DIM}└ {status} {summary}{cached}{self.RESET} {self.GRAY}(Type /e {short_id} to see output){self.RESET}")
     
     
     def _generate_summary(self, name: str, arguments: Dict[str, Any]) -> str:
         """Generate summary from arguments."""
-        if name == "web_search" and "query" in arguments:
+        if name == "web_search" and arguments.get("queries"):
+            return f"Searching for: {'; '.join(arguments['queries'])}"
+        elif name == "web_search" and "query" in arguments:
             return f"Searching for: {arguments['query']}"
         elif name == "read_file" and "path" in arguments:
             return f"Reading: {arguments['path']}"
@@ -561,9 +470,16 @@ class TUI:
             return f"Searching for pattern: {arguments['pattern']}"
         elif name == "todo":
             action = arguments.get("action", "")
-            if action == "add":
+            if action == "add" and arguments.get("items"):
+                return f"Adding {len(arguments['items'])} tasks"
+            elif action == "add":
                 content = arguments.get("content", "")
                 return f"Adding task: {content}"
+            elif action == "update" and arguments.get("items"):
+                return f"Updating {len(arguments['items'])} tasks"
+            elif action == "update":
+                task_id = arguments.get("id", "")
+                return f"Updating task: {task_id}"
             elif action == "list":
                 return "Listing tasks"
             elif action == "complete":
@@ -585,6 +501,8 @@ class TUI:
                 return f"Retrieving memory: {key}"
             elif action == "list":
                 return "Listing memory"
+            elif action == "search":
+                return f"Searching memory: {arguments.get('query') or arguments.get('key', '')}"
             elif action == "clear":
                 return "Clearing all memory"
             elif action == "delete":
@@ -636,12 +554,18 @@ class TUI:
         
         elif name == "todo":
             action = metadata.get('action', '')
-            if action == "add":
+            if action in ("add", "update", "complete") and 'count' in metadata:
+                verb = "Added" if action == "add" else "Updated"
+                return f"{verb} {metadata['count']} tasks"
+            elif action == "add":
                 content = metadata.get('content', '')
                 return f"Added: {content}"
             elif action == "complete":
                 content = metadata.get('content', '')
                 return f"Completed: {content}"
+            elif action == "update":
+                content = metadata.get('content', '')
+                return f"Updated: {content}"
             elif action == "remove":
                 content = metadata.get('content', '')
                 return f"Removed: {content}"
@@ -675,6 +599,9 @@ class TUI:
             elif action == "list":
                 count = metadata.get('count', 0)
                 return f"Found {count} memory entries"
+            elif action == "search":
+                count = metadata.get('count', 0)
+                return f"Found {count} matching memory entries"
             elif action == "clear":
                 count = metadata.get('count', 0)
                 return f"Cleared {count} memory entries"
@@ -0,0 +1,142 @@
+"""stdin as event-loop events on POSIX terminals.
+
+The interactive CLI used to poll stdin. A listener thread woke every
+100 ms in select() to look for Ctrl+O, and each prompt ran input() in an
+executor thread, with the listener stopped and restarted around it.
+TerminalInput registers stdin with loop.add_reader instead, so a key press
+or a finished line is a callback on the loop, and nothing wakes up while
+the terminal is idle.
+
+It switches the terminal between two modes:
+- hotkeys, while the agent works: cbreak mode without echo. Each key is
+  handed to on_key, which expands the last tool output on Ctrl+O and
+  ignores the rest.
+- line, at the prompt: the terminal's own canonical mode. The kernel does
+  the echo and line editing, and the reader fires once the line is done.
+
+Windows consoles have no selectable stdin; app.py keeps its msvcrt loop there.
+"""
+from __future__ import annotations
+import asyncio
+import codecs
+import os
+import sys
+from typing import Callable
+
+try:
+    import termios
+    import tty
+except ImportError:  # Windows
+    termios = None
+    tty = None
+
+_HOTKEYS, _LINE = "hotkeys", "line"
+
+
+class TerminalInput:
+    """Reads a terminal's stdin through the running event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, fd: int, on_key: Callable[[str], None]):
+        self.loop = loop
+        self.fd = fd
+        self.on_key = on_key
+        self._saved = termios.tcgetattr(fd)  # canonical settings, restored by stop()
+        self._mode: str | None = None
+        self._line: asyncio.Future[str | None] | None = None
+        self._buffer = ""
+        self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+
+    @classmethod
+    def create(cls, on_key: Callable[[str], None]) -> TerminalInput | None:
+        """For stdin on the running loop, or None where stdin cannot be a loop reader (Windows, not a terminal)."""
+        if termios is None or not sys.stdin.isatty():
+            return None
+        try:
+            return cls(asyncio.get_running_loop(), sys.stdin.fileno(), on_key)
+        except (OSError, ValueError, termios.error):
+            return None
+
+    def listen_for_hotkeys(self) -> None:
+        """Pass every key to on_key until read_line() or stop()."""
+        if self._mode == _HOTKEYS:
+            return
+        self._remove_reader()
+        tty.setcbreak(self.fd)  # one key at a time, no echo
+        self.loop.add_reader(self.fd, self._on_key_ready)
+        self._mode = _HOTKEYS
+
+    async def read_line(self) -> str | None:
+        """Wait for a line of input, without its newline.
+
+        Returns None if interrupt() is called first and raises EOFError on
+        Ctrl+D at an empty line. Hotkeys, if they were on, are back on
+        when it returns.
+        """
+        previous = self._mode
+        self._remove_reader()
+        termios.tcsetattr(self.fd, termios.TCSADRAIN, self._saved)
+        self._buffer = ""
+        self._line = self.loop.create_future()
+        self.loop.add_reader(self.fd, self._on_line_ready)
+        self._mode = _LINE
+        try:
+            return await self._line
+        finally:
+            self._line = None
+            self._remove_reader()
+            if previous == _HOTKEYS:
+                self.listen_for_hotkeys()
+
+    def interrupt(self) -> None:
+        """Make a pending read_line() return None; safe to call from a signal handler."""
+        self.loop.call_soon_threadsafe(self._resolve, None)
+
+    def stop(self) -> None:
+        """Stop reading and give the terminal back in canonical mode."""
+        self._remove_reader()
+        try:
+            termios.tcsetattr(self.fd, termios.TCSADRAIN, self._saved)
+        except termios.error:
+            pass
+
+    def _remove_reader(self) -> None:
+        if self._mode is not None:
+            self.loop.remove_reader(self.fd)
+            self._mode = None
+
+    def _read(self) -> bytes | None:
+        try:
+            return os.read(self.fd, 4096)
+        except BlockingIOError:
+            return None
+        except OSError:
+            return b""
+
+    def _on_key_ready(self) -> None:
+        data = self._read()
+        if data is None:
+            return
+        if not data:
+            self._remove_reader()  # stdin closed
+            return
+        for char in self._decoder.decode(data):
+            self.on_key(char)
+
+    def _on_line_ready(self) -> None:
+        data = self._read()
+        if data is None:
+            return
+        if not data:
+            if self._buffer:
+                self._resolve(self._buffer)
+            elif self._line is not None and not self._line.done():
+                self._line.set_exception(EOFError())
+            return
+        self._buffer += self._decoder.decode(data)
+        line, newline, _ = self._buffer.partition("\n")
+        if newline:
+            self._resolve(line)
+
+    def _resolve(self, line: str | None) -> None:
+        if self._line is not None and not self._line.done():
+            self._line.set_result(line)
@@ -0,0 +1,176 @@
+"""Size-bounded history of tool outputs for the TUI.
+
+Every tool call stays listed for the whole session so `/e <id>` can show
+it, but only the newest outputs keep their details (and diffs, which hold
+the old and new file contents) in memory: at most max_outputs of them and
+at most max_bytes together. Older ones are compressed into an anonymous
+temporary file, which the OS removes when the process exits, and are read
+back, without going into memory again, when they are expanded. Expanding
+an output that is still in memory renders its diff, which is then counted
+too (and may push older outputs out to disk).
+"""
+from __future__ import annotations
+import json
+import sys
+import tempfile
+import threading
+import zlib
+from collections import deque
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator
+from codentis.tools.base import FileDiff, MultiFileDiff, render_diff
+
+DEFAULT_MAX_OUTPUTS = 50
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+_DROPPED = "(output no longer available: it could not be written to the spill file)"
+
+
+class ToolOutput:
+    """Represents a tool call output."""
+
+    def __init__(self, call_id: str, name: str, summary: str, details: str, success: bool = True, short_id: str = "", metadata: Dict[str, Any] = None, diff: Any = None):
+        self.call_id = call_id
+        self.name = name
+        self.summary = summary
+        self.details = details  # None once spilled to disk
+        self.success = success
+        self.expanded = False
+        self.index = 0  # Position in the list
+        self.short_id = short_id  # Short numeric ID for easy reference
+        self.metadata = metadata or {}  # Store metadata
+        self.diff = diff  # FileDiff/MultiFileDiff, rendered only when expanded
+        self.size = 0  # bytes held by details and diff while in memory
+        self.spill: tuple[int, int] | None = None  # (offset, length) in the spill file
+
+
+class ToolOutputHistory:
+    """Tool outputs of a session, newest ones in memory and the rest on disk.
+
+    Thread-safe: outputs are added from the event loop and expanded from
+    the Ctrl+O listener thread.
+    """
+
+    def __init__(self, max_outputs: int = DEFAULT_MAX_OUTPUTS, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_outputs = max(1, max_outputs)
+        self.max_bytes = max_bytes
+        self.memory_bytes = 0
+        self.disk_bytes = 0
+
+        self._lock = threading.Lock()
+        self._outputs: list[ToolOutput] = []
+        self._by_id: dict[str, ToolOutput] = {}
+        self._resident: deque[ToolOutput] = deque()  # details in memory, oldest first
+        self._file: IO[bytes] | None = None
+
+    def add(self, tool: ToolOutput) -> None:
+        with self._lock:
+            tool.index = len(self._outputs)
+            tool.size = _footprint(tool.details, tool.diff)
+            self._outputs.append(tool)
+            self._by_id[tool.short_id] = tool
+            self._resident.append(tool)
+            self.memory_bytes += tool.size
+            self._shrink()
+
+    def get(self, short_id: str) -> ToolOutput | None:
+        return self._by_id.get(short_id)
+
+    def last(self) -> ToolOutput | None:
+        return self._outputs[-1] if self._outputs else None
+
+    def __iter__(self) -> Iterator[ToolOutput]:
+        return iter(list(self._outputs))
+
+    def __len__(self) -> int:
+        return len(self._outputs)
+
+    def contents(self, tool: ToolOutput) -> tuple[str, str | None]:
+        """details and rendered diff of tool, read back from the spill file if it has been spilled."""
+        with self._lock:
+            if tool.spill is None:
+                details, diff = tool.details, tool.diff
+            else:
+                offset, length = tool.spill
+                self._file.seek(offset)
+                data = json.loads(zlib.decompress(self._file.read(length)))
+                # Rendered from a copy that is dropped afterwards: nothing to account for
+                return data["details"], render_diff(_load_diff(data["diff"]))
+        if details is None:
+            return _DROPPED, None
+        # Rendered outside the lock; the diff caches it, so it now takes more memory
+        diff_text = render_diff(diff)
+        with self._lock:
+            if tool.spill is None and tool.diff is diff:
+                size = _footprint(tool.details, diff)
+                self.memory_bytes += size - tool.size
+                tool.size = size
+                self._shrink()
+        return details, diff_text
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "outputs": len(self._outputs),
+                "in_memory": len(self._resident),
+                "spilled": len(self._outputs) - len(self._resident),
+                "memory_bytes": self.memory_bytes,
+                "disk_bytes": self.disk_bytes,
+            }
+
+    def _shrink(self) -> None:
+        # Caller holds the lock. The newest output always stays in memory, however large
+        while len(self._resident) > 1 and (len(self._resident) > self.max_outputs or self.memory_bytes > self.max_bytes):
+            self._spill(self._resident.popleft())
+
+    def _spill(self, tool: ToolOutput) -> None:
+        # Caller holds the lock
+        payload = json.dumps({"details": tool.details, "diff": _dump_diff(tool.diff)}).encode("utf-8")
+        blob = zlib.compress(payload, 1)  # fastest level: this runs on the event loop
+        try:
+            if self._file is None:
+                self._file = tempfile.TemporaryFile(prefix="codentis-tool-outputs-")
+            offset = self._file.seek(0, 2)
+            self._file.write(blob)
+            tool.spill = (offset, len(blob))
+            self.disk_bytes += len(blob)
+        except OSError:
+            pass  # contents() reports it as dropped; memory stays bounded either way
+        tool.details = None
+        tool.diff = None
+        self.memory_bytes -= tool.size
+        tool.size = 0
+
+
+def _footprint(details: str | None, diff: Any) -> int:
+    size = sys.getsizeof(details) if details is not None else 0
+    if isinstance(diff, MultiFileDiff):
+        return size + sum(_footprint(None, file_diff) for file_diff in diff.diffs)
+    if isinstance(diff, FileDiff):
+        size += sys.getsizeof(diff.old_content) + sys.getsizeof(diff.new_content)
+        size += sys.getsizeof(diff.rendered) if diff.rendered is not None else 0
+    elif isinstance(diff, str):
+        size += sys.getsizeof(diff)
+    return size
+
+
+def _dump_diff(diff: Any) -> Any:
+    if isinstance(diff, MultiFileDiff):
+        return {"files": [_dump_diff(file_diff) for file_diff in diff.diffs]}
+    if isinstance(diff, FileDiff):
+        return {
+            "path": str(diff.path),
+            "old_content": diff.old_content,
+            "new_content": diff.new_content,
+            "is_new_file": diff.is_new_file,
+            "is_deletion": diff.is_deletion,
+        }
+    return diff  # None or an already rendered string
+
+
+def _load_diff(data: Any) -> Any:
+    if isinstance(data, dict):
+        if "files" in data:
+            return MultiFileDiff([_load_diff(file_diff) for file_diff in data["files"]])
+        return FileDiff(Path(data["path"]), data["old_content"], data["new_content"], data["is_new_file"], data["is_deletion"])
+    return data
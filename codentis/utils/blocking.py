@@ -0,0 +1,49 @@
+"""Shared thread pool for blocking file system work.
+
+Builtin tools read files, walk trees and write through SQLite with plain
+blocking calls. Run directly in `async def execute` those calls stall the
+event loop, and with it streaming output, the spinner and every concurrent
+tool or sub-agent. Tools hand that work to run_blocking instead, which uses
+one bounded pool for the whole process so a wide sub-agent fan-out cannot
+start an unbounded number of threads.
+"""
+from __future__ import annotations
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+MAX_WORKERS = min(8, (os.cpu_count() or 1) + 4)
+
+_executor: ThreadPoolExecutor | None = None
+_lock = threading.Lock()
+
+
+def get_blocking_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="codentis-io")
+        return _executor
+
+
+async def run_blocking(func: Callable[..., T], /, *args, **kwargs) -> T:
+    """Run func(*args, **kwargs) in the shared pool and await its result.
+
+    Cancelling the awaiting task does not stop func; it runs to completion
+    in its thread and the result is dropped.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_blocking_executor(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_blocking_executor() -> None:
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,269 @@
+"""Line diff engine used for tool result diffs.
+
+Lines are interned to integers once, the common prefix/suffix is trimmed, and
+the remaining region is split on lines that are unique on both sides
+(patience anchors). Only the small gaps between anchors are handed to a
+bounded Myers search, so scattered edits in large files stay close to linear.
+"""
+from bisect import bisect_left
+from collections import Counter
+from typing import Iterator
+
+# Budget for a single Myers search between two anchors, in edits and in
+# (edits x gap length). Gaps over budget are emitted as a plain replace block.
+MAX_GAP_EDITS = 2000
+MAX_GAP_WORK = 2_000_000
+# Above these sizes the unified diff is replaced by a one-line summary.
+MAX_INPUT_LINES = 200_000
+MAX_OUTPUT_LINES = 5_000
+
+Opcode = tuple[str, int, int, int, int]
+
+
+def intern_lines(old: list[str], new: list[str]) -> tuple[list[int], list[int]]:
+    table: dict[str, int] = {}
+    a = [table.setdefault(line, len(table)) for line in old]
+    b = [table.setdefault(line, len(table)) for line in new]
+    return a, b
+
+
+def _myers(a: list[int], b: list[int], max_edits: int) -> list[tuple[int, int]] | None:
+    """Return matching (i, j) pairs of a shortest edit script, or None over budget."""
+    n, m = len(a), len(b)
+    max_d = min(n + m, max_edits)
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)
+    trace: list[tuple[list[int], int]] = []
+
+    for d in range(max_d + 1):
+        base = offset - d - 1
+        trace.append((v[base:offset + d + 2], base))
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, offset, n, m)
+    return None
+
+
+def _backtrack(trace: list[tuple[list[int], int]], offset: int, x: int, y: int) -> list[tuple[int, int]]:
+    matches: list[tuple[int, int]] = []
+    for d in range(len(trace) - 1, -1, -1):
+        if d == 0:
+            while x > 0 and y > 0:
+                x -= 1
+                y -= 1
+                matches.append((x, y))
+            break
+
+        snapshot, base = trace[d]
+        k = x - y
+        if k == -d or (k != d and snapshot[offset + k - 1 - base] < snapshot[offset + k + 1 - base]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = snapshot[offset + prev_k - base]
+        prev_y = prev_x - prev_k
+
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            matches.append((x, y))
+        x, y = prev_x, prev_y
+
+    matches.reverse()
+    return matches
+
+
+def _unique_anchors(a: list[int], alo: int, ahi: int, b: list[int], blo: int, bhi: int) -> list[tuple[int, int]]:
+    """Longest increasing run of lines that occur exactly once on both sides."""
+    count_a = Counter(a[alo:ahi])
+    count_b = Counter(b[blo:bhi])
+    pos_b = {b[j]: j for j in range(blo, bhi) if count_b[b[j]] == 1}
+    candidates = [
+        (i, pos_b[a[i]])
+        for i in range(alo, ahi)
+        if count_a[a[i]] == 1 and a[i] in pos_b
+    ]
+    if not candidates:
+        return []
+
+    # Patience sorting LIS over the b positions
+    tails: list[int] = []
+    tail_idx: list[int] = []
+    prev: list[int] = [-1] * len(candidates)
+    for idx, (_, j) in enumerate(candidates):
+        pos = bisect_left(tails, j)
+        if pos > 0:
+            prev[idx] = tail_idx[pos - 1]
+        if pos == len(tails):
+            tails.append(j)
+            tail_idx.append(idx)
+        else:
+            tails[pos] = j
+            tail_idx[pos] = idx
+
+    result = []
+    idx = tail_idx[-1] if tail_idx else -1
+    while idx >= 0:
+        result.append(candidates[idx])
+        idx = prev[idx]
+    result.reverse()
+    return result
+
+
+def _match_gap(a: list[int], alo: int, ahi: int, b: list[int], blo: int, bhi: int, out: list[tuple[int, int]]) -> None:
+    if alo >= ahi or blo >= bhi:
+        return
+    size = ahi - alo + bhi - blo
+    budget = min(MAX_GAP_EDITS, MAX_GAP_WORK // size)
+    if size > budget:
+        # Every line that is not shared as a multiset costs one edit, so this
+        # is a cheap lower bound on the edit distance of the gap.
+        count_a = Counter(a[alo:ahi])
+        count_b = Counter(b[blo:bhi])
+        lower_bound = sum((count_a - count_b).values()) + sum((count_b - count_a).values())
+        if lower_bound > budget:
+            return
+    pairs = _myers(a[alo:ahi], b[blo:bhi], budget)
+    if pairs is None:
+        return  # treat the whole gap as a replace block
+    out.extend((alo + i, blo + j) for i, j in pairs)
+
+
+def matching_lines(a: list[int], b: list[int]) -> list[tuple[int, int]]:
+    """Return sorted (i, j) pairs where a[i] == b[j] is kept by the diff."""
+    n, m = len(a), len(b)
+    matches: list[tuple[int, int]] = []
+
+    prefix = 0
+    while prefix < n and prefix < m and a[prefix] == b[prefix]:
+        matches.append((prefix, prefix))
+        prefix += 1
+
+    suffix = 0
+    while suffix < n - prefix and suffix < m - prefix and a[n - 1 - suffix] == b[m - 1 - suffix]:
+        suffix += 1
+
+    alo, ahi, blo, bhi = prefix, n - suffix, prefix, m - suffix
+    for i, j in _unique_anchors(a, alo, ahi, b, blo, bhi):
+        _match_gap(a, alo, i, b, blo, j, matches)
+        matches.append((i, j))
+        alo, blo = i + 1, j + 1
+    _match_gap(a, alo, ahi, b, blo, bhi, matches)
+
+    matches.extend((n - suffix + s, m - suffix + s) for s in range(suffix))
+    return matches
+
+
+def get_opcodes(a: list[int], b: list[int]) -> list[Opcode]:
+    """Opcodes in the same format as difflib.SequenceMatcher.get_opcodes."""
+    opcodes: list[Opcode] = []
+    i = j = 0
+    for mi, mj in matching_lines(a, b) + [(len(a), len(b))]:
+        if i < mi and j < mj:
+            opcodes.append(("replace", i, mi, j, mj))
+        elif i < mi:
+            opcodes.append(("delete", i, mi, j, j))
+        elif j < mj:
+            opcodes.append(("insert", i, i, j, mj))
+        if mi < len(a):
+            if opcodes and opcodes[-1][0] == "equal":
+                tag, i1, _, j1, _ = opcodes[-1]
+                opcodes[-1] = ("equal", i1, mi + 1, j1, mj + 1)
+            else:
+                opcodes.append(("equal", mi, mi + 1, mj, mj + 1))
+        i, j = mi + 1, mj + 1
+    if not opcodes:
+        opcodes.append(("equal", 0, 0, 0, 0))
+    return opcodes
+
+
+def group_opcodes(opcodes: list[Opcode], n: int = 3) -> Iterator[list[Opcode]]:
+    """Split opcodes into hunks with up to n lines of context (as difflib does)."""
+    codes = list(opcodes)
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - n), i2, max(j1, j2 - n), j2
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)
+
+    nn = n + n
+    group: list[Opcode] = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == "equal" and i2 - i1 > nn:
+            group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def _format_range(start: int, stop: int) -> str:
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return str(beginning)
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def change_counts(old_lines: list[str], new_lines: list[str]) -> tuple[int, int]:
+    """Cheap (added, removed) estimate from line multisets, without diffing."""
+    old_counts = Counter(old_lines)
+    new_counts = Counter(new_lines)
+    added = sum((new_counts - old_counts).values())
+    removed = sum((old_counts - new_counts).values())
+    return added, removed
+
+
+def diff_summary(path: str, old_lines: list[str], new_lines: list[str]) -> str:
+    added, removed = change_counts(old_lines, new_lines)
+    return (
+        f"--- {path}\n+++ {path}\n"
+        f"(diff too large to display: {len(old_lines)} -> {len(new_lines)} lines, "
+        f"~+{added} -{removed})\n"
+    )
+
+
+def unified_diff(old_lines: list[str], new_lines: list[str], fromfile: str, tofile: str, n: int = 3) -> str:
+    """Unified diff of two lists of newline-terminated lines.
+
+    Returns "" when there are no changes and a short summary when either the
+    input or the rendered diff would exceed the size limits.
+    """
+    if len(old_lines) + len(new_lines) > MAX_INPUT_LINES:
+        return diff_summary(tofile, old_lines, new_lines)
+
+    a, b = intern_lines(old_lines, new_lines)
+    opcodes = get_opcodes(a, b)
+
+    out = [f"--- {fromfile}\n", f"+++ {tofile}\n"]
+    for group in group_opcodes(opcodes, n):
+        first, last = group[0], group[-1]
+        out.append(f"@@ -{_format_range(first[1], last[2])} +{_format_range(first[3], last[4])} @@\n")
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                out.extend(" " + line for line in old_lines[i1:i2])
+                continue
+            if tag in ("replace", "delete"):
+                out.extend("-" + line for line in old_lines[i1:i2])
+            if tag in ("replace", "insert"):
+                out.extend("+" + line for line in new_lines[j1:j2])
+        if len(out) > MAX_OUTPUT_LINES:
+            return diff_summary(tofile, old_lines, new_lines)
+
+    if len(out) == 2:
+        return ""
+    return "".join(out)
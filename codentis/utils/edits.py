@@ -0,0 +1,195 @@
+"""Multi-edit planning for apply_patch.
+
+All anchors (old strings) of a file are located against the original
+content, checked for uniqueness and overlaps, and the result is built with a
+single splice instead of one full-string replace per edit.
+
+Anchors are matched on three views, in order: the exact text, a line-ending
+normalized view (CRLF vs LF), and an indentation-insensitive view that
+compares whole lines with surrounding whitespace stripped.
+"""
+from dataclasses import dataclass, field
+
+MAX_REPORTED_MATCHES = 5
+
+
+@dataclass
+class EditSpan:
+    index: int
+    start: int
+    end: int
+    replacement: str
+    view: str = "exact"
+
+
+@dataclass
+class EditPlan:
+    spans: list[EditSpan] = field(default_factory=list)
+    errors: dict[int, str] = field(default_factory=dict)
+    not_found: list[int] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors and not self.not_found
+
+
+def _find_all(content: str, needle: str, limit: int = MAX_REPORTED_MATCHES) -> list[int]:
+    positions = []
+    pos = content.find(needle)
+    while pos != -1 and len(positions) < limit:
+        positions.append(pos)
+        pos = content.find(needle, pos + 1)
+    return positions
+
+
+def line_number(content: str, pos: int) -> int:
+    return content.count("\n", 0, pos) + 1
+
+
+class _LineIndex:
+    """Lines of a file with offsets and stripped forms, built on first use."""
+
+    def __init__(self, content: str) -> None:
+        self.lines = content.split("\n")
+        self.starts: list[int] = []
+        offset = 0
+        for line in self.lines:
+            self.starts.append(offset)
+            offset += len(line) + 1
+        self.stripped = [line.strip() for line in self.lines]
+        self.by_text: dict[str, list[int]] = {}
+        for i, text in enumerate(self.stripped):
+            self.by_text.setdefault(text, []).append(i)
+
+
+def _leading_whitespace(line: str) -> str:
+    return line[:len(line) - len(line.lstrip(" \t"))]
+
+
+def _match_indent(content: str, index: _LineIndex, old: str, new: str) -> list[tuple[int, int, str]]:
+    old_lines = old.split("\n")
+    trailing_newline = len(old_lines) > 1 and old_lines[-1] == ""
+    if trailing_newline:
+        old_lines.pop()
+    wanted = [line.strip() for line in old_lines]
+    if not any(wanted):
+        return []
+
+    matches = []
+    count = len(wanted)
+    for i in index.by_text.get(wanted[0], []):
+        if index.stripped[i:i + count] != wanted:
+            continue
+
+        last = i + count - 1
+        newline = "\r\n" if index.lines[i].endswith("\r") else "\n"
+        start = index.starts[i]
+        if trailing_newline:
+            end = index.starts[last + 1] if last + 1 < len(index.starts) else len(content)
+        else:
+            end = index.starts[last] + len(index.lines[last].rstrip("\r"))
+
+        file_indent = _leading_whitespace(index.lines[i])
+        old_indent = _leading_whitespace(old_lines[0])
+        new_lines = new.replace("\r\n", "\n").split("\n")
+        if trailing_newline and new_lines and new_lines[-1] == "":
+            new_lines.pop()
+        reindented = []
+        for line in new_lines:
+            if not line.strip():
+                reindented.append("")
+            elif line.startswith(old_indent):
+                reindented.append(file_indent + line[len(old_indent):])
+            else:
+                reindented.append(line)
+        replacement = newline.join(reindented)
+        if trailing_newline:
+            replacement += newline
+
+        matches.append((start, end, replacement))
+        if len(matches) >= MAX_REPORTED_MATCHES:
+            break
+    return matches
+
+
+def plan_edits(content: str, edits: list[tuple[int, str, str]]) -> EditPlan:
+    """Locate every (index, old, new) edit in content.
+
+    Edits that cannot be found go to plan.not_found, ambiguous or overlapping
+    edits to plan.errors; otherwise plan.spans holds one span per edit.
+    """
+    plan = EditPlan()
+    line_index: _LineIndex | None = None
+    uses_crlf = "\r\n" in content
+
+    for index, old, new in edits:
+        if not old:
+            plan.errors[index] = "old_string must not be empty"
+            continue
+
+        positions = _find_all(content, old)
+        if positions:
+            candidates = [(pos, pos + len(old), new) for pos in positions]
+            view = "exact"
+        else:
+            candidates = []
+            if uses_crlf and "\r\n" not in old and "\n" in old:
+                crlf_old = old.replace("\n", "\r\n")
+                crlf_new = new.replace("\r\n", "\n").replace("\n", "\r\n")
+                candidates = [(pos, pos + len(crlf_old), crlf_new) for pos in _find_all(content, crlf_old)]
+            elif not uses_crlf and "\r\n" in old:
+                lf_old = old.replace("\r\n", "\n")
+                lf_new = new.replace("\r\n", "\n")
+                candidates = [(pos, pos + len(lf_old), lf_new) for pos in _find_all(content, lf_old)]
+            view = "crlf"
+
+            if not candidates:
+                if line_index is None:
+                    line_index = _LineIndex(content)
+                candidates = _match_indent(content, line_index, old, new)
+                view = "indent"
+
+        if not candidates:
+            plan.not_found.append(index)
+            continue
+
+        if len(candidates) > 1:
+            lines = ", ".join(str(line_number(content, start)) for start, _, _ in candidates)
+            more = "+" if len(candidates) >= MAX_REPORTED_MATCHES else ""
+            match_kind = "matches" if view == "exact" else f"matches ({view}-normalized)"
+            plan.errors[index] = (
+                f"Found {len(candidates)}{more} {match_kind} for old_string at lines {lines}. "
+                f"Include more context lines to make it unique."
+            )
+            continue
+
+        start, end, replacement = candidates[0]
+        plan.spans.append(EditSpan(index=index, start=start, end=end, replacement=replacement, view=view))
+
+    plan.spans.sort(key=lambda span: (span.start, span.end))
+    # Compared with the span reaching furthest so far, not just the previous
+    # one: a long span can overlap several that follow it
+    furthest: EditSpan | None = None
+    for current in plan.spans:
+        if furthest is not None and current.start < furthest.end:
+            plan.errors[current.index] = (
+                f"old_string overlaps the text matched by edit {furthest.index + 1} "
+                f"(line {line_number(content, current.start)}). Merge them into a single edit."
+            )
+        if furthest is None or current.end > furthest.end:
+            furthest = current
+    if plan.errors:
+        plan.spans = [span for span in plan.spans if span.index not in plan.errors]
+    return plan
+
+
+def apply_spans(content: str, spans: list[EditSpan]) -> str:
+    """Build the edited content in one pass over non-overlapping sorted spans."""
+    parts = []
+    cursor = 0
+    for span in spans:
+        parts.append(content[cursor:span.start])
+        parts.append(span.replacement)
+        cursor = span.end
+    parts.append(content[cursor:])
+    return "".join(parts)
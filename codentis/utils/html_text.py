@@ -0,0 +1,353 @@
+"""Streaming HTML to markdown-ish text extraction for web_fetch.
+
+The page is fed to a tokenizer (lxml's feed parser when it is installed,
+html.parser otherwise) in small slices while it downloads. No tree is built:
+start/end/data events are written straight to the output, navigation and
+other page chrome is skipped, and parsing stops as soon as the character
+budget is used up, so the rest of a large page is never read or decoded.
+
+Headings become `#` lines, <pre> blocks become fenced code, inline <code>
+is wrapped in backticks and links are written as [text](url).
+"""
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+FEED_SLICE_CHARS = 8192
+
+SKIP_TAGS = frozenset({
+    "script", "style", "noscript", "template", "svg", "math", "canvas",
+    "nav", "footer", "aside", "form", "button", "select", "iframe", "dialog",
+})
+SKIP_ROLES = frozenset({"navigation", "banner", "contentinfo", "complementary", "search"})
+SKIP_CLASSES = frozenset({
+    "sidebar", "breadcrumb", "breadcrumbs", "navbar", "skip-link",
+    "cookie-banner", "cookie-consent", "site-header", "site-footer",
+})
+VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "source", "track", "wbr",
+})
+PARAGRAPH_TAGS = frozenset({
+    "p", "article", "section", "main", "table", "ul", "ol", "dl",
+    "blockquote", "figure", "details",
+})
+LINE_TAGS = frozenset({"div", "tr", "dt", "dd", "figcaption", "summary", "caption"})
+HEADING_LEVELS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+
+_WHITESPACE = re.compile(r"\s+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_TRAILING_SPACES = re.compile(r"[ \t]+\n")
+
+
+def _code_language(attrs: dict[str, str | None]) -> str:
+    for token in (attrs.get("class") or "").split():
+        for prefix in ("language-", "lang-"):
+            if token.startswith(prefix):
+                return token[len(prefix):]
+    return ""
+
+
+class _MarkdownWriter:
+    """Turns start/end/data events into text; implements lxml's target interface."""
+
+    def __init__(self, max_chars: int, base_url: str | None) -> None:
+        self.max_chars = max_chars
+        self.base_url = base_url
+        self.parts: list[str] = []
+        self.size = 0
+        self.done = False
+        self.title_parts: list[str] | None = None
+        self.title: str | None = None
+
+        self._skip_tag: str | None = None
+        self._skip_depth = 0
+        self._content_depth = 0  # open <article>/<main> elements
+        self._pre_depth = 0
+        self._fence_index = -1
+        self._links: list[tuple[str | None, int, int]] = []
+        self._lists: list[list[int]] = []  # [ordered, next number]
+        self._newlines = 2  # trailing newlines already written; start of output counts as a block
+        self._pending_space = False
+        self._glue = False  # just opened a link or code span, no space before the next text
+
+    # output helpers
+
+    def _emit(self, text: str) -> None:
+        if self.done or not text:
+            return
+        remaining = self.max_chars - self.size
+        if len(text) >= remaining:
+            text = text[:remaining]
+            self.done = True
+        self.parts.append(text)
+        self.size += len(text)
+        stripped = text.rstrip("\n")
+        self._newlines = len(text) - len(stripped) if stripped else self._newlines + len(text)
+
+    def _block(self, newlines: int) -> None:
+        self._pending_space = False
+        if self._newlines < newlines:
+            self._emit("\n" * (newlines - self._newlines))
+
+    def _inline(self, text: str, opening: bool = False) -> None:
+        if self._pending_space and not self._newlines and not self._glue:
+            self._emit(" ")
+        self._pending_space = False
+        self._glue = opening
+        self._emit(text)
+
+    # target interface
+
+    def start(self, tag: str, attrs) -> None:
+        if self.done:
+            return
+        tag = tag.lower() if isinstance(tag, str) else ""
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth += 1
+            return
+        if self._is_boilerplate(tag, attrs):
+            if tag not in VOID_TAGS:
+                self._skip_tag = tag
+                self._skip_depth = 1
+            return
+
+        if tag == "title" and self.title is None:
+            self.title_parts = []
+        elif tag in ("article", "main"):
+            self._content_depth += 1
+            self._block(2)
+        elif tag in HEADING_LEVELS:
+            self._block(2)
+            self._emit("#" * HEADING_LEVELS[tag] + " ")
+        elif tag == "pre":
+            self._block(2)
+            language = _code_language(attrs)
+            self._emit(f"```{language}\n")
+            self._fence_index = len(self.parts) - 1 if not language else -1
+            self._pre_depth += 1
+        elif tag == "code":
+            if self._pre_depth:
+                language = _code_language(attrs)
+                if language and self._fence_index == len(self.parts) - 1:
+                    self.parts[self._fence_index] = f"```{language}\n"
+                    self.size += len(language)
+            else:
+                self._inline("`", opening=True)
+        elif tag == "a":
+            href = attrs.get("href")
+            if href and not href.startswith(("#", "javascript:")):
+                href = urljoin(self.base_url, href) if self.base_url else href
+            else:
+                href = None
+            self._inline("[" if href else "", opening=True)
+            self._links.append((href, len(self.parts) - 1, self.size))
+        elif tag == "li":
+            self._block(1)
+            indent = "  " * max(0, len(self._lists) - 1)
+            if self._lists and self._lists[-1][0]:
+                marker = f"{self._lists[-1][1]}. "
+                self._lists[-1][1] += 1
+            else:
+                marker = "- "
+            self._emit(indent + marker)
+        elif tag in ("ul", "ol"):
+            self._block(1 if self._lists else 2)
+            self._lists.append([tag == "ol", 1])
+        elif tag in PARAGRAPH_TAGS:
+            self._block(2)
+        elif tag in LINE_TAGS:
+            self._block(1)
+        elif tag == "br":
+            self._pending_space = False
+            self._emit("\n")
+        elif tag == "hr":
+            self._block(2)
+            self._emit("---")
+            self._block(2)
+        elif tag in ("td", "th"):
+            self._pending_space = True
+
+    def end(self, tag: str) -> None:
+        if self.done:
+            return
+        tag = tag.lower() if isinstance(tag, str) else ""
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth -= 1
+                if self._skip_depth == 0:
+                    self._skip_tag = None
+            return
+        if tag in VOID_TAGS:
+            return
+
+        if tag == "title" and self.title_parts is not None:
+            self.title = " ".join("".join(self.title_parts).split()) or None
+            self.title_parts = None
+        elif tag in ("article", "main"):
+            self._content_depth = max(0, self._content_depth - 1)
+            self._block(2)
+        elif tag in HEADING_LEVELS:
+            self._block(2)
+        elif tag == "pre" and self._pre_depth:
+            self._pre_depth -= 1
+            if self._newlines == 0:
+                self._emit("\n")
+            self._emit("```")
+            self._block(2)
+        elif tag == "code" and not self._pre_depth:
+            self._emit("`")
+        elif tag == "a" and self._links:
+            href, index, size = self._links.pop()
+            if href:
+                if self.size > size:
+                    self._emit(f"]({href})")
+                else:
+                    self.parts[index] = ""  # link without text
+        elif tag in ("ul", "ol"):
+            if self._lists:
+                self._lists.pop()
+            self._block(1 if self._lists else 2)
+        elif tag in PARAGRAPH_TAGS:
+            self._block(2)
+        elif tag in LINE_TAGS or tag == "li":
+            self._block(1)
+
+    def data(self, text: str) -> None:
+        if self.done or self._skip_tag is not None or not text:
+            return
+        if self.title_parts is not None:
+            self.title_parts.append(text)
+            return
+        if self._pre_depth:
+            self._emit(text)
+            return
+
+        collapsed = _WHITESPACE.sub(" ", text)
+        if collapsed[0] == " ":
+            self._pending_space = True
+        collapsed = collapsed.strip()
+        if collapsed:
+            self._inline(collapsed)
+            self._pending_space = text[-1].isspace()
+
+    def close(self) -> None:
+        return None
+
+    def _is_boilerplate(self, tag: str, attrs) -> bool:
+        if tag in SKIP_TAGS:
+            return True
+        if tag == "header" and not self._content_depth:
+            return True  # site banner; headers inside an article are kept
+        if "hidden" in attrs or attrs.get("aria-hidden") == "true":
+            return True
+        if attrs.get("role") in SKIP_ROLES:
+            return True
+        classes = (attrs.get("class") or "").split()
+        return any(name in SKIP_CLASSES for name in classes) or attrs.get("id") in SKIP_CLASSES
+
+
+class _StdlibParser(HTMLParser):
+    def __init__(self, writer: _MarkdownWriter) -> None:
+        super().__init__(convert_charrefs=True)
+        self.writer = writer
+
+    def handle_starttag(self, tag, attrs):
+        self.writer.start(tag, dict(attrs))
+
+    def handle_endtag(self, tag):
+        self.writer.end(tag)
+
+    def handle_data(self, data):
+        self.writer.data(data)
+
+
+class HtmlTextExtractor:
+    """Incremental extractor; feed() text as it arrives, then call text().
+
+    start(content_type) resets the extractor. Non-HTML content types are
+    passed through unchanged (still subject to the budget).
+    """
+
+    def __init__(self, max_chars: int, base_url: str | None = None, use_lxml: bool | None = None) -> None:
+        self.max_chars = max_chars
+        self.base_url = base_url
+        self.use_lxml = etree is not None if use_lxml is None else use_lxml and etree is not None
+        self.start("")
+
+    def start(self, content_type: str) -> None:
+        content_type = content_type.lower()
+        if not content_type:
+            self.is_html: bool | None = None  # sniffed from the first chunk
+        else:
+            self.is_html = "html" in content_type or "xml" in content_type
+        self._writer = _MarkdownWriter(self.max_chars, self.base_url)
+        self._parser = None
+        self._plain: list[str] = []
+        self._plain_size = 0
+        self.truncated = False
+
+    @property
+    def done(self) -> bool:
+        return self.truncated
+
+    @property
+    def title(self) -> str | None:
+        return self._writer.title if self.is_html else None
+
+    def _make_parser(self):
+        if self.use_lxml:
+            return etree.HTMLParser(target=self._writer, recover=True, no_network=True)
+        return _StdlibParser(self._writer)
+
+    def feed(self, text: str) -> None:
+        if self.truncated or not text:
+            return
+        if self.is_html is None:
+            self.is_html = text.lstrip()[:1] == "<"
+
+        if not self.is_html:
+            remaining = self.max_chars - self._plain_size
+            if len(text) >= remaining:
+                text = text[:remaining]
+                self.truncated = True
+            self._plain.append(text)
+            self._plain_size += len(text)
+            return
+
+        if self._parser is None:
+            self._parser = self._make_parser()
+        for pos in range(0, len(text), FEED_SLICE_CHARS):
+            self._parser.feed(text[pos:pos + FEED_SLICE_CHARS])
+            if self._writer.done:
+                self.truncated = True
+                return
+
+    def text(self) -> str:
+        if not self.is_html:
+            return "".join(self._plain)
+        if self._parser is not None and not self.truncated:
+            try:
+                self._parser.close()
+            except Exception:
+                pass  # lxml raises on documents it could not parse at all
+            self._parser = None
+        writer = self._writer
+        if writer._pre_depth and writer.done:
+            writer.parts.append("\n```")
+        text = "".join(writer.parts)
+        text = _TRAILING_SPACES.sub("\n", text)
+        return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+def html_to_text(html: str, max_chars: int, base_url: str | None = None) -> str:
+    extractor = HtmlTextExtractor(max_chars, base_url)
+    extractor.start("text/html")
+    extractor.feed(html)
+    return extractor.text()
@@ -1,6 +1,7 @@
-import tiktoken
-
 def get_tokenizer(model: str):
+    # Imported here so startup does not pay for tiktoken; see utils/warmup.py
+    import tiktoken
+
     try:
         encoding = tiktoken.encoding_for_model(model)
         return encoding.encode
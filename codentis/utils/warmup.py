@@ -0,0 +1,34 @@
+"""Background loading of heavy dependencies.
+
+The CLI starts without openai or a tiktoken encoding, which together cost
+more than half a second to load. A daemon thread loads them while the
+workspace trust prompt, the welcome screen and the first prompt are on
+screen, so neither startup nor the first request waits for them. If the
+first request comes before the thread is done, its import simply waits
+for the thread to finish loading the module.
+"""
+from __future__ import annotations
+import threading
+
+DEFAULT_TOKENIZER_MODEL = "gpt-4o"
+
+_thread: threading.Thread | None = None
+
+
+def _warm(model: str) -> None:
+    try:
+        import openai  # noqa: F401
+        from codentis.utils.text import get_tokenizer
+        get_tokenizer(model)
+    except Exception:
+        # Failures surface, with a proper message, when the module is first really used
+        pass
+
+
+def start_warmup(model: str = DEFAULT_TOKENIZER_MODEL) -> None:
+    """Start loading openai and the tokenizer for model in the background (once per process)."""
+    global _thread
+    if _thread is not None:
+        return
+    _thread = threading.Thread(target=_warm, args=(model,), name="codentis-warmup", daemon=True)
+    _thread.start()
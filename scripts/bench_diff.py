@@ -0,0 +1,127 @@
+"""Benchmark for the line diff engine against difflib.
+
+Builds a synthetic source file, scatters edits through it (changed,
+inserted and deleted lines), and times codentis.utils.diff.unified_diff()
+against difflib.unified_diff() on the same input, best of several runs.
+It also checks that applying the codentis diff to the old file gives the
+new one, and says whether the output is identical to difflib's.
+
+    python scripts/bench_diff.py                     # 10k lines, 50 edits
+    python scripts/bench_diff.py --lines 50000 --edits 500
+    python scripts/bench_diff.py --old before.py --new after.py
+"""
+import argparse
+import difflib
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from codentis.utils.diff import unified_diff  # noqa: E402
+
+_HUNK = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+\d+(?:,\d+)? @@")
+
+
+def synthetic_source(lines: int, seed: int) -> list[str]:
+    """Python-like file with the repeated lines real code has (blank lines, returns)."""
+    rng = random.Random(seed)
+    out: list[str] = []
+    n = 0
+    while len(out) < lines:
+        n += 1
+        out.append(f"def function_{n}(value, limit={rng.randint(1, 99)}):\n")
+        for _ in range(rng.randint(2, 12)):
+            out.append(f"    value = transform_{rng.randint(1, 500)}(value, {rng.randint(1, 9)})\n")
+        out.append("    if value > limit:\n")
+        out.append("        return None\n")
+        out.append("    return value\n")
+        out.append("\n")
+    return out[:lines]
+
+
+def scatter_edits(old: list[str], edits: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    new = list(old)
+    for position in sorted(rng.sample(range(len(new)), min(edits, len(new))), reverse=True):
+        kind = rng.choice(("change", "insert", "delete"))
+        if kind == "change":
+            new[position] = f"    value = edited_{position}(value)\n"
+        elif kind == "insert":
+            new[position:position] = [f"    log_{position}(value)\n", f"    check_{position}(value)\n"]
+        else:
+            del new[position]
+    return new
+
+
+def apply_patch(old: list[str], patch: str) -> list[str]:
+    """Apply a unified diff from unified_diff() to old."""
+    out: list[str] = []
+    cursor = 0
+    for line in patch.splitlines(keepends=True)[2:]:
+        match = _HUNK.match(line)
+        if match:
+            start = int(match.group(1)) - (0 if match.group(2) == "0" else 1)
+            out.extend(old[cursor:start])
+            cursor = start
+        elif line.startswith("+"):
+            out.append(line[1:])
+        elif line.startswith("-"):
+            cursor += 1
+        else:
+            out.append(old[cursor])
+            cursor += 1
+    out.extend(old[cursor:])
+    return out
+
+
+def best_of(runs: int, func, *args) -> tuple[float, str]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def _difflib(old: list[str], new: list[str], fromfile: str, tofile: str) -> str:
+    return "".join(difflib.unified_diff(old, new, fromfile=fromfile, tofile=tofile))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--old", type=Path, help="File to diff from, instead of the synthetic one")
+    parser.add_argument("--new", type=Path, help="File to diff to (with --old)")
+    parser.add_argument("--lines", type=int, default=10_000, help="Size of the synthetic file")
+    parser.add_argument("--edits", type=int, default=50, help="Edits scattered through the synthetic file")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.old and args.new:
+        old = args.old.read_text(encoding="utf-8").splitlines(keepends=True)
+        new = args.new.read_text(encoding="utf-8").splitlines(keepends=True)
+    else:
+        old = synthetic_source(args.lines, args.seed)
+        new = scatter_edits(old, args.edits, args.seed)
+
+    ours_time, ours = best_of(args.runs, unified_diff, old, new, "a.py", "b.py")
+    theirs_time, theirs = best_of(args.runs, _difflib, old, new, "a.py", "b.py")
+    # Over MAX_INPUT_LINES or MAX_OUTPUT_LINES unified_diff() gives a one-line summary instead
+    summarized = "(diff too large to display" in ours
+    correct = summarized or apply_patch(old, ours) == new
+    speedup = theirs_time / ours_time
+
+    print(f"input:    {len(old):,} -> {len(new):,} lines, diff of {theirs.count(chr(10)):,} lines")
+    print(f"codentis: {ours_time * 1000:.1f} ms (best of {args.runs}){', summary only' if summarized else ''}")
+    print(f"difflib:  {theirs_time * 1000:.1f} ms (codentis {max(speedup, 1 / speedup):.1f}x {'faster' if speedup >= 1 else 'slower'})")
+    if not summarized:
+        print(f"codentis diff applies cleanly: {'yes' if correct else 'NO'}")
+        print(f"identical to difflib: {'yes' if ours == theirs else 'no (a different alignment)'}")
+    return 0 if correct else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
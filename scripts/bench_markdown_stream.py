@@ -0,0 +1,112 @@
+"""Replay benchmark for the streaming markdown renderer.
+
+Feeds a transcript to codentis.ui.markdown_stream.MarkdownStream delta by
+delta, the way the TUI receives an answer, and reports total time, time per
+delta and throughput. It also checks that the streamed output matches
+rendering the whole transcript in one call, so chunk boundaries never
+change what is shown.
+
+    python scripts/bench_markdown_stream.py                  # synthetic 100k-token answer
+    python scripts/bench_markdown_stream.py --tokens 20000 --delta-chars 1
+    python scripts/bench_markdown_stream.py --transcript answer.md
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from codentis.ui.markdown_stream import MarkdownStream  # noqa: E402
+
+CHARS_PER_TOKEN = 4
+
+
+class Styles:
+    BOLD = "\033[1m"
+    DIM = "\033[2m"
+    RESET = "\033[0m"
+    CYAN = "\033[36m"
+    YELLOW = "\033[33m"
+    GRAY = "\033[90m"
+
+
+def synthetic_transcript(tokens: int, seed: int) -> str:
+    """Markdown answer of about `tokens` tokens: prose, lists, headers and large code blocks."""
+    rng = random.Random(seed)
+    words = "the agent reads files and runs tools to change the code while streaming its answer".split()
+    parts: list[str] = []
+    size = 0
+    section = 0
+    while size < tokens * CHARS_PER_TOKEN:
+        section += 1
+        block = [f"## Section {section}\n\n"]
+        for _ in range(rng.randint(2, 5)):
+            sentence = " ".join(rng.choice(words) for _ in range(rng.randint(8, 30)))
+            block.append(f"{sentence} with **bold text** and `inline_code()` in it.\n")
+        block.append("\n")
+        for item in range(rng.randint(2, 6)):
+            block.append(f"- item {item}: see `path/to/file_{item}.py:{rng.randint(1, 900)}` for **details**\n")
+        block.append("\n1. first step\n2. second step\n\n")
+        lines = rng.randint(20, 200)
+        block.append("```python\n")
+        block.extend(f"def function_{n}(value):  # a * b ** c `x`\n    return value * {n}\n" for n in range(lines))
+        block.append("```\n\n")
+        text = "".join(block)
+        parts.append(text)
+        size += len(text)
+    return "".join(parts)
+
+
+def split_deltas(text: str, max_chars: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    deltas = []
+    i = 0
+    while i < len(text):
+        step = rng.randint(1, max_chars)
+        deltas.append(text[i:i + step])
+        i += step
+    return deltas
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transcript", type=Path, help="Markdown file to replay instead of the synthetic answer")
+    parser.add_argument("--tokens", type=int, default=100_000, help="Size of the synthetic answer")
+    parser.add_argument("--delta-chars", type=int, default=8, help="Deltas are 1..N characters long")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    text = args.transcript.read_text(encoding="utf-8") if args.transcript else synthetic_transcript(args.tokens, args.seed)
+    deltas = split_deltas(text, max(1, args.delta_chars), args.seed)
+
+    stream = MarkdownStream(Styles)
+    out: list[str] = []
+    timings: list[float] = []
+    start = time.perf_counter()
+    for delta in deltas:
+        t = time.perf_counter()
+        out.append(stream.feed(delta))
+        timings.append(time.perf_counter() - t)
+    out.append(stream.finish())
+    total = time.perf_counter() - start
+
+    whole = MarkdownStream(Styles)
+    expected = whole.feed(text) + whole.finish()
+    consistent = "".join(out) == expected
+
+    timings.sort()
+    print(f"transcript: {len(text):,} chars (~{len(text) // CHARS_PER_TOKEN:,} tokens), {len(deltas):,} deltas")
+    print(f"total:      {total * 1000:.1f} ms ({len(text) / total / 1e6:.1f} M chars/s)")
+    print(
+        f"per delta:  mean {statistics.fmean(timings) * 1e6:.2f} us, p50 {timings[len(timings) // 2] * 1e6:.2f} us,"
+        f" p99 {timings[int(len(timings) * 0.99)] * 1e6:.2f} us, max {timings[-1] * 1e6:.1f} us"
+    )
+    print(f"streamed output matches one-shot render: {'yes' if consistent else 'NO'}")
+    return 0 if consistent else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
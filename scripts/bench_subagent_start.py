@@ -0,0 +1,92 @@
+"""Start-up latency benchmark for sub-agents.
+
+Times SubAgentTool.execute() up to the first token of the child's stream,
+against a stubbed LLM that answers at once, so only the child's set-up is
+measured (no network and no TLS handshake). Compares a cold start, where
+every call builds a new child session (LLM client, tool registry, system
+prompt), with the warm path, where the tool's SessionPool hands back a
+session reset after the previous run.
+
+    python scripts/bench_subagent_start.py
+    python scripts/bench_subagent_start.py --runs 100 --cwd /path/to/repo
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from codentis.client import llm_client  # noqa: E402
+from codentis.client.response import StreamEvent, StreamEventType, TextDelta, TokenUsage  # noqa: E402
+from codentis.config.config import Config  # noqa: E402
+from codentis.context.workspace_cache import WorkspaceCache  # noqa: E402
+from codentis.tools.base import ToolInvocation  # noqa: E402
+from codentis.tools.subagents import CODEBASE_INVESTIGATOR, SubAgentTool  # noqa: E402
+from codentis.utils import text  # noqa: E402
+
+_first_token: list[float] = []
+
+
+async def _instant_stream(self, client, kwargs):
+    _first_token.append(time.perf_counter())
+    yield StreamEvent(type=StreamEventType.TEXT_DELTA, text_delta=TextDelta(content="Done."))
+    yield StreamEvent(
+        type=StreamEventType.MESSAGE_COMPLETE,
+        finish_reason="stop",
+        usage=TokenUsage(prompt_tokens=100, completion_tokens=2, total_tokens=102),
+    )
+
+
+async def _measure(config: Config, runs: int, warm: bool) -> list[float]:
+    workspace = WorkspaceCache()
+    tool = SubAgentTool(config, CODEBASE_INVESTIGATOR)
+    timings = []
+    for _ in range(runs):
+        if not warm:
+            await tool.close()
+            tool = SubAgentTool(config, CODEBASE_INVESTIGATOR)
+        invocation = ToolInvocation(params={"goal": "Find the entry point"}, cwd=config.cwd, workspace=workspace)
+        _first_token.clear()
+        started = time.perf_counter()
+        await tool.execute(invocation)
+        timings.append(_first_token[0] - started)
+    await tool.close()
+    return timings
+
+
+def _summary(timings: list[float]) -> str:
+    timings = sorted(timings)
+    return (
+        f"median {statistics.median(timings) * 1000:.1f} ms, p90 {timings[int(len(timings) * 0.9)] * 1000:.1f} ms,"
+        f" min {timings[0] * 1000:.1f} ms"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--cwd", type=Path, default=Path.cwd())
+    args = parser.parse_args()
+
+    llm_client.LLMClient.stream_response = _instant_stream
+    # No tiktoken download: count_tokens() falls back to its estimate
+    text.get_tokenizer = lambda model: None
+    config = Config(cwd=args.cwd.resolve(), api_key=os.environ.get("OPENAI_API_KEY", "bench"))
+
+    async def run() -> tuple[list[float], list[float]]:
+        await _measure(config, 3, warm=True)  # imports and first-use caches
+        return await _measure(config, args.runs, warm=False), await _measure(config, args.runs, warm=True)
+
+    cold, warm = asyncio.run(run())
+    print(f"start to first token over {args.runs} runs each:")
+    print(f"  cold (new child session per call): {_summary(cold)}")
+    print(f"  warm (pooled child session):       {_summary(warm)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Import-time report and startup budget check for the codentis CLI.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter,
+parses the trace into a table of the slowest imports and fails (exit 1)
+when the module's total import time is over --budget-ms, or when a module
+that must load lazily (openai, tiktoken) shows up in the import graph.
+
+    python scripts/import_report.py
+    python scripts/import_report.py --budget-ms 300 --top 15
+    python scripts/import_report.py --module codentis.app --allow openai
+"""
+import argparse
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+DEFAULT_MODULE = "codentis.cli"
+DEFAULT_BUDGET_MS = 300.0
+# Loaded on first use or by utils/warmup.py, never at startup
+LAZY_MODULES = ("openai", "tiktoken")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+@dataclass
+class ImportEntry:
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def trace_imports(module: str) -> list[ImportEntry]:
+    project_root = Path(__file__).resolve().parent.parent
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=project_root,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append(ImportEntry(name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return entries
+
+
+def best_of(module: str, runs: int) -> list[ImportEntry]:
+    # The fastest run is the least disturbed by the machine; the first one also writes .pyc files
+    traces = [trace_imports(module) for _ in range(runs)]
+    return min(traces, key=lambda entries: total_us(entries, module))
+
+
+def total_us(entries: list[ImportEntry], module: str) -> int:
+    return next((entry.cumulative_us for entry in entries if entry.name == module), 0)
+
+
+def print_table(title: str, entries: list[ImportEntry], key: str, top: int) -> None:
+    print(f"\n{title}")
+    print(f"  {'module':<50} {'self ms':>9} {'total ms':>9}")
+    for entry in sorted(entries, key=lambda e: getattr(e, key), reverse=True)[:top]:
+        print(f"  {entry.name:<50} {entry.self_us / 1000:>9.1f} {entry.cumulative_us / 1000:>9.1f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default=DEFAULT_MODULE, help=f"Module to import (default {DEFAULT_MODULE})")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Fail above this total import time")
+    parser.add_argument("--runs", type=int, default=3, help="Import the module this many times and report the fastest")
+    parser.add_argument("--top", type=int, default=20, help="Rows per table")
+    parser.add_argument("--allow", action="append", default=[], help="Lazy module allowed in this import graph")
+    args = parser.parse_args()
+
+    entries = best_of(args.module, max(1, args.runs))
+    total_ms = total_us(entries, args.module) / 1000
+
+    print_table("Slowest imports (total, including children)", entries, "cumulative_us", args.top)
+    print_table("Slowest imports (self)", entries, "self_us", args.top)
+
+    failures = []
+    loaded = {entry.name for entry in entries}
+    for name in LAZY_MODULES:
+        if name in loaded and name not in args.allow:
+            failures.append(f"{name} is imported at startup; it must load on first use")
+    if total_ms > args.budget_ms:
+        failures.append(f"import {args.module} took {total_ms:.1f} ms, over the {args.budget_ms:.0f} ms budget")
+
+    print(f"\nimport {args.module}: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms), {len(entries)} modules")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
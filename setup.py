@@ -53,7 +53,7 @@ setup(
     install_requires=requirements,
     entry_points={
         "console_scripts": [
-            "codentis=codentis.cli:run",
+            "codentis=codentis.launcher:run",
         ],
     },
     include_package_data=True,
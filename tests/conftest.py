@@ -0,0 +1,6 @@
+"""Shared test setup: keep data written by the code under test out of the real data dir."""
+import os
+import tempfile
+
+os.environ["XDG_DATA_HOME"] = tempfile.mkdtemp(prefix="codentis-tests-")
+os.environ.setdefault("OPENAI_API_KEY", "test")
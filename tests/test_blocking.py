@@ -0,0 +1,69 @@
+"""grep and glob over a large tree run off the event loop.
+
+A probe task sleeps 1 ms in a loop while the tool walks the tree; the gap
+between when each sleep should end and when it does is the time the loop
+was held by something else. The bound is loose enough for a busy shared
+runner (a thread switch can take a few ms there) while still failing if
+the walk itself, hundreds of ms on this tree, runs on the loop. Set
+CODENTIS_TEST_TREE_FILES to try other tree sizes.
+"""
+import asyncio
+import os
+import time
+from pathlib import Path
+import pytest
+from codentis.config.config import Config
+from codentis.context.workspace_cache import WorkspaceCache
+from codentis.tools.registry import create_default_registry
+
+TREE_FILES = int(os.environ.get("CODENTIS_TEST_TREE_FILES", "200000"))
+FILES_PER_DIR = 500
+MAX_LOOP_LAG = 0.050
+
+
+@pytest.fixture(scope="module")
+def large_tree(tmp_path_factory) -> Path:
+    root = tmp_path_factory.mktemp("tree")
+    for d in range(TREE_FILES // FILES_PER_DIR):
+        directory = root / f"pkg{d // 20}" / f"mod{d}"
+        directory.mkdir(parents=True)
+        for f in range(FILES_PER_DIR):
+            (directory / f"file{f}.txt").write_text("needle\n" if f == 0 else "hay\n")
+    return root
+
+
+async def _loop_lag(work) -> tuple[object, list[float]]:
+    """Run work() while measuring how late 1 ms sleeps wake up."""
+    lags: list[float] = []
+    stop = asyncio.Event()
+
+    async def probe():
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - started - 0.001)
+
+    task = asyncio.create_task(probe())
+    await asyncio.sleep(0)  # let the probe take its first sample
+    try:
+        result = await work()
+    finally:
+        stop.set()
+        await task
+    return result, lags
+
+
+@pytest.mark.parametrize("tool,params,output", [
+    ("grep", {"pattern": "needle", "recursive": True}, "1: needle"),
+    ("glob", {"pattern": "**/file0.txt"}, "file0.txt"),
+])
+def test_large_tree_walk_keeps_loop_responsive(large_tree, tool, params, output):
+    registry = create_default_registry(Config(cwd=large_tree, cache_tool_results=False))
+    registry.workspace = WorkspaceCache()
+
+    result, lags = asyncio.run(_loop_lag(lambda: registry.invoke(tool, params, large_tree)))
+
+    assert result.success, result.error
+    assert output in result.output
+    assert len(lags) > 10, "the probe never ran while the tool was working"
+    assert max(lags) < MAX_LOOP_LAG, f"event loop blocked for {max(lags) * 1000:.1f} ms"
@@ -0,0 +1,28 @@
+"""Model routes never send the main API key to another endpoint."""
+from codentis.config.config import Config, ModelRoute
+
+
+def test_route_to_other_endpoint_does_not_inherit_main_key(tmp_path):
+    config = Config(cwd=tmp_path, api_key="sk-main", model_routes={
+        "summary": ModelRoute(model="small"),
+        "subagent": ModelRoute(base_url="http://localhost:11434/v1"),
+        "subagent.code_reviewer": ModelRoute(base_url="https://other.example/v1", api_key="sk-other"),
+    })
+
+    assert config.resolve_route("summary").api_key == "sk-main"
+    assert config.resolve_route("subagent").api_key is None
+    assert config.resolve_route("subagent.code_reviewer", "subagent").api_key == "sk-other"
+    # An explicit route with only a base_url, like a SubAgentDefinition override
+    assert config.resolve_route(ModelRoute(base_url="http://localhost:8000/v1")).api_key is None
+
+
+def test_validate_reports_route_without_key(tmp_path):
+    config = Config(cwd=tmp_path, api_key="sk-main", model_routes={
+        "subagent": ModelRoute(base_url="http://localhost:11434/v1"),
+        "subagent.code_reviewer": ModelRoute(api_key="sk-other"),
+    })
+
+    errors = config.validate()
+
+    assert len(errors) == 1
+    assert "'subagent'" in errors[0] and "http://localhost:11434/v1" in errors[0]
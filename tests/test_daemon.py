@@ -0,0 +1,73 @@
+"""Daemon runs: per-run usage, and what happens to a session after a run."""
+import asyncio
+import pytest
+from codentis import daemon
+from codentis.client import llm_client
+from codentis.client.response import StreamEvent, StreamEventType, TextDelta, TokenUsage
+from codentis.config.config import Config
+from codentis.utils import text
+
+
+async def _scripted_stream(self, client, kwargs):
+    for word in ("Looking", " into", " it."):
+        yield StreamEvent(type=StreamEventType.TEXT_DELTA, text_delta=TextDelta(content=word))
+    yield StreamEvent(
+        type=StreamEventType.MESSAGE_COMPLETE,
+        finish_reason="stop",
+        usage=TokenUsage(prompt_tokens=100, completion_tokens=10, total_tokens=110),
+    )
+
+
+class _Writer:
+    """Stands in for the client's StreamWriter; drain() fails once the client has gone."""
+
+    def __init__(self, disconnect_after: int | None = None):
+        self.records = 0
+        self.disconnect_after = disconnect_after
+
+    def write(self, data: bytes) -> None:
+        self.records += 1
+
+    def is_closing(self) -> bool:
+        return False
+
+    async def drain(self) -> None:
+        if self.disconnect_after is not None and self.records >= self.disconnect_after:
+            raise ConnectionResetError("client went away")
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_client.LLMClient, "stream_response", _scripted_stream)
+    # No tiktoken download: count_tokens() falls back to its estimate
+    monkeypatch.setattr(text, "get_tokenizer", lambda model: None)
+    monkeypatch.setattr(daemon.WorkspaceTrust, "is_trusted", lambda self, cwd: True)
+    monkeypatch.setattr(daemon, "load_config", lambda cwd: Config(cwd=cwd, api_key="test"))
+    return daemon.Daemon(tmp_path / "daemon.sock")
+
+
+def test_named_session_reports_usage_per_run(tmp_path, server):
+    async def run():
+        params = {"cwd": str(tmp_path), "prompt": "hello", "session": "work"}
+        results = [await server._rpc_run(params, _Writer()) for _ in range(2)]
+        await server._close()
+        return results
+
+    first, second = asyncio.run(run())
+
+    assert first["usage"]["total_tokens"] == second["usage"]["total_tokens"] == 110
+
+
+def test_disconnected_run_does_not_reuse_its_session(tmp_path, server):
+    async def run():
+        for name in (None, "work"):
+            with pytest.raises(ConnectionResetError):
+                await server._rpc_run({"cwd": str(tmp_path), "prompt": "hello", "session": name}, _Writer(disconnect_after=2))
+        pool = server.workspaces[tmp_path.resolve()].pool
+        idle, sessions = list(pool._idle), dict(server.sessions)
+        await server._close()
+        return idle, sessions, server._busy
+
+    idle, sessions, busy = asyncio.run(run())
+
+    assert idle == [] and sessions == {} and busy == set()
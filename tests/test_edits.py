@@ -0,0 +1,18 @@
+"""plan_edits() names every edit that overlaps another."""
+from codentis.utils.edits import plan_edits
+
+
+def test_every_edit_inside_a_longer_one_is_reported():
+    content = "".join(f"line {i}\n" for i in range(10))
+    edits = [
+        (0, "line 1\nline 2\nline 3\nline 4\nline 5\n", "replaced\n"),
+        (1, "line 2\n", "two\n"),
+        (2, "line 4\n", "four\n"),
+        (3, "line 8\n", "eight\n"),
+    ]
+
+    plan = plan_edits(content, edits)
+
+    assert sorted(plan.errors) == [1, 2]
+    assert all("edit 1 " in error for error in plan.errors.values())
+    assert [span.index for span in plan.spans] == [0, 3]
@@ -0,0 +1,43 @@
+"""fetch() and HttpCache against a mock server."""
+import asyncio
+import httpx
+from codentis.client.http_client import CachedResponse, HttpCache, fetch
+
+BODY = b"x" * 5000
+URL = "http://example.test/page"
+
+
+def test_304_for_truncated_entry_refetches_full_body(tmp_path):
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"etag": '"v1"'})
+        return httpx.Response(200, headers={"etag": '"v1"', "content-type": "text/plain", "cache-control": "no-cache"}, content=BODY)
+
+    async def run():
+        cache = HttpCache(tmp_path)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return [await fetch(URL, max_bytes=max_bytes, cache=cache, client=client) for max_bytes in (1000, 800, 10_000, 10_000)]
+
+    first, smaller, larger, again = [(len(r.body), r.truncated, r.from_cache) for r in asyncio.run(run())]
+
+    assert first == (1000, True, False)
+    # The cached 1000 bytes cover a smaller request, so a 304 is enough
+    assert smaller == (1000, True, True)
+    # ...but not a larger one: the 304 is ignored and the body downloaded again
+    assert larger == (len(BODY), False, False)
+    assert again == (len(BODY), False, True)
+    assert ["if-none-match" in r.headers for r in requests] == [False, True, True, False, True]
+
+
+def test_memory_level_is_bounded_by_bytes(tmp_path):
+    cache = HttpCache(tmp_path, memory_max_bytes=2500)
+    for n in range(5):
+        cache.put(CachedResponse(url=f"{URL}/{n}", status_code=200, headers={"etag": f'"{n}"'}, body=b"x" * 1000))
+
+    assert cache.memory_bytes == 2000
+    # Entries dropped from memory are still on disk
+    assert cache.get(f"{URL}/0").body == b"x" * 1000
+    assert cache.memory_bytes <= 2500
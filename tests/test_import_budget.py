@@ -0,0 +1,20 @@
+"""`import codentis.cli` stays within the startup budget checked by scripts/import_report.py."""
+import importlib.util
+from pathlib import Path
+
+_SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "import_report.py"
+_spec = importlib.util.spec_from_file_location("import_report", _SCRIPT)
+import_report = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(import_report)
+
+
+def test_cli_import_is_within_budget_and_lazy():
+    # Fastest of three fresh interpreters, as the CI check does
+    entries = import_report.best_of(import_report.DEFAULT_MODULE, runs=3)
+    loaded = {entry.name for entry in entries}
+    total_ms = import_report.total_us(entries, import_report.DEFAULT_MODULE) / 1000
+
+    assert not loaded & set(import_report.LAZY_MODULES), "openai/tiktoken must load on first use, not at startup"
+    assert 0 < total_ms <= import_report.DEFAULT_BUDGET_MS, (
+        f"import {import_report.DEFAULT_MODULE} took {total_ms:.1f} ms, over the {import_report.DEFAULT_BUDGET_MS:.0f} ms budget"
+    )
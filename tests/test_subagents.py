@@ -0,0 +1,14 @@
+"""Sub-agent sessions reuse the parent session's OpenAI clients."""
+from codentis.agent.session import Session
+from codentis.config.config import Config
+
+
+def test_child_session_uses_parent_shared_clients(tmp_path):
+    shared = {}
+    parent = Session(Config(cwd=tmp_path, api_key="test"), shared_clients=shared)
+    tool = next(tool for name, tool in parent.tool_registry.tools.items() if name.startswith("subagent_"))
+
+    child = tool._new_session()
+
+    assert child.client.get_client() is parent.client.get_client()
+    assert len(shared) == 1
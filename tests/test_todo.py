@@ -0,0 +1,34 @@
+"""Adding a todo never overwrites an existing one."""
+import asyncio
+from codentis.config.config import Config
+from codentis.context.todo_store import TodoStore
+from codentis.tools.registry import create_default_registry
+
+
+def test_add_many_rejects_taken_and_repeated_ids(tmp_path):
+    store = TodoStore("/project", path=tmp_path / "todos.db")
+    store.add_many([{"id": "a1", "content": "Write the parser"}])
+
+    added, duplicates = store.add_many([{"id": "b2", "content": "Test it"}, {"id": "a1", "content": "Something else"}])
+    assert (added, duplicates) == ([], ["a1"])
+    added, duplicates = store.add_many([{"id": "c3", "content": "One"}, {"id": "c3", "content": "Two"}])
+    assert (added, duplicates) == ([], ["c3"])
+
+    assert [(item.id, item.content) for item in store.items()] == [("a1", "Write the parser")]
+    store.close()
+
+
+def test_todo_add_with_existing_id_is_an_error(tmp_path):
+    registry = create_default_registry(Config(cwd=tmp_path))
+
+    async def run():
+        await registry.invoke("todo", {"action": "add", "id": "t1", "content": "Original"}, tmp_path)
+        result = await registry.invoke("todo", {"action": "add", "id": "t1", "content": "Replacement"}, tmp_path)
+        listing = await registry.invoke("todo", {"action": "list"}, tmp_path)
+        return result, listing
+
+    result, listing = asyncio.run(run())
+
+    assert not result.success
+    assert "t1 already exists" in result.error
+    assert "Original" in listing.output and "Replacement" not in listing.output
@@ -0,0 +1,41 @@
+"""ToolOutputHistory keeps to its memory cap when outputs are expanded."""
+import sys
+from pathlib import Path
+from codentis.tools.base import FileDiff
+from codentis.ui.tool_history import ToolOutput, ToolOutputHistory
+
+
+def _edit(n: int) -> ToolOutput:
+    old = "".join(f"line {i}\n" for i in range(2000))
+    new = old.replace("line 1\n", f"edited {n}\n")
+    diff = FileDiff(Path(f"file{n}.py"), old, new)
+    return ToolOutput(f"call_{n}", "edit_file", "edited", "ok", short_id=str(n), diff=diff)
+
+
+def test_expanding_counts_the_rendered_diff():
+    history = ToolOutputHistory()
+    tool = _edit(1)
+    history.add(tool)
+    before = history.memory_bytes
+
+    details, diff_text = history.contents(tool)
+
+    assert details == "ok" and "+edited 1" in diff_text
+    assert history.memory_bytes == before + sys.getsizeof(tool.diff.rendered)
+
+
+def test_expanding_enforces_the_memory_cap():
+    first, second = _edit(1), _edit(2)
+    history = ToolOutputHistory()
+    history.add(first)
+    history.add(second)
+    # Room for both outputs as added, but not once one of them is rendered
+    history.max_bytes = history.memory_bytes
+    assert history.stats()["spilled"] == 0
+
+    history.contents(second)
+
+    assert history.stats()["spilled"] == 1
+    assert history.memory_bytes == second.size
+    # The older output was spilled and still reads back from disk
+    assert "+edited 1" in history.contents(first)[1]
@@ -0,0 +1,75 @@
+"""TUI handlers stay cheap on the event loop during a tool call.
+
+The TUI's event handlers run on the loop that also streams the model's
+reply and runs tools, so a join or sleep on that path (stopping the
+spinner, drawing the tool panel) shows up here as handler time.
+"""
+import asyncio
+import contextlib
+import io
+import time
+import pytest
+from codentis.app import CLI
+from codentis.client import llm_client
+from codentis.client.response import StreamEvent, StreamEventType, TextDelta, TokenUsage, ToolCall
+from codentis.config.config import Config
+from codentis.ui import renderer
+from codentis.utils import text
+
+HANDLERS = (
+    "start_thinking", "stop_thinking", "update_thinking", "tool_call_start", "tool_call_complete",
+    "begin_assistant", "stream_assistant_delta", "end_assistant",
+)
+MAX_HANDLER_TIME = 0.050
+
+
+async def _scripted_stream(self, client, kwargs):
+    """One list_dir call on the first turn, a short answer once its result is in."""
+    for word in ("Looking", " into", " it."):
+        await asyncio.sleep(0.02)
+        yield StreamEvent(type=StreamEventType.TEXT_DELTA, text_delta=TextDelta(content=word))
+    if not any(message["role"] == "tool" for message in kwargs["messages"]):
+        yield StreamEvent(
+            type=StreamEventType.TOOL_CALL_COMPLETE,
+            tool_call=ToolCall(call_id="call_1", name="list_dir", arguments={"path": "."}),
+        )
+    else:
+        yield StreamEvent(type=StreamEventType.TEXT_DELTA, text_delta=TextDelta(content=" Done."))
+    yield StreamEvent(
+        type=StreamEventType.MESSAGE_COMPLETE,
+        finish_reason="stop",
+        usage=TokenUsage(prompt_tokens=100, completion_tokens=10, total_tokens=110),
+    )
+
+
+@pytest.fixture
+def handler_time(monkeypatch) -> dict[str, float]:
+    spent: dict[str, float] = {}
+    for name in HANDLERS:
+        original = getattr(renderer.TUI, name)
+
+        def timed(self, *args, _original=original, _name=name, **kwargs):
+            started = time.perf_counter()
+            try:
+                return _original(self, *args, **kwargs)
+            finally:
+                spent[_name] = spent.get(_name, 0.0) + time.perf_counter() - started
+
+        monkeypatch.setattr(renderer.TUI, name, timed)
+    return spent
+
+
+def test_tool_call_handlers_do_not_block_loop(tmp_path, monkeypatch, handler_time):
+    monkeypatch.setattr(llm_client.LLMClient, "stream_response", _scripted_stream)
+    # No tiktoken download: count_tokens() falls back to its estimate
+    monkeypatch.setattr(text, "get_tokenizer", lambda model: None)
+    (tmp_path / "main.py").write_text("print('hi')\n")
+    cli = CLI(Config(cwd=tmp_path, api_key="test", stats_file=tmp_path / "stats.json"))
+
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        asyncio.run(cli.run_single("list files"))
+
+    assert "tool_call_complete" in handler_time, "the scripted tool call never reached the TUI: " + out.getvalue()[-2000:]
+    total = sum(handler_time.values())
+    assert total < MAX_HANDLER_TIME, f"TUI handlers held the loop for {total * 1000:.1f} ms: {handler_time}"